@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+Requests/second for the task list endpoints served by a WSGI server
+(gunicorn) versus an ASGI server (uvicorn), with concurrent keep-alive
+clients.
+
+Three setups are compared on the same worker count:
+  - gunicorn + the sync views (/?list=..., AJAX)
+  - uvicorn  + the sync views (run through the sync-to-async adapter)
+  - uvicorn  + the native async views (/async/?list=...)
+
+The "list" mix only reads; the "write" mix creates a task and deletes it
+again. Servers run against the benchmark database via benchmarks.settings.
+gunicorn and uvicorn must be installed (pip install gunicorn uvicorn).
+
+Usage:
+    python -m benchmarks.bench_asgi --concurrency 64 --seconds 10 --mix list
+"""
+import argparse
+import http.client
+import importlib.util
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from benchmarks.common import BASE_DIR, CSRF_TOKEN, HOST, free_port, server_command, setup_django, wait_for_port
+
+
+def seed(tasks):
+    """Create the benchmark user with one list of `tasks` tasks; return (session cookie, list id)"""
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from benchmarks.datagen import generate
+
+    data = generate(users=1, lists_per_user=1, tasks=tasks, share_fanout=0)
+    user = data['users'][0]
+    client = Client()
+    client.force_login(User.objects.get(pk=user.pk))
+    return client.cookies['sessionid'].value, data['tasklists'][0].id
+
+
+def worker(port, prefix, mix, tasklist_id, session, deadline):
+    headers = {
+        'Cookie': f'sessionid={session}; csrftoken={CSRF_TOKEN}',
+        'X-CSRFToken': CSRF_TOKEN,
+        'X-Requested-With': 'XMLHttpRequest',
+    }
+    list_url = f'{prefix}?' + urlencode({'list': tasklist_id, 'status': 'all'})
+    conn = http.client.HTTPConnection(HOST, port, timeout=30)
+    latencies = []
+    errors = 0
+
+    def request(method, url, body=None):
+        nonlocal errors
+        extra = {'Content-Type': 'application/x-www-form-urlencoded'} if body else {}
+        conn.request(method, url, body=body, headers={**headers, **extra})
+        response = conn.getresponse()
+        payload = response.read()
+        if response.status >= 400:
+            errors += 1
+        return payload
+
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        if mix == 'list':
+            request('GET', list_url)
+        else:
+            body = urlencode({
+                'title': 'Bench', 'due_date': '2030-01-01T09:00', 'priority': 'low',
+                'status': 'ongoing', 'tasklist': tasklist_id,
+            })
+            payload = request('POST', f'{prefix}create/', body)
+            try:
+                task_id = json.loads(payload)['task']['id']
+            except (ValueError, KeyError, TypeError):
+                errors += 1
+            else:
+                request('POST', f'{prefix}delete/{task_id}/', 'confirm=1')
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    return latencies, errors
+
+
+def run(label, server, prefix, args, session, tasklist_id):
+    if importlib.util.find_spec(server) is None:
+        print(f'{label:24} skipped ({server} is not installed)')
+        return
+    port = free_port()
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'benchmarks.settings'}
+    process = subprocess.Popen(server_command(server, port, args.workers), cwd=BASE_DIR, env=env)
+    try:
+        wait_for_port(port)
+        deadline = time.monotonic() + args.seconds
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            futures = [
+                pool.submit(worker, port, prefix, args.mix, tasklist_id, session, deadline)
+                for _ in range(args.concurrency)
+            ]
+            results = [future.result() for future in futures]
+    finally:
+        process.terminate()
+        process.wait()
+
+    latencies = sorted(l for result, _ in results for l in result)
+    errors = sum(e for _, e in results)
+    if not latencies:
+        print(f'{label:24} no requests completed')
+        return
+    p = lambda q: latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000
+    print(f'{label:24} {len(latencies) / args.seconds:8,.0f} req/s  '
+          f'p50 {p(0.50):7.2f}ms  p95 {p(0.95):7.2f}ms  p99 {p(0.99):7.2f}ms  errors {errors}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=64, help='concurrent keep-alive clients')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=1, help='server worker processes')
+    parser.add_argument('--tasks', type=int, default=200, help='tasks in the benchmark list')
+    parser.add_argument('--mix', choices=('list', 'write'), default='list')
+    args = parser.parse_args()
+
+    setup_django()
+    session, tasklist_id = seed(args.tasks)
+    print(f'{args.mix} mix, {args.concurrency} clients, {args.workers} worker(s), {args.seconds:g}s per setup')
+    run('WSGI (gunicorn) sync', 'gunicorn', '/', args, session, tasklist_id)
+    run('ASGI (uvicorn) sync', 'uvicorn', '/', args, session, tasklist_id)
+    run('ASGI (uvicorn) async', 'uvicorn', '/async/', args, session, tasklist_id)
+
+
+if __name__ == '__main__':
+    main()
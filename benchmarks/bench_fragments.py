@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Render time of the task rows (_task_rows.html) as the list grows, with the
+per-task fragment cache of tasks.fragments cold, warm and disabled, and
+with a single task changed since the last render.
+
+The cache is the configured default (LocMemCache with MAX_ENTRIES=10000
+in the project settings), so keep --sizes at or below that.
+
+Usage:
+    python -m benchmarks.bench_fragments --sizes 50,500,2000,5000
+"""
+import argparse
+import time
+
+from benchmarks.common import setup_django
+
+
+def best_of(repeat, render, prepare=None):
+    """Fastest of `repeat` renders in milliseconds; prepare() runs untimed before each"""
+    best = None
+    for _ in range(repeat):
+        if prepare:
+            prepare()
+        start = time.perf_counter()
+        render()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='50,500,2000,5000')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    setup_django()
+    from django.contrib.auth.models import AnonymousUser
+    from django.core.cache import cache
+    from django.core.cache.backends.dummy import DummyCache
+    from django.template.loader import render_to_string
+    from django.test import RequestFactory
+    from tasks import fragments
+    from tasks.models import Task
+    from tasks.views import listing_queryset
+    from benchmarks.datagen import generate
+
+    if Task.objects.count() < max(sizes):
+        generate(tasks=max(sizes))
+
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    print(f'{"rows":>6} {"no cache":>10} {"cold":>10} {"warm":>10} {"1 changed":>10}  (ms, best of {args.repeat})')
+    for size in sizes:
+        tasks = list(listing_queryset(Task.objects.order_by('id'))[:size])
+
+        def render():
+            render_to_string('tasks/_task_rows.html', {
+                'tasks': tasks, 'current_status_filter': 'ongoing', 'current_sort': 'due_date', 'can_write': True,
+            }, request=request)
+
+        def bump_one():
+            tasks[0].version += 1
+
+        shared_cache = fragments.cache
+        fragments.cache = DummyCache('bench', {})
+        no_cache = best_of(args.repeat, render)
+        fragments.cache = shared_cache
+        cold = best_of(args.repeat, render, prepare=cache.clear)
+        render()
+        warm = best_of(args.repeat, render)
+        one_changed = best_of(args.repeat, render, prepare=bump_one)
+        print(f'{size:>6} {no_cache:>10.2f} {cold:>10.2f} {warm:>10.2f} {one_changed:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Import/export throughput (rows/second) and peak memory for tasks.importexport.
+
+Writes a synthetic file of --rows tasks, imports it into a fresh list,
+then exports that list back out through the same streaming code path the
+views use. Peak RSS is reported after each phase so that bounded memory
+can be checked: it should not grow with --rows.
+
+Usage:
+    python -m benchmarks.bench_importexport --rows 1000000 --format csv
+"""
+import argparse
+import csv
+import json
+import os
+import resource
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import setup_django, timer
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write_sample_file(path, rows, fmt):
+    fields = ('title', 'description', 'due_date', 'priority', 'status')
+    start = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    priorities = ('high', 'medium', 'low')
+    with open(path, 'w', encoding='utf-8', newline='') as out:
+        writer = csv.writer(out) if fmt == 'csv' else None
+        if writer:
+            writer.writerow(fields)
+        for i in range(rows):
+            row = (
+                f'Imported task {i}',
+                f'Row {i} of the import benchmark',
+                (start + timedelta(minutes=i)).isoformat(),
+                priorities[i % 3],
+                'completed' if i % 4 == 0 else 'ongoing',
+            )
+            if writer:
+                writer.writerow(row)
+            else:
+                out.write(json.dumps(dict(zip(fields, row))) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--format', choices=('csv', 'jsonl'), default='csv')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.models import User
+    from tasks.importexport import import_tasks, stream_export
+    from tasks.models import TaskList
+
+    user, _ = User.objects.get_or_create(username='bench-import', defaults={'password': '!'})
+    tasklist = TaskList.objects.create(user=user, name=f'Import {datetime.now().isoformat()}')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f'tasks.{args.format}')
+        write_sample_file(path, args.rows, args.format)
+        print(f'sample file: {os.path.getsize(path) / 2**20:.1f} MiB, peak RSS {peak_rss_mb():.0f} MiB')
+
+        with open(path, encoding='utf-8', newline='') as stream:
+            with timer(f'import {args.rows:,} rows ({args.format})', rows=args.rows):
+                result = import_tasks(stream, args.format, tasklist, user, batch_size=args.batch_size)
+        print(f'created {result.created:,}, rejected {result.failed:,}, peak RSS {peak_rss_mb():.0f} MiB')
+
+        with open(os.devnull, 'w') as devnull:
+            with timer(f'export {result.created:,} rows ({args.format})', rows=result.created):
+                devnull.writelines(stream_export(tasklist, args.format))
+        print(f'peak RSS {peak_rss_mb():.0f} MiB')
+
+
+if __name__ == '__main__':
+    main()
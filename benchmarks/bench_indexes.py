@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Query plans and timings for the task listing / access-check hot paths,
+before and after the composite indexes of migrations 0012 and 0013.
+
+Usage:
+    python -m benchmarks.bench_indexes --tasks 1000000
+"""
+import argparse
+from contextlib import contextmanager
+
+from benchmarks.common import setup_django, timer
+
+INDEX_MIGRATIONS = '0012_task_listing_indexes, 0013_task_sort_ranks'
+
+
+def hot_queries(user, tasklist):
+    from django.db.models import Case, IntegerField, Q, Value, When
+    from tasks.models import Task, TaskList
+
+    legacy_priority_order = Case(
+        *[When(priority=priority, then=Value(rank)) for priority, rank in Task.PRIORITY_RANKS.items()],
+        output_field=IntegerField(),
+    )
+    return {
+        'legacy CASE priority sort (pre-0013)': Task.objects.filter(
+            tasklist=tasklist, status=Task.ONGOING
+        ).annotate(priority_order=legacy_priority_order).order_by('priority_order', 'id')[:50],
+        'task_list (tasklist, status) by due_date': Task.objects.filter(
+            tasklist=tasklist, status=Task.ONGOING
+        ).order_by('due_date', 'id')[:50],
+        'task_list (tasklist, status) by priority rank': Task.objects.filter(
+            tasklist=tasklist, status=Task.ONGOING
+        ).order_by('priority_rank', 'id')[:50],
+        'task_list (tasklist) by priority rank': Task.objects.filter(
+            tasklist=tasklist
+        ).order_by('priority_rank', 'id')[:50],
+        'accessible lists for user': TaskList.objects.filter(
+            Q(user=user) | Q(shared_with=user)
+        ).distinct().order_by('created_at'),
+        'lists shared with user (membership reverse)': TaskList.objects.filter(shared_with=user),
+    }
+
+
+@contextmanager
+def drop_indexes():
+    """Temporarily drop the listing indexes, recreating them on exit"""
+    from django.db import connection
+    from tasks.models import Task, TaskList, TaskListMembership
+
+    models_indexes = [
+        (model, index) for model in (Task, TaskList, TaskListMembership) for index in model._meta.indexes
+    ]
+    with connection.schema_editor() as editor:
+        for model, index in models_indexes:
+            editor.remove_index(model, index)
+    try:
+        yield
+    finally:
+        with connection.schema_editor() as editor:
+            for model, index in models_indexes:
+                editor.add_index(model, index)
+
+
+def report(label, user, tasklist, repeat):
+    print(f'\n===== {label} =====')
+    for name, queryset in hot_queries(user, tasklist).items():
+        print(f'\n-- {name}')
+        print(queryset.explain())
+        with timer(f'{name} x{repeat}'):
+            for _ in range(repeat):
+                list(queryset.all())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--lists-per-user', type=int, default=2)
+    parser.add_argument('--share-fanout', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.management import call_command
+    from tasks.models import Task
+    from benchmarks.datagen import generate
+
+    if Task.objects.count() < args.tasks:
+        with timer(f'seed {args.tasks:,} tasks', rows=args.tasks):
+            data = generate(users=args.users, lists_per_user=args.lists_per_user,
+                            tasks=args.tasks, share_fanout=args.share_fanout)
+        tasklist = data['tasklists'][0]
+    else:
+        tasklist = Task.objects.select_related('tasklist').first().tasklist
+    user = tasklist.user
+
+    with drop_indexes():
+        report('before (FK indexes only)', user, tasklist, args.repeat)
+    report(f'after ({INDEX_MIGRATIONS})', user, tasklist, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Events/second through /log-error/ with a synchronous FileHandler versus the
+queued QueueListenerHandler, with concurrent clients posting batches.
+
+Rate limiting and deduplication are disabled (every event is distinct) so
+the numbers measure the logging path itself.
+
+Usage:
+    python -m benchmarks.bench_log_ingest --threads 16 --requests 200 --batch 20
+"""
+import argparse
+import json
+import logging.config
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import setup_django
+
+
+def logging_config(handler, path):
+    return {
+        'version': 1,
+        'disable_existing_loggers': False,
+        'formatters': {
+            'app_formatter': {'format': '[{asctime}] {levelname} - {name}: {message}', 'style': '{'},
+        },
+        'handlers': {'app_file': {**handler, 'level': 'INFO', 'filename': path, 'formatter': 'app_formatter'}},
+        'loggers': {'tasks': {'handlers': ['app_file'], 'level': 'INFO', 'propagate': False}},
+    }
+
+
+HANDLERS = {
+    'sync FileHandler': {'class': 'logging.FileHandler'},
+    'QueueListenerHandler': {'()': 'tasks.log_handlers.QueueListenerHandler'},
+}
+
+
+def run(label, handler, args, tmp):
+    from django.core.cache import cache
+    from django.test import Client
+
+    # Forget the previous run's messages so none are dropped as duplicates
+    cache.clear()
+    path = os.path.join(tmp, f'{label.replace(" ", "_")}.log')
+    logging.config.dictConfig(logging_config(handler, path))
+
+    def worker(thread):
+        client = Client(REMOTE_ADDR=f'10.0.0.{thread}')
+        latencies = []
+        for i in range(args.requests):
+            events = [{'message': f'error {thread}-{i}-{j}', 'source': 'bench'} for j in range(args.batch)]
+            start = time.perf_counter()
+            client.post('/log-error/', json.dumps({'events': events}), content_type='application/json')
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        latencies = sorted(l for result in pool.map(worker, range(args.threads)) for l in result)
+    elapsed = time.perf_counter() - start
+    # Closing flushes the queue, so the queued handler pays for its writes too
+    logging.getLogger('tasks').handlers[0].close()
+    total_elapsed = time.perf_counter() - start
+
+    events = args.threads * args.requests * args.batch
+    with open(path, 'rb') as f:
+        written = sum(1 for _ in f)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f'{label:22} {events / elapsed:10,.0f} events/s accepted, {written / total_elapsed:10,.0f} events/s on disk, '
+          f'request p50 {p50:.2f}ms p99 {p99:.2f}ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=200, help='POSTs per thread')
+    parser.add_argument('--batch', type=int, default=20, help='events per POST')
+    args = parser.parse_args()
+
+    setup_django(migrate=False)
+    from django.conf import settings
+    settings.TASKS_LOG_ERROR_RATE_LIMIT = None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, handler in HANDLERS.items():
+            run(label, handler, args, tmp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Throughput of the reminder scheduler (tasks.reminders) on a large table.
+
+For each window length the overdue watermark is reset to a fixed start and
+one scheduler pass reminds about the open tasks falling due within the
+window: scanned, grouped per user and delivered as emails through the
+locmem backend (benchmarks.settings). Next to it, the same window counted
+with the (status, due_date) index disabled shows what a full table scan
+per pass would cost instead.
+
+The generated due dates spread over -30..+90 days, so with a million tasks
+an hour window holds roughly 240 open tasks and a day about 5,800.
+
+Usage:
+    python -m benchmarks.bench_reminders --tasks 1000000 --users 1000 --windows 15,60,1440,10080
+"""
+import argparse
+import time
+from datetime import timedelta
+
+from benchmarks.common import setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--windows', default='15,60,1440,10080', help='window lengths in minutes')
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+    windows = [int(minutes) for minutes in args.windows.split(',')]
+
+    setup_django()
+    from django.core import mail
+    from django.db import connection
+    from django.utils import timezone
+    from tasks.models import ReminderWatermark, Task
+    from tasks.reminders import OVERDUE, process_reminders
+    from benchmarks.datagen import generate
+
+    if Task.objects.count() < args.tasks:
+        generate(users=args.users, tasks=args.tasks - Task.objects.count())
+    total = Task.objects.count()
+    start = timezone.now()
+
+    query = (
+        Task.objects.filter(status=Task.ONGOING, due_date__gte=start, due_date__lte=start)
+        .exclude(due_date=start, id__lte=0).order_by('due_date', 'id').values('id')[:args.batch_size]
+    )
+    sql, params = query.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        print(f'{total:,} tasks; batch query plan:', '; '.join(row[-1] for row in cursor.fetchall()))
+
+    table = Task._meta.db_table
+    print(f'{"window":>8} {"tasks":>8} {"emails":>8} {"pass ms":>10} {"tasks/s":>10} {"full scan ms":>13}')
+    for minutes in windows:
+        until = start + timedelta(minutes=minutes)
+        ReminderWatermark.objects.update_or_create(kind=OVERDUE, defaults={'due_date': start, 'task_id': 0})
+        mail.outbox = []
+        began = time.perf_counter()
+        scanned, sent = process_reminders(OVERDUE, now=until, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - began
+
+        with connection.cursor() as cursor:
+            began = time.perf_counter()
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {table} NOT INDEXED WHERE status = %s AND due_date > %s AND due_date <= %s',
+                [Task.ONGOING, *map(connection.ops.adapt_datetimefield_value, (start, until))],
+            )
+            cursor.fetchone()
+            full_scan = (time.perf_counter() - began) * 1000
+        rate = scanned / elapsed if scanned else 0
+        print(f'{minutes:>7}m {scanned:>8,} {sent:>8,} {elapsed * 1000:>10.1f} {rate:>10,.0f} {full_scan:>13.1f}')
+
+
+if __name__ == '__main__':
+    main()
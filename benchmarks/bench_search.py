@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""
+Latency of task search with the SQLite FTS5 index versus the icontains
+fallback, for one user's lists and for every list.
+
+Usage:
+    python -m benchmarks.bench_search --tasks 1000000
+"""
+import argparse
+
+from benchmarks.common import setup_django, timer
+
+QUERIES = ('report', 'prep', 'review invoice', 'number 123456', 'nothingmatches')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--skip-fallback', action='store_true', help='only time the FTS5 index')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import transaction
+    from tasks.access import tasklist_roles
+    from tasks.models import Task, TaskList
+    from tasks.pagination import PAGE_SIZE
+    from tasks.search import _fallback_task_ids, rebuild_index, search_task_ids, search_terms
+    from benchmarks.datagen import generate
+
+    if Task.objects.count() < args.tasks:
+        with timer(f'seed {args.tasks:,} tasks', rows=args.tasks):
+            generate(users=args.users, tasks=args.tasks, share_fanout=3)
+        # datagen uses bulk_create, which does not index
+        with timer('rebuild search index', rows=args.tasks), transaction.atomic():
+            rebuild_index()
+
+    user = TaskList.objects.order_by('id').first().user
+    scopes = {
+        'one user': set(tasklist_roles(user)),
+        'all lists': set(TaskList.objects.values_list('id', flat=True)),
+    }
+    for scope, tasklist_ids in scopes.items():
+        print(f'\n-- {scope} ({len(tasklist_ids)} lists)')
+        for query in QUERIES:
+            hits = len(search_task_ids(tasklist_ids, query, 0, PAGE_SIZE + 1))
+            with timer(f'fts5     {query!r:18} ({hits} on page 1) x{args.repeat}'):
+                for _ in range(args.repeat):
+                    search_task_ids(tasklist_ids, query, 0, PAGE_SIZE + 1)
+            if not args.skip_fallback:
+                with timer(f'icontains {query!r:17} x{args.repeat}'):
+                    for _ in range(args.repeat):
+                        _fallback_task_ids(tasklist_ids, search_terms(query), 0, PAGE_SIZE + 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+Time to turn a page of tasks into a JSON response: the former hand-built
+dicts (model instances + strftime + JsonResponse) versus tasks.serializers
+on instances and on .values() rows, with the stdlib encoder and orjson.
+
+Usage:
+    python -m benchmarks.bench_serializers --rows 10000
+"""
+import argparse
+
+from benchmarks.common import setup_django, timer
+
+
+def legacy_tasks_json(tasks):
+    """The per-task dict the views built before tasks.serializers"""
+    return [
+        {
+            'id': task.id,
+            'title': task.title,
+            'description': task.description or '',
+            'due_date': task.due_date.strftime('%b %d, %Y %I:%M %p'),
+            'due_date_local': task.due_date.strftime('%Y-%m-%dT%H:%M'),
+            'priority': task.priority,
+            'status': task.status,
+            'is_completed': task.is_completed,
+            'tasklist': task.tasklist.name,
+            'tasklist_id': task.tasklist.id,
+        }
+        for task in tasks
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.http import JsonResponse
+    from tasks import serializers
+    from tasks.models import Task
+    from tasks.views import listing_queryset
+    from benchmarks.datagen import generate
+
+    if Task.objects.count() < args.rows:
+        with timer(f'seed {args.rows:,} tasks', rows=args.rows):
+            generate(tasks=args.rows)
+
+    tasks = listing_queryset(Task.objects.order_by('id'))[:args.rows]
+    rows = serializers.task_values(Task.objects.order_by('id'))[:args.rows]
+    n = args.rows * args.repeat
+
+    print(f'-- fetch + build dicts, {args.rows:,} rows x{args.repeat}')
+    with timer('instances + strftime (legacy)', rows=n):
+        for _ in range(args.repeat):
+            legacy_tasks_json(tasks.all())
+    with timer('instances + serialize_tasks', rows=n):
+        for _ in range(args.repeat):
+            serializers.serialize_tasks(tasks.all())
+    with timer('values() + serialize_task_rows', rows=n):
+        for _ in range(args.repeat):
+            serializers.serialize_task_rows(rows.all())
+
+    data = {'success': True, 'tasks': serializers.serialize_task_rows(rows.all())}
+    print(f'\n-- encode the response, {args.rows:,} rows x{args.repeat}')
+    with timer('JsonResponse (DjangoJSONEncoder)', rows=n):
+        for _ in range(args.repeat):
+            JsonResponse(data)
+    encoder = 'orjson' if serializers.orjson is not None else 'json, compact'
+    with timer(f'json_response ({encoder})', rows=n):
+        for _ in range(args.repeat):
+            serializers.json_response(data)
+    if serializers.orjson is None:
+        print('(install orjson to time the orjson encoder)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Startup time and request latency of the development settings
+(todo_project.settings, DEBUG on) versus the production profile
+(todo_project.settings_production: cached template loader, persistent
+connections, GZip/ConditionalGet, cached sessions).
+
+Each profile runs in fresh processes through the Django test client, so
+the numbers cover the full middleware stack but no HTTP server:
+  - startup: wall time of a process that sets Django up and serves one
+    task list page (imports, app loading, first template compile)
+  - latency: the task list page and its AJAX JSON, requested repeatedly
+    by a logged-in user with Accept-Encoding: gzip
+
+Usage:
+    python -m benchmarks.bench_settings --requests 500 --startups 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import BASE_DIR, setup_django
+
+PROFILES = ('development', 'production')
+AJAX = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+
+def run_child(profile, *args):
+    env = {**os.environ, 'BENCH_PROFILE': profile}
+    command = [sys.executable, '-m', 'benchmarks.bench_settings', '--child', *args]
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    return elapsed, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def child(mode, user_id, requests):
+    """Runs inside a fresh process with BENCH_PROFILE set"""
+    start = time.perf_counter()
+    setup_django(migrate=False)
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from django.urls import reverse
+    setup_ms = (time.perf_counter() - start) * 1000
+    from tasks.perf import percentile
+
+    client = Client(HTTP_ACCEPT_ENCODING='gzip')
+    client.force_login(User.objects.get(pk=user_id))
+    url = reverse('task_list')
+    first = time.perf_counter()
+    client.get(url)
+    result = {'setup_ms': setup_ms, 'first_request_ms': (time.perf_counter() - first) * 1000}
+
+    if mode == 'requests':
+        for name, headers in (('page', {}), ('ajax', AJAX)):
+            timings, sizes = [], []
+            for _ in range(requests):
+                start = time.perf_counter()
+                response = client.get(url, **headers)
+                timings.append((time.perf_counter() - start) * 1000)
+                sizes.append(len(response.content))
+            timings.sort()
+            result[name] = {
+                'p50': percentile(timings, 50),
+                'p95': percentile(timings, 95),
+                'bytes': statistics.mean(sizes),
+            }
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--startups', type=int, default=5)
+    parser.add_argument('--tasks', type=int, default=2000)
+    parser.add_argument('--child', choices=('startup', 'requests'), help=argparse.SUPPRESS)
+    parser.add_argument('--user', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.user, args.requests)
+        return
+
+    setup_django()
+    from tasks.models import Task, TaskList
+    from benchmarks.datagen import generate
+
+    if Task.objects.count() < args.tasks:
+        generate(tasks=args.tasks)
+    user_id = TaskList.objects.order_by('id').values_list('user_id', flat=True).first()
+
+    for profile in PROFILES:
+        print(f'\n-- {profile}')
+        runs = [run_child(profile, 'startup', '--user', str(user_id)) for _ in range(args.startups)]
+        wall = statistics.median(elapsed for elapsed, _ in runs) * 1000
+        setup = statistics.median(data['setup_ms'] for _, data in runs)
+        first = statistics.median(data['first_request_ms'] for _, data in runs)
+        print(f'startup (median of {args.startups}): process {wall:.0f}ms, '
+              f'django.setup {setup:.0f}ms, first request {first:.1f}ms')
+
+        _, data = run_child(profile, 'requests', '--user', str(user_id), '--requests', str(args.requests))
+        for name in ('page', 'ajax'):
+            stats = data[name]
+            print(f'{name:5} x{args.requests}: p50 {stats["p50"]:.2f}ms  p95 {stats["p95"]:.2f}ms  '
+                  f'{stats["bytes"]:,.0f} bytes/response')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Shared setup for the benchmark scripts.
+
+Benchmarks run against their own SQLite database (``bench.sqlite3`` next to
+``manage.py`` by default, or ``$BENCH_DB``) so they never touch ``db.sqlite3``.
+"""
+import os
+import socket
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+HOST = '127.0.0.1'
+# Unmasked 32-character CSRF secret, sent both as the cookie and the header
+CSRF_TOKEN = 'b' * 32
+
+
+def setup_django(db_name=None, migrate=True):
+    """Configure Django against the benchmark database and bring its schema up to date"""
+    if str(BASE_DIR) not in sys.path:
+        sys.path.insert(0, str(BASE_DIR))
+    if db_name:
+        os.environ['BENCH_DB'] = str(db_name)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+    import django
+
+    django.setup()
+    if migrate:
+        from django.core.management import call_command
+        call_command('migrate', verbosity=0)
+
+
+@contextmanager
+def timer(label, rows=None):
+    """Print the wall time of the enclosed block, plus rows/second when given"""
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    if rows:
+        print(f'{label}: {elapsed:.3f}s ({rows / elapsed:,.0f} rows/s)')
+    else:
+        print(f'{label}: {elapsed * 1000:.2f}ms')
+
+
+def server_command(server, port, workers):
+    """Command line serving the project on HOST:port with gunicorn, uvicorn or wsgiref"""
+    if server == 'gunicorn':
+        return [sys.executable, '-m', 'gunicorn', 'todo_project.wsgi:application',
+                '--bind', f'{HOST}:{port}', '--workers', str(workers), '--threads', '8', '--log-level', 'warning']
+    if server == 'uvicorn':
+        return [sys.executable, '-m', 'uvicorn', 'todo_project.asgi:application',
+                '--host', HOST, '--port', str(port), '--workers', str(workers),
+                '--log-level', 'warning', '--no-access-log']
+    # Standard library only: one process, a thread per connection
+    return [sys.executable, '-m', 'benchmarks.serve', '--port', str(port)]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((HOST, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server on port {port} did not start')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
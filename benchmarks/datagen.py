@@ -0,0 +1,107 @@
+"""
+Synthetic data generator for benchmarks.
+
+Everything is inserted with bulk_create in batches, so seeding a million
+tasks takes seconds rather than the hours one save() per row would.
+
+Usage:
+    python -m benchmarks.datagen --users 1000 --lists-per-user 2 --fanout 5 --tasks 1000000
+"""
+import argparse
+import random
+from datetime import timedelta
+
+BATCH_SIZE = 10000
+# Vocabulary for task titles, so text search has realistic term frequencies
+VERBS = ('Review', 'Write', 'Fix', 'Plan', 'Call', 'Email', 'Update', 'Prepare', 'Book', 'Clean')
+NOUNS = (
+    'report', 'invoice', 'meeting', 'budget', 'slides', 'contract', 'roadmap', 'newsletter',
+    'dentist', 'flights', 'garage', 'backlog', 'release', 'interview', 'survey', 'database',
+)
+
+
+def generate(users=10, lists_per_user=2, tasks=1000, share_fanout=2, seed=42):
+    """
+    Create `users` users each owning `lists_per_user` TaskLists, share every
+    list with `share_fanout` other users, then spread `tasks` tasks across
+    all lists. Returns a dict with the created users and lists.
+    """
+    from django.contrib.auth.models import User
+    from django.db import transaction
+    from django.utils import timezone
+    from tasks.models import Task, TaskList
+    from tasks.stats import reconcile_counters
+
+    rng = random.Random(seed)
+    now = timezone.now()
+
+    with transaction.atomic():
+        start = User.objects.count()
+        user_objs = User.objects.bulk_create([
+            # '!' is an unusable password, which skips the hashing cost
+            User(username=f'bench{start + i}', email=f'bench{start + i}@example.com', password='!')
+            for i in range(users)
+        ], batch_size=BATCH_SIZE)
+        user_objs = list(User.objects.filter(username__in=[u.username for u in user_objs]).order_by('id'))
+
+        tasklists = TaskList.objects.bulk_create([
+            TaskList(user=user, name=f'List {j}')
+            for user in user_objs
+            for j in range(lists_per_user)
+        ], batch_size=BATCH_SIZE)
+        tasklists = list(TaskList.objects.filter(user__in=user_objs).order_by('id'))
+
+        Through = TaskList.shared_with.through
+        shares = []
+        for tasklist in tasklists:
+            others = [u for u in user_objs if u.id != tasklist.user_id]
+            for target in rng.sample(others, min(share_fanout, len(others))):
+                shares.append(Through(tasklist_id=tasklist.id, user_id=target.id))
+        Through.objects.bulk_create(shares, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+    priorities = [choice for choice, _ in Task.PRIORITY_CHOICES]
+    created = 0
+    while created < tasks:
+        batch = []
+        for i in range(created, min(created + BATCH_SIZE, tasks)):
+            tasklist = tasklists[i % len(tasklists)]
+            status = Task.COMPLETED if rng.random() < 0.3 else Task.ONGOING
+            task = Task(
+                user_id=tasklist.user_id,
+                tasklist_id=tasklist.id,
+                title=f'{rng.choice(VERBS)} {rng.choice(NOUNS)} {i}',
+                description=f'Generated task number {i} about the {rng.choice(NOUNS)}',
+                due_date=now + timedelta(minutes=rng.randint(-60 * 24 * 30, 60 * 24 * 90)),
+                priority=rng.choice(priorities),
+                status=status,
+            )
+            task.sync_derived_fields()
+            batch.append(task)
+        with transaction.atomic():
+            Task.objects.bulk_create(batch)
+        created += len(batch)
+
+    # bulk_create skips the TaskList task counters
+    reconcile_counters([tasklist.id for tasklist in tasklists])
+
+    return {'users': user_objs, 'tasklists': tasklists}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--lists-per-user', type=int, default=2)
+    parser.add_argument('--fanout', type=int, default=2, help='users each list is shared with')
+    parser.add_argument('--tasks', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    from benchmarks.common import setup_django, timer
+    setup_django()
+    with timer(f'generate {args.tasks:,} tasks', rows=args.tasks):
+        generate(users=args.users, lists_per_user=args.lists_per_user, tasks=args.tasks,
+                 share_fanout=args.fanout, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
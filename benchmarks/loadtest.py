@@ -0,0 +1,340 @@
+#!/usr/bin/env python
+"""
+Reproducible load test of the main endpoints, with stored baselines.
+
+A seeded dataset (see --scale) is generated once per scale into its own
+benchmark database. A weighted request mix then runs against it:
+  - through Django's test client, in-process and sequentially (--client test),
+    which measures the application without any server in between
+  - over HTTP against a local server (--client http), with concurrent
+    keep-alive clients for a fixed time; the server is wsgiref by default,
+    or gunicorn/uvicorn when installed (--server)
+
+Each operation reports its count, errors, p50/p95/p99 latency and mean
+queries per request (read from the Server-Timing header added by
+tasks.perf). --save-baseline NAME stores the results under
+benchmarks/baselines/; --compare NAME reports the operations whose p95
+latency or query count regressed against it and exits with status 1.
+
+Usage:
+    python -m benchmarks.loadtest --scale small --mix default --client test --requests 2000
+    python -m benchmarks.loadtest --scale medium --client http --concurrency 16 --seconds 20 --save-baseline main
+    python -m benchmarks.loadtest --scale medium --client http --concurrency 16 --seconds 20 --compare main
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from urllib.parse import urlencode
+
+from benchmarks.common import (
+    BASE_DIR, CSRF_TOKEN, HOST, free_port, server_command, setup_django, wait_for_port,
+)
+
+BASELINE_DIR = BASE_DIR / 'benchmarks' / 'baselines'
+
+# Dataset sizes: users, TaskLists per user, users each list is shared with, tasks
+SCALES = {
+    'small': {'users': 20, 'lists_per_user': 2, 'share_fanout': 3, 'tasks': 2_000},
+    'medium': {'users': 200, 'lists_per_user': 2, 'share_fanout': 5, 'tasks': 100_000},
+    'large': {'users': 1000, 'lists_per_user': 3, 'share_fanout': 10, 'tasks': 1_000_000},
+}
+
+# Relative weight of each operation in a mix
+MIXES = {
+    'read': {'task_list': 30, 'task_list_ajax': 70},
+    'default': {
+        'task_list': 20, 'task_list_ajax': 45, 'create_task': 15,
+        'delete_task': 10, 'share_tasklist': 5, 'log_error': 5,
+    },
+    'write': {'create_task': 50, 'delete_task': 40, 'share_tasklist': 10},
+}
+
+QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+# Below this p95 difference (ms) a slowdown is treated as noise
+NOISE_FLOOR_MS = 1.0
+
+
+@dataclass
+class Request:
+    name: str
+    method: str
+    path: str
+    body: bytes = b''
+    content_type: str = ''
+    ajax: bool = True
+    # Only "already shared" is an expected failure: the mix shares lists at random
+    ok_statuses: tuple = ()
+
+    def ok(self, status):
+        return status < 400 or status in self.ok_statuses
+
+
+@dataclass
+class Actor:
+    """One simulated user: its session, its lists and the tasks it created"""
+    user_id: int
+    username: str
+    session: str
+    tasklist_ids: list
+    usernames: list
+    rng: random.Random
+    created: list = field(default_factory=list)
+    events: int = 0
+
+    def next_request(self, mix):
+        name = self.rng.choices(list(mix), weights=list(mix.values()))[0]
+        if name == 'delete_task' and not self.created:
+            name = 'create_task'
+        return getattr(self, name)()
+
+    def task_list(self):
+        return Request('task_list', 'GET', '/?' + urlencode({'list': self.rng.choice(self.tasklist_ids)}), ajax=False)
+
+    def task_list_ajax(self):
+        query = urlencode({'list': self.rng.choice(self.tasklist_ids), 'status': 'all'})
+        return Request('task_list_ajax', 'GET', f'/?{query}')
+
+    def create_task(self):
+        return self._form('create_task', '/create/', {
+            'title': f'Load test task {self.rng.randrange(10**6)}', 'due_date': '2030-01-01T09:00',
+            'priority': 'medium', 'status': 'ongoing', 'tasklist': self.rng.choice(self.tasklist_ids),
+        })
+
+    def delete_task(self):
+        return self._form('delete_task', f'/delete/{self.created.pop()}/', {'confirm': '1'})
+
+    def share_tasklist(self):
+        request = self._form('share_tasklist', '/lists/share/', {
+            'tasklist_id': self.rng.choice(self.tasklist_ids),
+            'username': self.rng.choice([name for name in self.usernames if name != self.username]),
+        })
+        request.ok_statuses = (400,)
+        return request
+
+    def log_error(self):
+        self.events += 1
+        body = json.dumps({'message': f'Load test error {self.user_id}-{self.events}', 'source': 'loadtest'})
+        return Request('log_error', 'POST', '/log-error/', body.encode(), 'application/json')
+
+    def _form(self, name, path, data):
+        return Request(name, 'POST', path, urlencode(data).encode(), 'application/x-www-form-urlencoded')
+
+    def handle(self, request, status, body):
+        if request.name == 'create_task' and status == 200:
+            self.created.append(json.loads(body)['task']['id'])
+
+
+def seed(scale):
+    """Generate the scale's dataset unless its database already holds it"""
+    from django.contrib.auth.models import User
+    from benchmarks.datagen import generate
+
+    if not User.objects.filter(username__startswith='bench').exists():
+        print(f'seeding the {scale} dataset: {SCALES[scale]}')
+        generate(seed=42, **SCALES[scale])
+
+
+def make_actors(count, seed_value):
+    """`count` list owners, logged in, each with its own seeded random stream"""
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from tasks.models import TaskList
+
+    usernames = list(User.objects.filter(username__startswith='bench').order_by('id').values_list('username', flat=True))
+    owners = {}
+    for user_id, tasklist_id in TaskList.objects.order_by('user_id', 'id').values_list('user_id', 'id'):
+        owners.setdefault(user_id, []).append(tasklist_id)
+    users = User.objects.in_bulk(list(owners)[:count])
+    actors = []
+    for i, (user_id, user) in enumerate(sorted(users.items())):
+        client = Client()
+        client.force_login(user)
+        actors.append(Actor(
+            user_id=user_id, username=user.username, session=client.cookies['sessionid'].value,
+            tasklist_ids=owners[user_id], usernames=usernames, rng=random.Random(seed_value + i),
+        ))
+    return actors
+
+
+def queries_of(server_timing):
+    match = QUERIES_RE.search(server_timing or '')
+    return int(match.group(1)) if match else None
+
+
+def run_test_client(actors, mix, requests):
+    """Sequential in-process requests, round-robin over the actors"""
+    from django.test import Client
+
+    clients = []
+    for actor in actors:
+        client = Client()
+        client.cookies['sessionid'] = actor.session
+        clients.append(client)
+    samples = []
+    start = time.perf_counter()
+    for i in range(requests):
+        actor, client = actors[i % len(actors)], clients[i % len(clients)]
+        request = actor.next_request(mix)
+        began = time.perf_counter()
+        extra = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'} if request.ajax else {}
+        response = client.generic(request.method, request.path, request.body, request.content_type, **extra)
+        elapsed = (time.perf_counter() - began) * 1000
+        actor.handle(request, response.status_code, response.content)
+        samples.append((request.name, elapsed, queries_of(response.headers.get('Server-Timing')),
+                        request.ok(response.status_code)))
+    return samples, time.perf_counter() - start
+
+
+def http_worker(port, actor, mix, deadline):
+    headers = {
+        'Cookie': f'sessionid={actor.session}; csrftoken={CSRF_TOKEN}',
+        'X-CSRFToken': CSRF_TOKEN,
+    }
+    conn = http.client.HTTPConnection(HOST, port, timeout=60)
+    samples = []
+    while time.monotonic() < deadline:
+        request = actor.next_request(mix)
+        extra = {'Content-Type': request.content_type} if request.body else {}
+        if request.ajax:
+            extra['X-Requested-With'] = 'XMLHttpRequest'
+        began = time.perf_counter()
+        try:
+            conn.request(request.method, request.path, body=request.body or None, headers={**headers, **extra})
+            response = conn.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            samples.append((request.name, (time.perf_counter() - began) * 1000, None, False))
+            continue
+        elapsed = (time.perf_counter() - began) * 1000
+        actor.handle(request, response.status, body)
+        samples.append((request.name, elapsed, queries_of(response.getheader('Server-Timing')),
+                        request.ok(response.status)))
+    conn.close()
+    return samples
+
+
+def run_http(actors, mix, args, db_name):
+    port = free_port()
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'benchmarks.settings', 'BENCH_DB': str(db_name)}
+    process = subprocess.Popen(server_command(args.server, port, args.workers), cwd=BASE_DIR, env=env)
+    try:
+        wait_for_port(port)
+        deadline = time.monotonic() + args.seconds
+        with ThreadPoolExecutor(len(actors)) as pool:
+            futures = [pool.submit(http_worker, port, actor, mix, deadline) for actor in actors]
+            samples = [sample for future in futures for sample in future.result()]
+    finally:
+        process.terminate()
+        process.wait()
+    return samples, args.seconds
+
+
+def summarize(samples, elapsed):
+    # The same percentiles as the /logs/perf/ page
+    from tasks.perf import percentile
+    by_name = {}
+    for name, ms, queries, ok in samples:
+        by_name.setdefault(name, []).append((ms, queries, ok))
+    operations = {}
+    for name, rows in sorted(by_name.items()):
+        latencies = sorted(ms for ms, _, _ in rows)
+        counted = [queries for _, queries, _ in rows if queries is not None]
+        operations[name] = {
+            'count': len(rows),
+            'errors': sum(1 for _, _, ok in rows if not ok),
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'queries': sum(counted) / len(counted) if counted else None,
+        }
+    return {'throughput': len(samples) / elapsed if elapsed else 0, 'operations': operations}
+
+
+def report(results):
+    print(f'{"operation":16} {"count":>7} {"errors":>6} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"queries":>8}')
+    for name, stats in results['operations'].items():
+        queries = '-' if stats['queries'] is None else f'{stats["queries"]:.1f}'
+        print(f'{name:16} {stats["count"]:>7} {stats["errors"]:>6} {stats["p50"]:>8.2f} '
+              f'{stats["p95"]:>8.2f} {stats["p99"]:>8.2f} {queries:>8}')
+    print(f'throughput: {results["throughput"]:,.0f} requests/s')
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of `results` against a stored baseline, as readable lines"""
+    regressions = []
+    for name, stats in results['operations'].items():
+        before = baseline['operations'].get(name)
+        if before is None:
+            continue
+        if stats['p95'] > before['p95'] * (1 + tolerance) and stats['p95'] - before['p95'] > NOISE_FLOOR_MS:
+            regressions.append(f'{name}: p95 {before["p95"]:.2f}ms -> {stats["p95"]:.2f}ms')
+        if stats['queries'] is not None and before['queries'] is not None and stats['queries'] > before['queries'] + 0.5:
+            regressions.append(f'{name}: queries/request {before["queries"]:.1f} -> {stats["queries"]:.1f}')
+        if stats['errors'] > before['errors']:
+            regressions.append(f'{name}: errors {before["errors"]} -> {stats["errors"]}')
+    if results['throughput'] < baseline['throughput'] * (1 - tolerance):
+        regressions.append(f'throughput {baseline["throughput"]:,.0f} -> {results["throughput"]:,.0f} requests/s')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--mix', choices=MIXES, default='default')
+    parser.add_argument('--client', choices=('test', 'http'), default='test')
+    parser.add_argument('--requests', type=int, default=2000, help='requests sent with --client test')
+    parser.add_argument('--seconds', type=float, default=10, help='duration with --client http')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent users with --client http')
+    parser.add_argument('--server', choices=('wsgiref', 'gunicorn', 'uvicorn'), default='wsgiref')
+    parser.add_argument('--workers', type=int, default=1, help='server worker processes (gunicorn/uvicorn)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--save-baseline', metavar='NAME')
+    parser.add_argument('--compare', metavar='NAME')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed p95/throughput change (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    db_name = os.environ.get('BENCH_DB') or BASE_DIR / f'bench-{args.scale}.sqlite3'
+    setup_django(db_name=db_name)
+    seed(args.scale)
+    mix = MIXES[args.mix]
+    meta = {'scale': args.scale, 'mix': args.mix, 'client': args.client}
+    if args.client == 'test':
+        actors = make_actors(8, args.seed)
+        samples, elapsed = run_test_client(actors, mix, args.requests)
+    else:
+        meta.update(server=args.server, concurrency=args.concurrency, workers=args.workers)
+        actors = make_actors(args.concurrency, args.seed)
+        samples, elapsed = run_http(actors, mix, args, db_name)
+
+    results = {'meta': meta, **summarize(samples, elapsed)}
+    print(f'{args.mix} mix on the {args.scale} dataset via {args.client}: {meta}')
+    report(results)
+
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        path = BASELINE_DIR / f'{args.save_baseline}.json'
+        path.write_text(json.dumps(results, indent=2) + '\n')
+        print(f'baseline saved to {path}')
+    if args.compare:
+        baseline = json.loads((BASELINE_DIR / f'{args.compare}.json').read_text())
+        if baseline['meta'] != meta:
+            sys.exit(f'baseline {args.compare!r} ran with {baseline["meta"]}, not comparable with {meta}')
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f'REGRESSION {line}')
+        if regressions:
+            sys.exit(1)
+        print(f'no regressions against {args.compare!r}')
+
+
+if __name__ == '__main__':
+    main()
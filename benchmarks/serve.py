@@ -0,0 +1,40 @@
+"""
+Serve the project's WSGI application with the standard library's wsgiref,
+one thread per connection, for the HTTP benchmarks when neither gunicorn
+nor uvicorn is installed. Not for anything but local load tests.
+
+Usage:
+    python -m benchmarks.serve --port 8001
+"""
+import argparse
+import os
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from benchmarks.common import HOST
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, required=True)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+    with make_server(HOST, args.port, application, ThreadingWSGIServer, QuietHandler) as server:
+        server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Settings for benchmark runs: the project settings pointed at the benchmark
+database (``bench.sqlite3`` or ``$BENCH_DB``). Server processes started by
+the HTTP benchmarks load this module through DJANGO_SETTINGS_MODULE.
+
+``$BENCH_PROFILE`` picks the settings profile: unset runs the development
+settings with DEBUG off, ``development`` runs them unchanged and
+``production`` runs todo_project.settings_production.
+"""
+import os
+
+PROFILE = os.environ.get('BENCH_PROFILE', '')
+
+if PROFILE == 'production':
+    # The production profile requires these; benchmarks run on the local machine only
+    os.environ.setdefault('DJANGO_SECRET_KEY', 'benchmark-only-secret-key')
+    os.environ.setdefault('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1')
+    local_cache = 'DJANGO_CACHE_URL' not in os.environ
+    os.environ.setdefault('DJANGO_CACHE_URL', 'redis://127.0.0.1:6379/0')
+    from todo_project.settings_production import *  # noqa: F401,F403
+    from todo_project.settings_production import BASE_DIR, DATABASES
+    if local_cache:
+        # No cache server given: bench_settings serves from one process, where
+        # the development LocMemCache is as good as a shared one
+        from todo_project.settings import CACHES  # noqa: F811
+else:
+    from todo_project.settings import *  # noqa: F401,F403
+    from todo_project.settings import BASE_DIR, DATABASES
+
+if PROFILE != 'development':
+    DEBUG = False
+
+DATABASES['default']['NAME'] = os.environ.get('BENCH_DB', str(BASE_DIR / 'bench.sqlite3'))
+# Concurrent server workers wait for the SQLite write lock instead of failing
+DATABASES['default'].setdefault('OPTIONS', {})['timeout'] = 30
+# The test client's host, for in-process request benchmarks
+ALLOWED_HOSTS = [*ALLOWED_HOSTS, 'testserver']  # noqa: F405
+# All benchmark load comes from one address; measure /log-error/, not its limiter
+TASKS_LOG_ERROR_RATE_LIMIT = None
+# Reminder emails are kept in memory (django.core.mail.outbox), not written out
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import CharField, Value
+
+from .models import TaskList, TaskListMembership
+
+# Cache backends whose entries live in one process only
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+# Whether roles are cached across requests. Signals only invalidate the cache
+# as seen by the process that made the change, so with a per-process cache
+# other workers would keep granting revoked access; by default roles are only
+# cached in a backend all processes share (Redis, Memcached)
+ACCESS_CACHE = getattr(
+    settings, 'TASKS_ACCESS_CACHE', settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES,
+)
+# Seconds a user's list roles live in the cache (a safety net; signals invalidate them)
+ACCESS_CACHE_TIMEOUT = getattr(settings, 'TASKS_ACCESS_CACHE_TIMEOUT', 300)
+
+# Role of a list's owner; shared users have their TaskListMembership role
+# (what each role may do is in tasks.permissions)
+OWNER = 'owner'
+
+
+def _cache_key(user_id):
+    return f'tasks:tasklist_roles:{user_id}'
+
+
+def tasklist_roles(user):
+    """
+    Return {TaskList id: role} for the lists the user owns or has been shared.
+
+    The mapping is cached per user (when ACCESS_CACHE is on); tasks.signals
+    invalidates it whenever a TaskList is created/deleted or one of its
+    memberships changes. On a miss the roles come from a UNION of two index
+    lookups instead of an OR across the membership join plus DISTINCT.
+    """
+    if not ACCESS_CACHE:
+        return _collect_roles(_roles_query(user))
+    key = _cache_key(user.pk)
+    roles = cache.get(key)
+    if roles is None:
+        roles = _collect_roles(_roles_query(user))
+        cache.set(key, roles, ACCESS_CACHE_TIMEOUT)
+    return roles
+
+
+async def atasklist_roles(user):
+    """Async version of tasklist_roles() for the ASGI views"""
+    if not ACCESS_CACHE:
+        return _collect_roles([row async for row in _roles_query(user)])
+    key = _cache_key(user.pk)
+    roles = await cache.aget(key)
+    if roles is None:
+        roles = _collect_roles([row async for row in _roles_query(user)])
+        await cache.aset(key, roles, ACCESS_CACHE_TIMEOUT)
+    return roles
+
+
+def _roles_query(user):
+    owned = (
+        TaskList.objects.filter(user=user)
+        .annotate(role=Value(OWNER, output_field=CharField()))
+        .values_list('id', 'role')
+    )
+    shared = TaskListMembership.objects.filter(user=user).values_list('tasklist_id', 'role')
+    return owned.union(shared)
+
+
+def _collect_roles(rows):
+    roles = {}
+    for tasklist_id, role in rows:
+        # Ownership wins over a membership row left from before a change of owner
+        if roles.get(tasklist_id) != OWNER:
+            roles[tasklist_id] = role
+    return roles
+
+
+def invalidate_accessible_tasklists(user_ids):
+    """Drop the cached list roles of the given users"""
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
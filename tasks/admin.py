@@ -1,10 +1,16 @@
 from django.contrib import admin
-from .models import Task, TaskList
+from .models import Task, TaskList, TaskListMembership
+
+class TaskListMembershipInline(admin.TabularInline):
+    model = TaskListMembership
+    extra = 0
+    raw_id_fields = ('user',)
 
 @admin.register(TaskList)
 class TaskListAdmin(admin.ModelAdmin):
     list_display = ('name', 'user', 'created_at')
     search_fields = ('name', 'user__username')
     list_filter = ('user',)
+    inlines = [TaskListMembershipInline]
 
-admin.site.register(Task)
\ No newline at end of file
+admin.site.register(Task)
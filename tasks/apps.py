@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        # Connect the cache invalidation signal handlers
+        from . import signals  # noqa: F401
+        # Time queries on every database connection (see tasks.perf)
+        from . import perf  # noqa: F401
@@ -0,0 +1,197 @@
+"""
+Native async versions of the task list's AJAX endpoints.
+
+Under ASGI (todo_project/asgi.py) these run on the event loop and use the
+async ORM API instead of going through the sync-to-async thread adapter
+like the views in tasks/views.py. They speak JSON only; the HTML pages and
+their non-JS fallbacks stay on the sync views.
+
+task_events streams live list updates as Server-Sent Events; it holds its
+connection open and must be served by the ASGI application.
+"""
+import asyncio
+import json
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.views.decorators.http import require_POST
+
+from .events import apublish_event, get_broker, live_updates_enabled, tasklist_channel
+from .forms import BulkTaskForm
+from .models import Task, TaskList
+from .pagination import InvalidCursor, apaginate_tasks
+from .permissions import READ, WRITE, apermissions_for
+from .serializers import json_response, serialize_task, serialize_task_rows, serialize_tasks, task_values
+from .views import apply_task_sort, listing_queryset, requested_tasklist_id, task_event, update_sharing
+
+# Seconds between keep-alive comments on an idle event stream
+EVENTS_HEARTBEAT = getattr(settings, 'TASKS_EVENTS_HEARTBEAT', 15)
+
+
+@login_required
+async def task_list(request):
+    """JSON mode of views.task_list: one page of the current list's tasks"""
+    permissions = await apermissions_for(request)
+    allowed_lists = permissions.tasklist_ids(READ)
+    tasklist_id = request.GET.get('list')
+    status_filter = request.GET.get('status', 'ongoing')
+    sort_by = request.GET.get('sort', 'due_date')
+
+    if tasklist_id:
+        # Secure TaskList access: owner or shared_with
+        if not tasklist_id.isdigit() or int(tasklist_id) not in allowed_lists:
+            raise Http404('No TaskList matches the given query.')
+        current_id = int(tasklist_id)
+    else:
+        current_id = await (
+            TaskList.objects.filter(id__in=allowed_lists)
+            .order_by('created_at')
+            .values_list('id', flat=True)
+            .afirst()
+        )
+    if current_id is None:
+        return JsonResponse({'success': True, 'tasks': [], 'has_tasks': False, 'next_cursor': None})
+
+    tasks = listing_queryset(Task.objects.filter(tasklist_id=current_id))
+    if status_filter == 'completed':
+        tasks = tasks.filter(status='completed')
+    elif status_filter == 'ongoing':
+        tasks = tasks.filter(status='ongoing')
+    tasks, sort_keys = apply_task_sort(tasks, sort_by)
+    render_rows = request.GET.get('render') == 'rows'
+    if not render_rows:
+        tasks = task_values(tasks, sort_keys)
+    try:
+        tasks, next_cursor = await apaginate_tasks(tasks, sort_keys, request.GET.get('cursor'))
+    except InvalidCursor:
+        return JsonResponse({'success': False, 'error': 'Invalid cursor.'}, status=400)
+
+    tasks_data = serialize_tasks(tasks) if render_rows else serialize_task_rows(tasks)
+    data = {
+        'success': True,
+        'tasks': tasks_data,
+        'has_tasks': bool(tasks_data),
+        'next_cursor': next_cursor,
+    }
+    if render_rows:
+        # The rows are already loaded, so rendering does no database access
+        data['rows_html'] = render_to_string('tasks/_task_rows.html', {
+            'tasks': tasks,
+            'current_status_filter': status_filter,
+            'current_sort': sort_by,
+            'can_write': permissions.can(WRITE, current_id),
+        }, request=request)
+    return json_response(data)
+
+
+@login_required
+@require_POST
+async def create_task(request):
+    user = await request.auser()
+    # The list is checked against the memoized writable ids, so validation
+    # itself runs no queries and is safe on the event loop
+    form = BulkTaskForm((await apermissions_for(request)).tasklist_ids(WRITE), data=request.POST)
+    if not form.is_valid():
+        return JsonResponse({'success': False, 'errors': form.errors})
+
+    fields = {name: value for name, value in form.cleaned_data.items() if name != 'tasklist'}
+    task = await Task.objects.acreate(user=user, tasklist_id=form.cleaned_data['tasklist'], **fields)
+    task.tasklist = await TaskList.objects.only('id', 'name').aget(id=task.tasklist_id)
+    await apublish_event(task.tasklist_id, task_event('created', task))
+    return json_response({'success': True, 'task': serialize_task(task)})
+
+
+@login_required
+@require_POST
+async def delete_task(request, pk):
+    # Secure Task access: only if the user may change the tasks of its TaskList
+    permissions = await apermissions_for(request)
+    task = await (
+        permissions.tasks(WRITE).filter(pk=pk)
+        .only('id', 'tasklist_id')
+        .afirst()
+    )
+    if task is None:
+        return JsonResponse({'success': False, 'error': 'Task not found.'}, status=404)
+    tasklist_id = task.tasklist_id
+    # Model delete, so the tombstone for delta sync is written
+    await task.adelete()
+    await apublish_event(tasklist_id, {'type': 'task.deleted', 'id': pk})
+    return JsonResponse({'success': True, 'message': 'Task deleted successfully'})
+
+
+@login_required
+@require_POST
+async def share_tasklist(request):
+    # Several dependent sync ORM calls: run them together in one thread hop
+    payload, status = await sync_to_async(update_sharing)(
+        await apermissions_for(request), requested_tasklist_id(request), request.POST,
+    )
+    return JsonResponse(payload, status=status)
+
+
+def _event_row_html(request, data, status_filter, sort_by, can_write):
+    """Render the _task_rows.html row of an event's task for this subscriber (own CSRF token)"""
+    task = Task(
+        id=data['id'], title=data['title'], description=data['description'],
+        due_date=datetime.fromisoformat(data['due_date_iso']), priority=data['priority'],
+        status=data['status'], is_completed=data['is_completed'], tasklist_id=data['tasklist_id'],
+        version=data['version'],
+    )
+    task.tasklist = TaskList(id=data['tasklist_id'], name=data['tasklist'])
+    return render_to_string('tasks/_task_rows.html', {
+        'tasks': [task],
+        'current_status_filter': status_filter,
+        'current_sort': sort_by,
+        'can_write': can_write,
+    }, request=request)
+
+
+@login_required
+async def task_events(request, tasklist_id):
+    """
+    Server-Sent Events stream of one TaskList's changes.
+
+    Events: task.created / task.updated (with the task JSON, plus
+    rows_html when ?render=rows), task.deleted (id only), tasks.changed
+    after bulk changes and resync when this client fell behind; the last
+    two mean "re-fetch the list".
+    """
+    if not live_updates_enabled(request):
+        # A WSGI server would buffer the endless stream and never respond;
+        # 204 also tells EventSource not to reconnect
+        return HttpResponse(status=204)
+    permissions = await apermissions_for(request)
+    if not permissions.can(READ, tasklist_id):
+        return JsonResponse({'success': False, 'error': 'Invalid task list.'}, status=404)
+    # The role at subscription time; a changed role takes effect on reconnect
+    can_write = permissions.can(WRITE, tasklist_id)
+    render_rows = request.GET.get('render') == 'rows'
+    status_filter = request.GET.get('status', 'ongoing')
+    sort_by = request.GET.get('sort', 'due_date')
+    subscription = get_broker().subscribe(tasklist_channel(tasklist_id))
+
+    async def stream():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+                if render_rows and 'task' in event:
+                    event = {**event, 'rows_html': _event_row_html(request, event['task'], status_filter, sort_by, can_write)}
+                yield f'event: {event["type"]}\ndata: {json.dumps(event)}\n\n'
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Keep proxies such as nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,109 @@
+"""
+Change tracking for set-based task writes.
+
+Task.save() and Task.delete() stamp single-row changes with the list's
+next version (see TaskList.next_version) and move the list's task
+counters. Bulk paths that bypass them -- queryset update()/delete() and
+bulk_create() -- go through these helpers instead, which bump each
+affected list once per statement, adjust its counters in that same
+statement and write the tombstones in bulk, so delta sync and the list
+statistics see every change.
+
+Tombstones are kept for TOMBSTONE_MAX_AGE; prune_tombstones() drops older
+ones and records the newest pruned version on the list, so delta requests
+from before it are told to reload instead of missing deletes.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import Task, TaskList, TaskTombstone
+
+# How long a deleted task's tombstone is kept for delta sync
+TOMBSTONE_MAX_AGE = timedelta(days=getattr(settings, 'TASKS_TOMBSTONE_MAX_AGE_DAYS', 30))
+
+
+def stamp_new_tasks(tasks):
+    """Set the version of unsaved tasks before bulk_create (call inside its transaction)"""
+    counts = defaultdict(Counter)
+    for task in tasks:
+        counts[task.tasklist_id][Task.counter_field(task.status)] += 1
+    versions = {tasklist_id: TaskList.next_version(tasklist_id, c) for tasklist_id, c in counts.items()}
+    for task in tasks:
+        task.version = versions[task.tasklist_id]
+
+
+def update_tasks(tasks, **fields):
+    """update() a tasks queryset, stamping each affected list's rows with its next version"""
+    updated = 0
+    new_counter = Task.counter_field(fields['status']) if 'status' in fields else None
+    with transaction.atomic():
+        counts = defaultdict(Counter)
+        groups = tasks.order_by().values('tasklist_id', 'status').annotate(n=Count('id'))
+        for tasklist_id, status, n in groups.values_list('tasklist_id', 'status', 'n'):
+            deltas = counts[tasklist_id]
+            old_counter = Task.counter_field(status)
+            if new_counter and new_counter != old_counter:
+                deltas[old_counter] -= n
+                deltas[new_counter] += n
+        for tasklist_id, deltas in counts.items():
+            updated += tasks.filter(tasklist_id=tasklist_id).update(
+                version=TaskList.next_version(tasklist_id, deltas), **fields,
+            )
+    return updated
+
+
+def _bury(rows):
+    """Tombstones for (task id, list id, status) rows, one version bump per list"""
+    by_list = defaultdict(list)
+    for task_id, tasklist_id, status in rows:
+        by_list[tasklist_id].append((task_id, status))
+    tombstones = []
+    for tasklist_id, removed in by_list.items():
+        counts = Counter()
+        for _, status in removed:
+            counts[Task.counter_field(status)] -= 1
+        version = TaskList.next_version(tasklist_id, counts)
+        tombstones.extend(TaskTombstone(tasklist_id=tasklist_id, task_id=i, version=version) for i, _ in removed)
+    TaskTombstone.objects.bulk_create(tombstones)
+
+
+def move_tasks(tasks, tasklist_id):
+    """Move a tasks queryset to another list, leaving tombstones in the lists they leave"""
+    with transaction.atomic():
+        moving = list(tasks.exclude(tasklist_id=tasklist_id).values_list('id', 'tasklist_id', 'status'))
+        _bury(moving)
+        arriving = Counter(Task.counter_field(status) for _, _, status in moving)
+        return tasks.update(tasklist_id=tasklist_id, version=TaskList.next_version(tasklist_id, arriving))
+
+
+def delete_tasks(tasks):
+    """Delete a tasks queryset, leaving a tombstone per task"""
+    with transaction.atomic():
+        _bury(tasks.values_list('id', 'tasklist_id', 'status'))
+        return tasks.delete()
+
+
+def prune_tombstones(max_age=TOMBSTONE_MAX_AGE):
+    """
+    Delete tombstones older than `max_age` and return how many went.
+
+    Each list's pruned_version moves up to the newest version dropped, and
+    every tombstone up to it goes, so a delta request since an older version
+    gets a reset rather than an incomplete list of deletes.
+    """
+    cutoff = timezone.now() - max_age
+    pruned = 0
+    expired = (
+        TaskTombstone.objects.filter(deleted_at__lt=cutoff)
+        .order_by().values_list('tasklist_id').annotate(Max('version'))
+    )
+    for tasklist_id, version in expired:
+        with transaction.atomic():
+            TaskList.objects.filter(id=tasklist_id, pruned_version__lt=version).update(pruned_version=version)
+            pruned += TaskTombstone.objects.filter(tasklist_id=tasklist_id, version__lte=version).delete()[0]
+    return pruned
@@ -0,0 +1,121 @@
+"""
+Live task list updates: a publish/subscribe broker per TaskList.
+
+Views publish small events ({"type": "task.updated", "task": {...}}) once
+their transaction commits; the async SSE view in tasks.async_views
+subscribes to a list's channel and streams them to the browser.
+
+The broker class is pluggable through TASKS_EVENT_BROKER (a dotted path).
+The default InProcessBroker only reaches subscribers in the same server
+process; deployments with several ASGI workers need a backend shared by
+all of them (e.g. Redis pub/sub) implementing the same two methods:
+
+    publish(channel, event)  -- sync, non-blocking, callable from any thread
+    subscribe(channel)       -- returns an object with `async get()` and `close()`
+
+The event stream holds its connection open, which only an ASGI server can
+do without tying up a worker for good; live_updates_enabled() tells
+whether a request may use it.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+# Events buffered per subscriber before it is told to resync
+QUEUE_SIZE = getattr(settings, 'TASKS_EVENTS_QUEUE_SIZE', 100)
+RESYNC_EVENT = {'type': 'resync'}
+# Live updates can be switched off even when served over ASGI
+LIVE_UPDATES = getattr(settings, 'TASKS_LIVE_UPDATES', True)
+
+
+def live_updates_enabled(request):
+    """True if the request is served over ASGI and live updates are on"""
+    return LIVE_UPDATES and isinstance(request, ASGIRequest)
+
+
+def tasklist_channel(tasklist_id):
+    return f'tasklist:{tasklist_id}'
+
+
+class Subscription:
+    """One subscriber's bounded event queue, bound to its event loop"""
+
+    def __init__(self, broker, channel, queue_size=QUEUE_SIZE):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The subscriber's loop is gone; it will be closed on disconnect
+            pass
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A slow client misses events: tell it to re-fetch instead
+            self.overflowed = True
+
+    async def get(self):
+        if self.overflowed and self.queue.empty():
+            self.overflowed = False
+            return RESYNC_EVENT
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Fan events out to the subscribers living in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(event)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """The process-wide broker configured by TASKS_EVENT_BROKER"""
+    return import_string(getattr(settings, 'TASKS_EVENT_BROKER', 'tasks.events.InProcessBroker'))()
+
+
+def publish_event(tasklist_id, event):
+    """Publish an event to a list's subscribers after the current transaction commits"""
+    transaction.on_commit(lambda: get_broker().publish(tasklist_channel(tasklist_id), event))
+
+
+async def apublish_event(tasklist_id, event):
+    """Async views run in autocommit mode, so the change is already committed"""
+    get_broker().publish(tasklist_channel(tasklist_id), event)
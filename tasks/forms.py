@@ -21,9 +21,12 @@ class TaskForm(forms.ModelForm):
             'due_date': DateTimeInput(attrs={'type': 'datetime-local'}),
         }
     
-    def __init__(self, user=None, *args, **kwargs):
+    def __init__(self, user=None, *args, tasklist_ids=None, **kwargs):
         super().__init__(*args, **kwargs)
-        if user:
+        # Offer the lists the user may add tasks to (see tasks.permissions), else their own
+        if tasklist_ids is not None:
+            self.fields['tasklist'].queryset = TaskList.objects.filter(id__in=tasklist_ids)
+        elif user:
             self.fields['tasklist'].queryset = TaskList.objects.filter(user=user)
         
         # Style all fields with Bootstrap classes
@@ -33,6 +36,56 @@ class TaskForm(forms.ModelForm):
                     'class': 'form-control'
                 })
 
+class BulkTaskForm(forms.ModelForm):
+    """
+    Validate one task of a batch (bulk API, imports).
+
+    Same fields as TaskForm, but the list is checked against a pre-fetched
+    set of accessible TaskList ids instead of one query per row, and the
+    caller assigns instance.tasklist_id before saving.
+    """
+    tasklist = forms.IntegerField()
+
+    class Meta:
+        model = Task
+        fields = ['title', 'description', 'due_date', 'priority', 'status']
+
+    def __init__(self, allowed_tasklist_ids, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.allowed_tasklist_ids = allowed_tasklist_ids
+        # New tasks start as ongoing unless the row says otherwise
+        self.fields['status'].required = False
+
+    def clean_status(self):
+        return self.cleaned_data['status'] or Task.ONGOING
+
+    def clean_tasklist(self):
+        tasklist_id = self.cleaned_data['tasklist']
+        if tasklist_id not in self.allowed_tasklist_ids:
+            raise forms.ValidationError('Invalid task list.')
+        return tasklist_id
+
+    def rebind(self, data):
+        """
+        Re-bind this form to another row and a fresh Task instance.
+
+        Building a form deep-copies every field, which dominates the cost of
+        validating large imports; fields are stateless when cleaning, so one
+        form can validate row after row.
+        """
+        self.data = data
+        self.is_bound = True
+        self.instance = Task()
+        self._errors = None
+        return self
+
+    def save(self, commit=True):
+        task = super().save(commit=False)
+        task.tasklist_id = self.cleaned_data['tasklist']
+        if commit:
+            task.save()
+        return task
+
 class TaskListForm(forms.ModelForm):
     class Meta:
         model = TaskList
@@ -0,0 +1,55 @@
+"""
+Cached task row markup.
+
+Most cells of a task row in _task_rows.html only depend on the task
+itself, so their rendered HTML is cached per task. The key holds the
+task's id, list and version -- every change to a task stamps it with a
+new version (see tasks.changes), so an edited task simply misses the
+cache and the stale fragment expires on its own. The edit and delete
+actions only show to users who may change the list's tasks, so the key
+also says whether they were rendered. The completion cell carries the
+request's CSRF token and the current filter/sort, so it is rendered on
+every request outside the cache.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils import timezone, translation
+from django.utils.safestring import mark_safe
+
+# Seconds a rendered row lives in the cache
+ROW_CACHE_TIMEOUT = getattr(settings, 'TASKS_ROW_CACHE_TIMEOUT', 3600)
+# Bump when _task_cells.html changes so old fragments are not served
+ROW_TEMPLATE_VERSION = 2
+CELLS_TEMPLATE = 'tasks/_task_cells.html'
+
+
+def _cache_key(task, suffix):
+    return f'tasks:row:{ROW_TEMPLATE_VERSION}:{task.id}:{task.tasklist_id}:{task.version}:{suffix}'
+
+
+def task_row_cells(tasks, can_write):
+    """
+    Pair each task with the rendered HTML of its cached cells.
+
+    One get_many() fetches every row; only the misses are rendered and
+    written back with one set_many(). Tasks must have `version` loaded;
+    `can_write` says whether the user may change them (one list per call).
+    """
+    tasks = list(tasks)
+    # Due dates are rendered in the active time zone and language
+    suffix = f'{timezone.get_current_timezone_name()}:{translation.get_language()}:{"w" if can_write else "r"}'
+    keys = [_cache_key(task, suffix) for task in tasks]
+    cached = cache.get_many(keys) if tasks else {}
+    missing = {}
+    template = None
+    rows = []
+    for task, key in zip(tasks, keys):
+        html = cached.get(key)
+        if html is None:
+            template = template or get_template(CELLS_TEMPLATE)
+            html = missing[key] = template.render({'task': task, 'can_write': can_write})
+        rows.append((task, mark_safe(html)))
+    if missing:
+        cache.set_many(missing, ROW_CACHE_TIMEOUT)
+    return rows
@@ -0,0 +1,141 @@
+"""
+Streaming import and export of tasks as CSV or JSON lines.
+
+Both directions work row by row: imports validate each row with
+BulkTaskForm and insert in bulk_create batches, exports read the list with
+a chunked .iterator(), so memory stays bounded however large the file is.
+"""
+import csv
+import json
+
+from django.db import transaction
+
+from .changes import stamp_new_tasks
+from .forms import BulkTaskForm
+from .models import Task
+from .search import index_tasks
+
+FORMATS = ('csv', 'jsonl')
+TASK_FIELDS = ('title', 'description', 'due_date', 'priority', 'status')
+IMPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_SIZE = 2000
+# Only the first errors are kept so a bad 1M-row file cannot exhaust memory
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def as_dict(self):
+        return {'created': self.created, 'failed': self.failed, 'errors': self.errors}
+
+
+def guess_format(filename, default='csv'):
+    """Pick the file format from its extension"""
+    name = (filename or '').lower()
+    if name.endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    if name.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def iter_rows(stream, fmt):
+    """Yield (line number, row dict) pairs from a text stream"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line_num, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = None
+            yield line_num, row if isinstance(row, dict) else None
+    else:
+        raise ValueError(f'Unsupported format: {fmt}')
+
+
+def import_tasks(stream, fmt, tasklist, user, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Import tasks from a CSV / JSON-lines text stream into `tasklist`.
+
+    Invalid rows are reported and skipped; valid rows are inserted with one
+    bulk_create per `batch_size` rows, each batch in its own transaction.
+    """
+    result = ImportResult()
+    form = BulkTaskForm({tasklist.id})
+    batch = []
+
+    def flush():
+        with transaction.atomic():
+            stamp_new_tasks(batch)
+            Task.objects.bulk_create(batch)
+            index_tasks(batch, replace=False)
+        result.created += len(batch)
+        batch.clear()
+
+    for line, row in iter_rows(stream, fmt):
+        if row is None:
+            result.add_error(line, {'__all__': ['Invalid row.']})
+            continue
+        data = {field: row.get(field) or '' for field in TASK_FIELDS}
+        data['tasklist'] = tasklist.id
+        if not form.rebind(data).is_valid():
+            result.add_error(line, form.errors)
+            continue
+        task = form.save(commit=False)
+        task.user = user
+        task.sync_derived_fields()
+        batch.append(task)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return result
+
+
+def export_rows(tasklist, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield task dicts of a list in id order without loading the whole list"""
+    rows = (
+        Task.objects.filter(tasklist=tasklist)
+        .order_by('id')
+        .values_list(*TASK_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    for values in rows:
+        row = dict(zip(TASK_FIELDS, values))
+        row['due_date'] = row['due_date'].isoformat()
+        yield row
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def stream_export(tasklist, fmt, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the encoded lines of an export, header first for CSV"""
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(TASK_FIELDS)
+        for row in export_rows(tasklist, chunk_size):
+            yield writer.writerow([row[field] for field in TASK_FIELDS])
+    elif fmt == 'jsonl':
+        for row in export_rows(tasklist, chunk_size):
+            yield json.dumps(row) + '\n'
+    else:
+        raise ValueError(f'Unsupported format: {fmt}')
@@ -0,0 +1,167 @@
+import atexit
+import logging
+import os
+import queue
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from .logstore import archive_segment, prune_archives
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+
+class GzipRotatingFileHandler(RotatingFileHandler):
+    """
+    Rotate the log by size (max_bytes) and/or age (max_age seconds).
+
+    Closed segments become gzip archives indexed by time (see tasks.logstore);
+    only the newest backup_count archives are kept.
+
+    Every process that logs (server workers, send_reminders, the runserver
+    reloader) has its own handler on the same file, so they coordinate
+    through an flock on ``<log>.lock``: writes hold it shared, a rotation
+    holds it exclusively and re-checks the file on disk first, so each
+    segment is rotated by one process only. The others notice the new inode
+    before their next write and reopen the file instead of writing to the
+    archived one. The lock file's mtime marks the start of the segment for
+    max_age, the same for all processes.
+    """
+
+    def __init__(self, filename, mode='a', encoding='utf-8', max_bytes=0, backup_count=0, max_age=None):
+        super().__init__(filename, mode=mode, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding=encoding, delay=True)
+        self.max_age = max_age
+        self.lock_path = f'{self.baseFilename}.lock'
+        self._lock_file = open(self.lock_path, 'a')
+        self._stream_ino = None
+
+    @contextmanager
+    def _locked(self, exclusive):
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _open(self):
+        stream = super()._open()
+        self._stream_ino = os.fstat(stream.fileno()).st_ino
+        return stream
+
+    def _close_if_moved(self):
+        """Drop the stream if another process rotated the file away from under it"""
+        if self.stream is None:
+            return
+        try:
+            moved = os.stat(self.baseFilename).st_ino != self._stream_ino
+        except FileNotFoundError:
+            moved = True
+        if moved:
+            self.stream.close()
+            self.stream = None
+
+    def shouldRollover(self, record):
+        # Decided from the file on disk, which every process sees alike
+        try:
+            size = os.stat(self.baseFilename).st_size
+        except FileNotFoundError:
+            return False
+        if size == 0:
+            return False
+        if self.max_age and time.time() - os.stat(self.lock_path).st_mtime >= self.max_age:
+            return True
+        return bool(self.maxBytes) and size + len(self.format(record)) + 1 >= self.maxBytes
+
+    def emit(self, record):
+        try:
+            if self.shouldRollover(record):
+                with self._locked(exclusive=True):
+                    # Another process may have rotated while this one waited
+                    if self.shouldRollover(record):
+                        self._rotate()
+            with self._locked(exclusive=False):
+                self._close_if_moved()
+                logging.FileHandler.emit(self, record)
+        except Exception:
+            self.handleError(record)
+
+    def doRollover(self):
+        with self._locked(exclusive=True):
+            self._rotate()
+
+    def _rotate(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            # Microseconds and the pid keep names unique and sortable even for back-to-back rollovers
+            stamp = f'{datetime.now():%Y%m%d-%H%M%S-%f}-{os.getpid()}'
+            pending = f'{self.baseFilename}.{stamp}.pending'
+            os.replace(self.baseFilename, pending)
+            archive_segment(pending, f'{self.baseFilename}.{stamp}.gz', self.baseFilename)
+            os.remove(pending)
+            if self.backupCount:
+                prune_archives(self.baseFilename, self.backupCount)
+        # A new segment starts now, for every process
+        os.utime(self.lock_path)
+
+    def close(self):
+        super().close()
+        self._lock_file.close()
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    Non-blocking file handler for the LOGGING dictConfig.
+
+    Request threads only put records on an in-memory queue; a single
+    QueueListener thread owns the file handler and does the disk writes.
+    Configure it with '()': 'tasks.log_handlers.QueueListenerHandler' plus the
+    usual FileHandler arguments (Python 3.12's native 'queue' handler config
+    is not available on the versions we support). With max_bytes or max_age
+    the target rotates into compressed archives, also on the listener thread.
+    """
+
+    def __init__(self, filename, mode='a', encoding='utf-8', max_bytes=0, backup_count=0, max_age=None):
+        super().__init__(queue.SimpleQueue())
+        if max_bytes or max_age:
+            self.target = GzipRotatingFileHandler(filename, mode, encoding, max_bytes, backup_count, max_age)
+        else:
+            self.target = logging.FileHandler(filename, mode=mode, encoding=encoding, delay=True)
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.stop_listener)
+
+    def setFormatter(self, fmt):
+        # Formatting happens once, on the listener thread, by the target handler
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Merge args into the message so the record is safe to hand to another
+        # thread, but leave formatting (prefix, traceback) to the target handler
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def stop_listener(self):
+        """Flush the queue and stop the writer thread (safe to call twice)"""
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def close(self):
+        self.stop_listener()
+        self.target.close()
+        super().close()
@@ -0,0 +1,175 @@
+"""
+Bounded-memory reader for the application log.
+
+Pages are read by seeking from a byte offset (backwards from the end of the
+file for the newest/"older" pages, forwards for "newer" pages) in fixed-size
+blocks, so a page view costs one page of lines plus one block of memory no
+matter how large app.log grows.
+"""
+import logging
+import re
+from datetime import datetime
+
+BLOCK_SIZE = 64 * 1024
+PAGE_LINES = 500
+# Upper bound on bytes scanned per page when filters match few lines
+MAX_SCAN_BYTES = 64 * 1024 * 1024
+
+# Matches the 'app_formatter' format: [2025-07-13 21:00:01] ERROR - tasks: message
+LINE_RE = re.compile(r'^\[(?P<time>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] (?P<level>[A-Z]+) - (?P<logger>[^:]+): (?P<message>.*)$')
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+
+class LogFilter:
+    """
+    Server-side filter for log lines.
+
+    `level` is a minimum severity, `source` matches the logger name or the
+    "[source]" prefix written by log_error_view, `since`/`until` bound the
+    timestamp and `text` is a plain substring. Continuation lines (e.g.
+    tracebacks) have no header and only match when no filter is active.
+    """
+
+    def __init__(self, level=None, source=None, since=None, until=None, text=None):
+        self.min_level = logging.getLevelName(level) if level in LEVELS else None
+        self.source = source or None
+        self.since = since
+        self.until = until
+        self.text = text or None
+
+    @property
+    def active(self):
+        return any(v is not None for v in (self.min_level, self.source, self.since, self.until, self.text))
+
+    def parse_time(self, line):
+        match = LINE_RE.match(line)
+        return datetime.strptime(match['time'], TIME_FORMAT) if match else None
+
+    def matches(self, line):
+        if not self.active:
+            return True
+        match = LINE_RE.match(line)
+        if not match:
+            return False
+        if self.min_level is not None and logging.getLevelName(match['level']) < self.min_level:
+            return False
+        if self.source and self.source != match['logger'] and not match['message'].startswith(f'[{self.source}]'):
+            return False
+        if self.since or self.until:
+            timestamp = datetime.strptime(match['time'], TIME_FORMAT)
+            if (self.since and timestamp < self.since) or (self.until and timestamp > self.until):
+                return False
+        if self.text and self.text not in line:
+            return False
+        return True
+
+
+class LogPage:
+    def __init__(self, lines, start, end, has_older, has_newer):
+        self.lines = lines
+        # Byte offsets of the first line shown and just past the last one
+        self.start = start
+        self.end = end
+        self.has_older = has_older
+        self.has_newer = has_newer
+
+    @property
+    def text(self):
+        return '\n'.join(self.lines)
+
+
+def iter_lines_backward(f, end, block_size=BLOCK_SIZE):
+    """Yield (offset, line bytes) from `end` back to the start of the file"""
+    pos = end
+    tail = b''
+    while pos > 0:
+        read = min(block_size, pos)
+        pos -= read
+        f.seek(pos)
+        parts = (f.read(read) + tail).split(b'\n')
+        # parts[0] may be the end of a line that starts in an earlier block
+        tail = parts[0]
+        offset = pos + len(tail) + 1
+        offsets = []
+        for part in parts[1:]:
+            offsets.append(offset)
+            offset += len(part) + 1
+        for line_offset, part in zip(reversed(offsets), reversed(parts[1:])):
+            if part:
+                yield line_offset, part
+    if tail:
+        yield 0, tail
+
+
+def iter_lines_forward(f, start):
+    """Yield (offset, line bytes) from `start` to the end of the file"""
+    f.seek(start)
+    offset = start
+    for raw in f:
+        line = raw.rstrip(b'\n')
+        if line:
+            yield offset, line
+        offset += len(raw)
+
+
+def decode_line(line):
+    return line.decode('utf-8', errors='replace').rstrip('\r')
+
+
+def read_page(path, before=None, after=None, limit=PAGE_LINES, log_filter=None, max_scan=MAX_SCAN_BYTES,
+              block_size=BLOCK_SIZE):
+    """
+    Read one page of matching lines from the log at `path`.
+
+    With `after`, returns the first `limit` matches at or after that byte
+    offset ("newer"); otherwise the last `limit` matches before `before`,
+    which defaults to the end of the file ("older" / newest page).
+    """
+    log_filter = log_filter or LogFilter()
+    with open(path, 'rb') as f:
+        size = f.seek(0, 2)
+        if after is not None:
+            return _read_forward(f, size, min(max(after, 0), size), limit, log_filter, max_scan)
+        end = size if before is None else min(max(before, 0), size)
+        return _read_backward(f, size, end, limit, log_filter, max_scan, block_size)
+
+
+def _read_backward(f, size, end, limit, log_filter, max_scan, block_size=BLOCK_SIZE):
+    lines = []
+    start = end
+    has_older = False
+    for offset, raw in iter_lines_backward(f, end, block_size):
+        if len(lines) >= limit or end - offset > max_scan:
+            has_older = True
+            break
+        start = offset
+        line = decode_line(raw)
+        if log_filter.since:
+            timestamp = log_filter.parse_time(line)
+            # The log is chronological: nothing earlier can match
+            if timestamp and timestamp < log_filter.since:
+                break
+        if log_filter.matches(line):
+            lines.append(line)
+    lines.reverse()
+    return LogPage(lines, start, end, has_older, end < size)
+
+
+def _read_forward(f, size, start, limit, log_filter, max_scan):
+    lines = []
+    end = start
+    has_newer = False
+    for offset, raw in iter_lines_forward(f, start):
+        if len(lines) >= limit or offset - start > max_scan:
+            has_newer = True
+            break
+        line = decode_line(raw)
+        if log_filter.until:
+            timestamp = log_filter.parse_time(line)
+            if timestamp and timestamp > log_filter.until:
+                break
+        end = offset + len(raw) + 1
+        if log_filter.matches(line):
+            lines.append(line)
+    return LogPage(lines, start, min(end, size), start > 0, has_newer)
@@ -0,0 +1,220 @@
+"""
+Compressed log archives and their sidecar time index.
+
+On rotation the closed segment is written as ``app.log.<stamp>.gz`` made of
+independent gzip members of ~256 KiB of log text each. For every member the
+sidecar ``app.log.index`` (JSON lines) records the archive name, the
+member's byte offset in the .gz file and the first/last timestamps it
+holds. A time-range read therefore opens only the archives that overlap the
+range and seeks straight to the first relevant member; gzip readers still
+see each archive as one ordinary stream.
+"""
+import glob
+import gzip
+import json
+import os
+from collections import deque
+from datetime import datetime
+
+from .logreader import LINE_RE, TIME_FORMAT, LogPage, decode_line, iter_lines_forward
+
+MEMBER_SIZE = 256 * 1024
+
+
+def index_path(log_path):
+    return f'{log_path}.index'
+
+
+def _timestamp(line):
+    match = LINE_RE.match(line)
+    return match['time'] if match else None
+
+
+def archive_segment(src, dest, log_path, member_size=MEMBER_SIZE):
+    """Compress the closed segment `src` into `dest` and append its members to the index"""
+    entries = []
+    last_time = None
+
+    with open(src, 'rb') as f, open(dest, 'wb') as out:
+        chunk = []
+        size = 0
+        start = end = None
+
+        def write_member():
+            entries.append({'file': os.path.basename(dest), 'offset': out.tell(), 'start': start, 'end': end})
+            out.write(gzip.compress(b''.join(chunk)))
+
+        for raw in f:
+            stamp = _timestamp(decode_line(raw.rstrip(b'\n')))
+            # Continuation lines (tracebacks) carry the time of the entry they belong to
+            stamp = stamp or last_time
+            last_time = stamp
+            if start is None:
+                start = stamp
+            end = stamp or end
+            chunk.append(raw)
+            size += len(raw)
+            if size >= member_size:
+                write_member()
+                chunk, size, start, end = [], 0, None, None
+        if chunk:
+            write_member()
+
+    with open(index_path(log_path), 'a', encoding='utf-8') as index:
+        for entry in entries:
+            index.write(json.dumps(entry) + '\n')
+
+
+def load_index(log_path):
+    """Return the index entries in chronological (append) order"""
+    try:
+        with open(index_path(log_path), encoding='utf-8') as index:
+            return [json.loads(line) for line in index if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def prune_archives(log_path, keep):
+    """Delete all but the newest `keep` archives and drop them from the index"""
+    archives = sorted(glob.glob(f'{glob.escape(log_path)}.*.gz'))
+    doomed = archives[:-keep] if keep else []
+    if not doomed:
+        return
+    for path in doomed:
+        os.remove(path)
+    removed = {os.path.basename(path) for path in doomed}
+    entries = [e for e in load_index(log_path) if e['file'] not in removed]
+    tmp = index_path(log_path) + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as index:
+        for entry in entries:
+            index.write(json.dumps(entry) + '\n')
+    os.replace(tmp, index_path(log_path))
+
+
+def _overlaps(entry, since, until):
+    if entry['end'] is not None and since and entry['end'] < since:
+        return False
+    if entry['start'] is not None and until and entry['start'] > until:
+        return False
+    return True
+
+
+def _iter_archive_lines(path, offset):
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        with gzip.GzipFile(fileobj=f) as gz:
+            for raw in gz:
+                yield raw.rstrip(b'\n')
+
+
+def iter_range(log_path, since=None, until=None):
+    """
+    Yield decoded log lines with timestamps in [since, until] (datetimes),
+    oldest first, across the archives and the active file.
+    """
+    since_s = since.strftime(TIME_FORMAT) if since else None
+    until_s = until.strftime(TIME_FORMAT) if until else None
+
+    # First overlapping member of each archive, in archive order
+    starts = {}
+    for entry in load_index(log_path):
+        if _overlaps(entry, since_s, until_s) and entry['file'] not in starts:
+            starts[entry['file']] = entry['offset']
+    directory = os.path.dirname(log_path)
+    sources = [_iter_archive_lines(os.path.join(directory, name), offset) for name, offset in starts.items()]
+    if os.path.exists(log_path):
+        sources.append(raw for _, raw in _iter_active_lines(log_path))
+
+    included = False
+    for source in sources:
+        for raw in source:
+            line = decode_line(raw)
+            stamp = _timestamp(line)
+            if stamp is None:
+                # Continuation line: follows the entry it belongs to
+                if included:
+                    yield line
+                continue
+            if until_s and stamp > until_s:
+                return
+            included = not since_s or stamp >= since_s
+            if included:
+                yield line
+
+
+def _iter_active_lines(log_path):
+    with open(log_path, 'rb') as f:
+        yield from iter_lines_forward(f, 0)
+
+
+def active_log_start(log_path):
+    """Timestamp of the first entry in the active (uncompressed) log file"""
+    try:
+        with open(log_path, 'rb') as f:
+            for _, raw in iter_lines_forward(f, 0):
+                stamp = _timestamp(decode_line(raw))
+                if stamp:
+                    return datetime.strptime(stamp, TIME_FORMAT)
+    except FileNotFoundError:
+        pass
+    return None
+
+
+def needs_archives(log_path, since):
+    """
+    True if a range starting at `since` begins before the active file does,
+    or, without `since`, if the log only exists in archives (e.g. right after
+    a rotation, before anything new is written)
+    """
+    if (since is None and os.path.exists(log_path)) or not load_index(log_path):
+        return False
+    start = active_log_start(log_path)
+    return start is None or since < start
+
+
+def read_range_page(log_path, log_filter, limit):
+    """
+    First `limit` lines of the filter's time range, read from the archives
+    onward; without `since`, the last `limit` lines of the log instead
+    """
+    if log_filter.since is None:
+        return _read_newest_page(log_path, log_filter, limit)
+    lines = []
+    has_more = False
+    for line in iter_range(log_path, log_filter.since, log_filter.until):
+        if not log_filter.matches(line):
+            continue
+        if len(lines) >= limit:
+            has_more = True
+            break
+        lines.append(line)
+    return LogPage(lines, None, None, False, has_more)
+
+
+def _read_newest_page(log_path, log_filter, limit):
+    # Newest source first: the active file, then the archives from the latest
+    # back, each read whole (they are bounded by max_bytes) keeping only its
+    # last matches, until the page is full
+    sources = [(raw for _, raw in _iter_active_lines(log_path))] if os.path.exists(log_path) else []
+    directory = os.path.dirname(log_path)
+    archives = list(dict.fromkeys(entry['file'] for entry in load_index(log_path)))
+    sources += [_iter_archive_lines(os.path.join(directory, name), 0) for name in reversed(archives)]
+
+    lines = []
+    has_more = False
+    for source in sources:
+        if len(lines) >= limit:
+            has_more = True
+            break
+        matches = deque(maxlen=limit - len(lines))
+        seen = 0
+        for raw in source:
+            line = decode_line(raw)
+            if log_filter.matches(line):
+                matches.append(line)
+                seen += 1
+        has_more = seen > len(matches)
+        lines[:0] = matches
+        if has_more:
+            break
+    return LogPage(lines, None, None, has_more, False)
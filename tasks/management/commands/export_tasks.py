@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.importexport import EXPORT_CHUNK_SIZE, FORMATS, guess_format, stream_export
+from tasks.models import TaskList
+
+
+class Command(BaseCommand):
+    help = 'Export the tasks of a task list as CSV or JSON lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--list', type=int, required=True, dest='tasklist_id', help='TaskList id to export')
+        parser.add_argument('--output', '-o', help='Output file (default: stdout)')
+        parser.add_argument('--format', choices=FORMATS, help='File format (default: from the output extension, else csv)')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help='Rows fetched per query chunk')
+
+    def handle(self, *args, **options):
+        try:
+            tasklist = TaskList.objects.get(id=options['tasklist_id'])
+        except TaskList.DoesNotExist:
+            raise CommandError(f"TaskList {options['tasklist_id']} does not exist.")
+        fmt = options['format'] or guess_format(options['output'])
+        lines = stream_export(tasklist, fmt, chunk_size=options['chunk_size'])
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as out:
+                out.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,33 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.importexport import FORMATS, IMPORT_BATCH_SIZE, guess_format, import_tasks
+from tasks.models import TaskList
+
+
+class Command(BaseCommand):
+    help = 'Import tasks from a CSV or JSON-lines file into a task list.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import')
+        parser.add_argument('--list', type=int, required=True, dest='tasklist_id', help='Destination TaskList id')
+        parser.add_argument('--format', choices=FORMATS, help='File format (default: from the file extension)')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='Rows per bulk insert')
+
+    def handle(self, *args, **options):
+        try:
+            tasklist = TaskList.objects.select_related('user').get(id=options['tasklist_id'])
+        except TaskList.DoesNotExist:
+            raise CommandError(f"TaskList {options['tasklist_id']} does not exist.")
+        fmt = options['format'] or guess_format(options['path'])
+
+        with open(options['path'], encoding='utf-8', newline='') as stream:
+            # Imported tasks belong to the list owner
+            result = import_tasks(stream, fmt, tasklist, tasklist.user, batch_size=options['batch_size'])
+
+        for error in result.errors:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result.created} tasks into "{tasklist.name}" ({result.failed} rows rejected).'
+        ))
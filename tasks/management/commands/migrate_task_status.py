@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from tasks.changes import update_tasks
+from tasks.models import Task
+
+STATUS_BATCH_SIZE = 1000
+
+
+def status_distribution():
+    """{status: task count} from a single GROUP BY query"""
+    rows = Task.objects.order_by().values('status').annotate(count=Count('id')).order_by('status')
+    return {row['status']: row['count'] for row in rows}
+
+
+class Command(BaseCommand):
+    help = (
+        'Move every task from one status to another in primary-key batches, '
+        'each in its own short transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='from_status', required=True, help='Status to migrate away from (may be a retired one)')
+        parser.add_argument('--to', dest='to_status', required=True, choices=Task.STATUS_RANKS, help='New status')
+        parser.add_argument('--batch-size', type=int, default=STATUS_BATCH_SIZE, help='Tasks updated per transaction')
+        parser.add_argument('--sleep', type=float, default=0, help='Seconds to pause between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would change')
+
+    def handle(self, *args, **options):
+        from_status, to_status = options['from_status'], options['to_status']
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        if from_status == to_status:
+            raise CommandError('--from and --to are the same status.')
+
+        before = status_distribution()
+        total = before.get(from_status, 0)
+        self.stdout.write(f"Found {total} tasks with '{from_status}' status")
+        if options['dry_run']:
+            self.stdout.write(f"Dry run: {total} tasks would move to '{to_status}' in batches of {batch_size}")
+            self.write_distribution(before)
+            return
+
+        fields = Task.status_fields(to_status)
+        pending = Task.objects.filter(status=from_status)
+        updated = batch = last_pk = 0
+        while True:
+            # Walk the primary key so each batch is an index range, not a rescan
+            ids = list(pending.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            last_pk = ids[-1]
+            # update_tasks() bumps the list versions so delta sync clients see the change
+            updated += update_tasks(pending.filter(pk__in=ids), **fields)
+            batch += 1
+            if options['verbosity'] >= 1:
+                self.stdout.write(f'  batch {batch}: {updated}/{total} updated (up to id {last_pk})')
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f"Updated {updated} tasks to '{to_status}' status"))
+        self.write_distribution(status_distribution())
+
+    def write_distribution(self, distribution):
+        self.stdout.write('\nCurrent task status distribution:')
+        for status, count in distribution.items():
+            self.stdout.write(f'  {status}: {count} tasks')
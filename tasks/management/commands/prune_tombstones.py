@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.changes import TOMBSTONE_MAX_AGE, prune_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete the delta sync tombstones of deleted or moved tasks older than '
+        '--max-age-days. Clients syncing from before them are told to reload.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age-days', type=float, default=TOMBSTONE_MAX_AGE.total_seconds() / 86400,
+            help='Days a tombstone is kept',
+        )
+
+    def handle(self, *args, **options):
+        if options['max_age_days'] < 0:
+            raise CommandError('--max-age-days must not be negative.')
+        pruned = prune_tombstones(timedelta(days=options['max_age_days']))
+        self.stdout.write(self.style.SUCCESS(f'{pruned} tombstones pruned.'))
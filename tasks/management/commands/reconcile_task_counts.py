@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tasks.stats import counter_drift, reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the task lists' open/completed task counters from the tasks table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--list', type=int, action='append', dest='tasklist_ids', help='Only this TaskList id (repeatable)')
+        parser.add_argument('--dry-run', action='store_true', help='Only report the lists whose counters are off')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            drift = counter_drift(options['tasklist_ids'])
+        else:
+            with transaction.atomic():
+                drift = reconcile_counters(options['tasklist_ids'])
+        for tasklist_id, (open_count, completed_count), (actual_open, actual_completed) in drift:
+            self.stdout.write(
+                f'  list {tasklist_id}: open {open_count} -> {actual_open}, completed {completed_count} -> {actual_completed}'
+            )
+        verb = 'would be fixed' if options['dry_run'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f'{len(drift)} task lists {verb}.'))
@@ -0,0 +1,58 @@
+import signal
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from tasks.reminders import BATCH_SIZE, LEAD_TIME, run_reminders
+
+REMINDER_INTERVAL = getattr(settings, 'TASKS_REMINDER_INTERVAL', 60)
+
+
+class Command(BaseCommand):
+    help = (
+        'Send due-soon and overdue task reminders. Runs as a worker loop, one pass '
+        'every --interval seconds, until interrupted; --once runs a single pass.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run one pass and exit')
+        parser.add_argument('--interval', type=float, default=REMINDER_INTERVAL, help='Seconds between passes')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Tasks read and delivered per batch')
+        parser.add_argument(
+            '--lead-minutes', type=float, default=LEAD_TIME.total_seconds() / 60,
+            help='Minutes before the due date a due-soon reminder goes out',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        if options['interval'] <= 0:
+            raise CommandError('--interval must be positive.')
+        self.verbosity = options['verbosity']
+        kwargs = {
+            'batch_size': options['batch_size'],
+            'lead_time': timedelta(minutes=options['lead_minutes']),
+        }
+        if options['once']:
+            self.run_pass(kwargs)
+            return
+
+        # SIGTERM/SIGINT end the loop after the current pass
+        stop = threading.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: stop.set())
+        self.stdout.write(f"Sending reminders every {options['interval']:g}s (Ctrl-C to stop)")
+        while not stop.is_set():
+            # Long-running process: drop connections that are broken or past CONN_MAX_AGE
+            close_old_connections()
+            self.run_pass(kwargs)
+            stop.wait(options['interval'])
+        self.stdout.write('Stopped')
+
+    def run_pass(self, kwargs):
+        for kind, (scanned, sent) in run_reminders(**kwargs).items():
+            if scanned or self.verbosity >= 2:
+                self.stdout.write(f'{kind}: {scanned} tasks, {sent} reminders sent')
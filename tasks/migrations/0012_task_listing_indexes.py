@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_tasklist_shared_with'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['tasklist', 'status', 'due_date'], name='task_list_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['tasklist', 'priority'], name='task_list_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasklist',
+            index=models.Index(fields=['user', 'created_at'], name='tasklist_user_created_idx'),
+        ),
+        # Reverse lookup for Q(shared_with=user): the auto-created M2M table only
+        # has a unique (tasklist_id, user_id) index, which cannot serve user_id first
+        migrations.RunSQL(
+            sql='CREATE INDEX tasklist_shared_user_idx ON tasks_tasklist_shared_with (user_id, tasklist_id);',
+            reverse_sql='DROP INDEX tasklist_shared_user_idx;',
+        ),
+    ]
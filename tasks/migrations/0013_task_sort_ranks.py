@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+# Frozen copies of Task.PRIORITY_RANKS / Task.STATUS_RANKS at the time of this migration
+PRIORITY_RANKS = {'high': 0, 'medium': 1, 'low': 2}
+STATUS_RANKS = {'ongoing': 0, 'completed': 1}
+
+
+def backfill_sort_ranks(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    # One set-based UPDATE per value instead of a save() per row
+    for priority, rank in PRIORITY_RANKS.items():
+        Task.objects.filter(priority=priority).update(priority_rank=rank)
+    for status, rank in STATUS_RANKS.items():
+        Task.objects.filter(status=status).update(status_rank=rank)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0012_task_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='priority_rank',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='status_rank',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_sort_ranks, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_list_priority_idx',
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['tasklist', 'status', 'priority_rank'], name='task_list_status_prio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['tasklist', 'priority_rank'], name='task_list_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['tasklist', 'status_rank'], name='task_list_status_rank_idx'),
+        ),
+    ]
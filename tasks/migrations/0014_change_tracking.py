@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0013_task_sort_ranks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tasklist',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tasklist',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['tasklist', 'version'], name='task_list_version_idx'),
+        ),
+        migrations.CreateModel(
+            name='TaskTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('version', models.PositiveBigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('tasklist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to='tasks.tasklist')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tasklist', 'version'], name='tombstone_list_version_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:40
+
+from django.db import migrations
+
+# Kept in sync with tasks.search.FTS_TABLE
+FTS_TABLE = 'tasks_task_fts'
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 is SQLite-only; other backends use the icontains fallback in tasks.search
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(title, description, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        f'INSERT INTO {FTS_TABLE} (rowid, title, description) SELECT id, title, description FROM tasks_task'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0014_change_tracking'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:30
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_tasks(apps, schema_editor):
+    # Same counts as tasks.stats.reconcile_counters(), with the historical models
+    Task = apps.get_model('tasks', 'Task')
+    TaskList = apps.get_model('tasks', 'TaskList')
+    tasks = Task.objects.filter(tasklist=OuterRef('pk')).order_by().values('tasklist')
+    TaskList.objects.update(
+        open_count=Coalesce(Subquery(tasks.exclude(status='completed').annotate(n=Count('id')).values('n')), 0),
+        completed_count=Coalesce(Subquery(tasks.filter(status='completed').annotate(n=Count('id')).values('n')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0015_task_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tasklist',
+            name='completed_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tasklist',
+            name='open_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_tasks, migrations.RunPython.noop),
+    ]
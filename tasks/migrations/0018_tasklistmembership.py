@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    """
+    Turn TaskList.shared_with into an explicit TaskListMembership model.
+
+    The model first takes over the auto-created M2M table as it is (state
+    only), then the table is renamed, the (user_id, tasklist_id) index made
+    by hand in 0012 is replaced by a model index and the role is added.
+    Existing shares become editors, which is what they could do before.
+    """
+
+    dependencies = [
+        ('tasks', '0017_reminders'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='TaskListMembership',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('tasklist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='tasks.tasklist')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tasklist_memberships', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'tasks_tasklist_shared_with',
+                        'unique_together': {('tasklist', 'user')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='tasklist',
+                    name='shared_with',
+                    field=models.ManyToManyField(blank=True, related_name='shared_tasklists', through='tasks.TaskListMembership', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        migrations.RunSQL(
+            sql='DROP INDEX tasklist_shared_user_idx;',
+            reverse_sql='CREATE INDEX tasklist_shared_user_idx ON tasks_tasklist_shared_with (user_id, tasklist_id);',
+        ),
+        migrations.AlterModelTable(
+            name='tasklistmembership',
+            table=None,
+        ),
+        migrations.AddField(
+            model_name='tasklistmembership',
+            name='role',
+            field=models.CharField(choices=[('editor', 'Editor'), ('viewer', 'Viewer')], default='editor', max_length=6),
+        ),
+        migrations.AddIndex(
+            model_name='tasklistmembership',
+            index=models.Index(fields=['user', 'tasklist'], name='tasklist_member_user_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+# Kept in sync with tasks.search.FTS_TABLE
+FTS_TABLE = 'tasks_task_fts'
+TRIGGER = 'tasks_task_fts_delete'
+
+
+def create_delete_trigger(apps, schema_editor):
+    # Deleting tasks (one, a queryset or a whole list's by cascade) drops their
+    # index entries in the same statement, so Task needs no post_delete signal
+    # and Django keeps its fast, set-based delete
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f'CREATE TRIGGER {TRIGGER} AFTER DELETE ON tasks_task '
+        f'BEGIN DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END'
+    )
+    # Entries left behind by deletes that bypassed the old signal (e.g. cascades)
+    schema_editor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid NOT IN (SELECT id FROM tasks_task)')
+
+
+def drop_delete_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TRIGGER IF EXISTS {TRIGGER}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0018_tasklistmembership'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_delete_trigger, drop_delete_trigger),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0019_search_delete_trigger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tasklist',
+            name='pruned_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='tasktombstone',
+            index=models.Index(fields=['deleted_at'], name='tombstone_deleted_at_idx'),
+        ),
+    ]
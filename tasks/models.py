@@ -1,5 +1,7 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 # 🎯 Create your models here.
 
@@ -7,16 +9,64 @@ class TaskList(models.Model):
     name = models.CharField(max_length=100)
     created_at = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tasklists')
-    shared_with = models.ManyToManyField(User, related_name='shared_tasklists', blank=True)
+    shared_with = models.ManyToManyField(User, through='TaskListMembership', related_name='shared_tasklists', blank=True)
+    # 🔁 Change counter bumped by every change to the list's tasks (delta sync watermark)
+    version = models.PositiveBigIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(default=timezone.now, editable=False)
+    # 🪦 Newest tombstone version pruned (see tasks.changes.prune_tombstones); older watermarks must reload
+    pruned_version = models.PositiveBigIntegerField(default=0, editable=False)
+    # 🧮 Task counters kept in step with every task write (see Task.counter_field)
+    open_count = models.IntegerField(default=0, editable=False)
+    completed_count = models.IntegerField(default=0, editable=False)
 
     class Meta:
         unique_together = ('user', 'name')
+        indexes = [
+            # Sidebar: lists owned by a user in creation order
+            models.Index(fields=['user', 'created_at'], name='tasklist_user_created_idx'),
+        ]
         verbose_name = 'Task List'
         verbose_name_plural = 'Task Lists'
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def next_version(cls, tasklist_id, counts=None):
+        """
+        Bump a list's change counter and return the new value.
+
+        Call inside the transaction that makes the change: the UPDATE locks
+        the list row until commit, so versions are handed out in commit order.
+        `counts` adjusts the task counters in the same statement, e.g.
+        {'open_count': -1, 'completed_count': 1}.
+        """
+        counters = {name: F(name) + delta for name, delta in (counts or {}).items() if delta}
+        cls.objects.filter(id=tasklist_id).update(version=F('version') + 1, updated_at=timezone.now(), **counters)
+        return cls.objects.filter(id=tasklist_id).values_list('version', flat=True).get()
+
+class TaskListMembership(models.Model):
+    # 🤝 A user a list is shared with, and what they may do with its tasks
+    EDITOR = 'editor'
+    VIEWER = 'viewer'
+    ROLE_CHOICES = [
+        (EDITOR, 'Editor'),
+        (VIEWER, 'Viewer'),
+    ]
+    tasklist = models.ForeignKey(TaskList, on_delete=models.CASCADE, related_name='memberships')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tasklist_memberships')
+    role = models.CharField(max_length=6, choices=ROLE_CHOICES, default=EDITOR)
+
+    class Meta:
+        unique_together = ('tasklist', 'user')
+        indexes = [
+            # Access checks: the lists shared with a user, with their roles
+            models.Index(fields=['user', 'tasklist'], name='tasklist_member_user_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} is {self.role} of list {self.tasklist_id}'
+
 class Task(models.Model):
     # 👤 User who owns this task
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tasks')
@@ -36,6 +86,10 @@ class Task(models.Model):
         (ONGOING, 'Ongoing'),
         (COMPLETED, 'Completed'),
     ]
+    # 🔢 Integer sort ranks stored alongside priority/status so sorting is an index scan;
+    # values outside the choices (legacy rows, e.g. 'not_started') rank 0, as 0013 left them
+    PRIORITY_RANKS = {HIGH: 0, MEDIUM: 1, LOW: 2}
+    STATUS_RANKS = {ONGOING: 0, COMPLETED: 1}
     # 📝 Task details: title, description, due date, priority, status, and completion status
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
@@ -44,12 +98,139 @@ class Task(models.Model):
     status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=ONGOING)
     is_completed = models.BooleanField(default=False)
     tasklist = models.ForeignKey('TaskList', on_delete=models.CASCADE, related_name='tasks')
+    # Denormalized from priority/status, kept in sync by save() and status_fields()
+    priority_rank = models.PositiveSmallIntegerField(editable=False)
+    status_rank = models.PositiveSmallIntegerField(editable=False)
+    # 🔁 TaskList.version at this task's last change
+    version = models.PositiveBigIntegerField(default=0, editable=False)
 
-    def save(self, *args, **kwargs):
-        # 🔄 Automatically update is_completed based on status
+    class Meta:
+        indexes = [
+            # task_list: filter on (tasklist, status), ordered by due date
+            models.Index(fields=['tasklist', 'status', 'due_date'], name='task_list_status_due_idx'),
+            # task_list: filter on (tasklist, status), ordered by priority
+            models.Index(fields=['tasklist', 'status', 'priority_rank'], name='task_list_status_prio_idx'),
+            # task_list: all statuses, ordered by priority or status
+            models.Index(fields=['tasklist', 'priority_rank'], name='task_list_priority_idx'),
+            models.Index(fields=['tasklist', 'status_rank'], name='task_list_status_rank_idx'),
+            # Delta sync: tasks of a list changed since a version
+            models.Index(fields=['tasklist', 'version'], name='task_list_version_idx'),
+            # Reminders: open tasks in a due date window, across all lists
+            models.Index(fields=['status', 'due_date'], name='task_status_due_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the list the task was loaded from, so save() can record a move
+        instance._loaded_tasklist_id = instance.__dict__.get('tasklist_id')
+        # ... and its status, so save() can move it between the list's counters
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
+    @classmethod
+    def counter_field(cls, status):
+        """The TaskList counter a task with this status counts towards"""
+        return 'completed_count' if status == cls.COMPLETED else 'open_count'
+
+    @classmethod
+    def status_fields(cls, status):
+        """Column values to pass to a bulk update() that changes the status"""
+        return {
+            'status': status,
+            'status_rank': cls.STATUS_RANKS.get(status, 0),
+            'is_completed': status == cls.COMPLETED,
+        }
+
+    def sync_derived_fields(self):
+        """Recompute the columns derived from priority and status (also needed before bulk_create)"""
         self.is_completed = (self.status == self.COMPLETED)
-        super().save(*args, **kwargs)
+        self.priority_rank = self.PRIORITY_RANKS.get(self.priority, 0)
+        self.status_rank = self.STATUS_RANKS.get(self.status, 0)
+
+    def save(self, *args, **kwargs):
+        # 🔄 Automatically update is_completed and the sort ranks based on status/priority
+        self.sync_derived_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'status' in update_fields:
+                update_fields |= {'is_completed', 'status_rank'}
+            if 'priority' in update_fields:
+                update_fields.add('priority_rank')
+            update_fields.add('version')
+            kwargs['update_fields'] = update_fields
+        # 🧮 Only a new task or a change of status/list moves the list counters
+        counted = update_fields is None or bool({'status', 'tasklist'} & update_fields)
+        with transaction.atomic():
+            old_counter = None
+            if counted and not self._state.adding:
+                old_counter = self.counter_field(self._stored_status())
+            new_counter = self.counter_field(self.status) if counted else None
+            # 🔁 Stamp the change with the list's next version; a move leaves a tombstone behind
+            old_tasklist_id = getattr(self, '_loaded_tasklist_id', None)
+            counts = {}
+            if old_tasklist_id and old_tasklist_id != self.tasklist_id:
+                TaskTombstone.objects.create(
+                    tasklist_id=old_tasklist_id, task_id=self.pk,
+                    version=TaskList.next_version(old_tasklist_id, {old_counter: -1} if old_counter else None),
+                )
+                if new_counter:
+                    counts[new_counter] = 1
+            elif old_counter != new_counter:
+                counts[new_counter] = 1
+                if old_counter:
+                    counts[old_counter] = -1
+            self.version = TaskList.next_version(self.tasklist_id, counts)
+            super().save(*args, **kwargs)
+            self._loaded_tasklist_id = self.tasklist_id
+            if counted:
+                self._loaded_status = self.status
+
+    def _stored_status(self):
+        """The status the database holds for this task (loaded with it, else queried)"""
+        status = getattr(self, '_loaded_status', None)
+        if status is None:
+            status = Task.objects.filter(pk=self.pk).values_list('status', flat=True).first()
+        return status
+
+    def delete(self, *args, **kwargs):
+        # 🪦 Leave a tombstone so delta sync clients learn about the delete
+        with transaction.atomic():
+            TaskTombstone.objects.create(
+                tasklist_id=self.tasklist_id, task_id=self.pk,
+                version=TaskList.next_version(self.tasklist_id, {self.counter_field(self._stored_status()): -1}),
+            )
+            return super().delete(*args, **kwargs)
 
     def __str__(self):
         # 🏷️ Return the task title when converting to string
         return self.title
+
+class TaskTombstone(models.Model):
+    # 🪦 A task deleted from (or moved out of) a list, kept for delta sync
+    tasklist = models.ForeignKey(TaskList, on_delete=models.CASCADE, related_name='tombstones')
+    task_id = models.BigIntegerField()
+    version = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['tasklist', 'version'], name='tombstone_list_version_idx'),
+            # Pruning: tombstones past the retention age
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'Task {self.task_id} removed from list {self.tasklist_id}'
+
+class ReminderWatermark(models.Model):
+    # ⏰ How far the reminder scheduler has got, per kind of reminder
+    kind = models.CharField(max_length=20, unique=True)
+    # Last task processed, in (due_date, task_id) order
+    due_date = models.DateTimeField()
+    task_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.kind} reminders up to {self.due_date:%Y-%m-%d %H:%M} (task {self.task_id})'
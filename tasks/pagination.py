@@ -0,0 +1,123 @@
+import base64
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+from .models import Task
+
+# Number of tasks returned per page in the task list and its AJAX mode
+PAGE_SIZE = 50
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client-supplied cursor cannot be decoded."""
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """JSON encoder that keeps full microsecond precision for datetimes"""
+
+    def default(self, o):
+        # DjangoJSONEncoder truncates to milliseconds, which would make the
+        # keyset comparison skip or repeat rows with close due dates
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values):
+    """Encode the sort key values of the last row on a page into an opaque cursor"""
+    payload = json.dumps(values, cls=CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort_keys):
+    """
+    Decode a cursor produced by encode_cursor() back into typed sort key values.
+
+    Values for concrete Task fields go through the field's to_python() so that
+    e.g. due_date comes back as a datetime; annotation values are kept as-is.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise InvalidCursor('Malformed cursor.')
+    if not isinstance(values, list) or len(values) != len(sort_keys):
+        raise InvalidCursor('Cursor does not match the current sort order.')
+
+    decoded = []
+    for key, value in zip(sort_keys, values):
+        # Sort keys are never NULL, and only scalars can be compared against
+        if value is None or isinstance(value, (list, dict)):
+            raise InvalidCursor('Malformed cursor.')
+        try:
+            field = Task._meta.get_field(key)
+        except FieldDoesNotExist:
+            decoded.append(value)
+            continue
+        try:
+            # to_python() raises TypeError/ValueError on some wrongly typed input
+            # (e.g. a number for a datetime), not only ValidationError; the
+            # validators keep integers within what the database can compare
+            value = field.to_python(value)
+            field.run_validators(value)
+        except (ValidationError, TypeError, ValueError):
+            raise InvalidCursor('Malformed cursor.')
+        decoded.append(value)
+    return decoded
+
+
+def keyset_filter(sort_keys, values):
+    """
+    Build the "rows after this one" condition for an ascending keyset.
+
+    For keys (a, b, id) this is: a > va OR (a = va AND b > vb) OR (a = va AND b = vb AND id > vid)
+    """
+    condition = Q()
+    for i, key in enumerate(sort_keys):
+        branch = Q(**{f'{key}__gt': values[i]})
+        for prev_key, prev_value in zip(sort_keys[:i], values[:i]):
+            branch &= Q(**{prev_key: prev_value})
+        condition |= branch
+    return condition
+
+
+def _page_queryset(tasks, sort_keys, cursor, page_size):
+    tasks = tasks.order_by(*sort_keys)
+    if cursor:
+        tasks = tasks.filter(keyset_filter(sort_keys, decode_cursor(cursor, sort_keys)))
+    # Fetch one extra row to know whether another page exists
+    return tasks[:page_size + 1]
+
+
+def _split_page(rows, sort_keys, page_size):
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        # Rows are Task instances, or dicts for .values() querysets
+        if isinstance(last, dict):
+            next_cursor = encode_cursor([last[key] for key in sort_keys])
+        else:
+            next_cursor = encode_cursor([getattr(last, key) for key in sort_keys])
+    return rows, next_cursor
+
+
+def paginate_tasks(tasks, sort_keys, cursor=None, page_size=PAGE_SIZE):
+    """
+    Return one page of an ordered tasks queryset and the cursor for the next page.
+
+    `sort_keys` must end with a unique column (the task id) so that the
+    ordering is total; the queryset is re-ordered by these keys. Returns a
+    tuple (page, next_cursor) where next_cursor is None on the last page.
+    """
+    return _split_page(list(_page_queryset(tasks, sort_keys, cursor, page_size)), sort_keys, page_size)
+
+
+async def apaginate_tasks(tasks, sort_keys, cursor=None, page_size=PAGE_SIZE):
+    """Async version of paginate_tasks() for the ASGI views"""
+    rows = [task async for task in _page_queryset(tasks, sort_keys, cursor, page_size)]
+    return _split_page(rows, sort_keys, page_size)
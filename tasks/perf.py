@@ -0,0 +1,226 @@
+"""
+Per-request performance instrumentation.
+
+PerfMiddleware measures each request's wall time, database queries (count
+and time), template render time and response size, and reports them three
+ways:
+
+  - a Server-Timing header, shown by the browser's network panel
+  - a key=value line on the tasks.perf logger (WARNING past TASKS_PERF_SLOW_MS)
+  - a per-process ring buffer that the staff page /logs/perf/ aggregates
+    into p50/p95/p99 latency per URL name
+
+Query timing is an execute wrapper installed on every database connection;
+template timing needs the TimedDjangoTemplates backend in TEMPLATES. Both
+only record while a request is being measured, tracked in a context
+variable so they work for sync and async views alike.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger('tasks.perf')
+
+# Requests kept per process for the percentiles page
+BUFFER_SIZE = getattr(settings, 'TASKS_PERF_BUFFER_SIZE', 5000)
+# Requests slower than this (milliseconds) are logged as warnings
+SLOW_MS = getattr(settings, 'TASKS_PERF_SLOW_MS', 500)
+
+_current = ContextVar('tasks_perf_stats', default=None)
+
+
+class RequestStats:
+    __slots__ = ('start', 'queries', 'db_ms', 'template_ms', 'template_depth')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.template_depth = 0
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper adding the query's time to the current request"""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_ms += (time.perf_counter() - start) * 1000
+
+
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs):
+    # Fires again when a connection reconnects; install the wrapper once
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None:
+            return super().render(context, request)
+        # Templates rendered from inside another (e.g. cached task rows) count once
+        stats.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_depth -= 1
+            if not stats.template_depth:
+                stats.template_ms += (time.perf_counter() - start) * 1000
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing every render for PerfMiddleware"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+class RingBuffer:
+    """The last `size` request measurements of this process"""
+
+    def __init__(self, size=BUFFER_SIZE):
+        self._lock = threading.Lock()
+        self._entries = deque(maxlen=size)
+
+    def append(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+recent_requests = RingBuffer()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list"""
+    index = max(0, -(-len(sorted_values) * pct // 100) - 1)
+    return sorted_values[int(index)]
+
+
+def latency_summary(entries=None):
+    """
+    Per-view aggregates of the ring buffer, slowest p95 first.
+
+    Each row holds the view name, request count, p50/p95/p99 wall time and
+    the mean query count, database time and response size. Streamed
+    responses have no known size, so the size is averaged over the others
+    (None when every response was streamed).
+    """
+    by_view = {}
+    for entry in recent_requests.snapshot() if entries is None else entries:
+        by_view.setdefault(entry['view'], []).append(entry)
+    rows = []
+    for view, requests in by_view.items():
+        totals = sorted(entry['total_ms'] for entry in requests)
+        count = len(requests)
+        sizes = [entry['bytes'] for entry in requests if entry['bytes'] is not None]
+        rows.append({
+            'view': view,
+            'count': count,
+            'p50': percentile(totals, 50),
+            'p95': percentile(totals, 95),
+            'p99': percentile(totals, 99),
+            'queries': sum(entry['queries'] for entry in requests) / count,
+            'db_ms': sum(entry['db_ms'] for entry in requests) / count,
+            'bytes': sum(sizes) / len(sizes) if sizes else None,
+        })
+    rows.sort(key=lambda row: row['p95'], reverse=True)
+    return rows
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else '<unresolved>'
+
+
+def _response_size(response):
+    if response.streaming:
+        # Streamed bodies are produced after the middleware returns
+        return None
+    return len(response.content)
+
+
+class PerfMiddleware:
+    """Measure each request; place it first in MIDDLEWARE to include the whole stack"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats)
+
+    def finish(self, request, response, stats):
+        total_ms = (time.perf_counter() - stats.start) * 1000
+        entry = {
+            'view': _view_name(request),
+            'method': request.method,
+            'status': response.status_code,
+            'total_ms': total_ms,
+            'queries': stats.queries,
+            'db_ms': stats.db_ms,
+            'template_ms': stats.template_ms,
+            'bytes': _response_size(response),
+        }
+        recent_requests.append(entry)
+        response.headers['Server-Timing'] = (
+            f'total;dur={total_ms:.1f}, '
+            f'db;dur={stats.db_ms:.1f};desc="{stats.queries} queries", '
+            f'tpl;dur={stats.template_ms:.1f}'
+        )
+        level = logging.WARNING if total_ms >= SLOW_MS else logging.INFO
+        logger.log(
+            level,
+            'method=%s path=%s view=%s status=%s total_ms=%.1f queries=%d db_ms=%.1f template_ms=%.1f bytes=%s',
+            request.method, request.path, entry['view'], entry['status'], total_ms,
+            stats.queries, stats.db_ms, stats.template_ms, '-' if entry['bytes'] is None else entry['bytes'],
+            extra={'perf': entry},
+        )
+        return response
@@ -0,0 +1,87 @@
+"""
+Authorization for task lists and their tasks, in one place.
+
+Every view asks the request's TaskPermissions what the user may do instead
+of writing its own access query. A permission is granted per list, by the
+user's role on it (tasks.access: owner, or the role of their membership):
+
+    read   -- see the list and its tasks
+    write  -- add, change, complete, move and delete its tasks
+    share  -- share the list with other users
+
+The roles come from the per-user cache of tasks.access (one query on a
+miss) and are memoized on the request with the id sets derived from them,
+so any number of checks in one request cost at most that one query.
+Checks on tasks never load a task just to look at its list: get_task()
+and task_lists() put the permitted list ids into the query that fetches
+them.
+"""
+from django.shortcuts import get_object_or_404
+
+from .access import OWNER, atasklist_roles, tasklist_roles
+from .models import Task, TaskListMembership
+
+READ = 'read'
+WRITE = 'write'
+SHARE = 'share'
+
+ROLE_PERMISSIONS = {
+    OWNER: frozenset({READ, WRITE, SHARE}),
+    TaskListMembership.EDITOR: frozenset({READ, WRITE}),
+    TaskListMembership.VIEWER: frozenset({READ}),
+}
+
+
+class TaskPermissions:
+    """What one user may do with task lists and tasks, for the lifetime of a request"""
+
+    def __init__(self, user, roles):
+        self.user = user
+        self.roles = roles
+        self._tasklist_ids = {}
+
+    def tasklist_ids(self, permission=READ):
+        """The frozenset of TaskList ids the user has `permission` on"""
+        ids = self._tasklist_ids.get(permission)
+        if ids is None:
+            ids = self._tasklist_ids[permission] = frozenset(
+                tasklist_id for tasklist_id, role in self.roles.items() if permission in ROLE_PERMISSIONS[role]
+            )
+        return ids
+
+    def can(self, permission, tasklist_id):
+        """Whether the user has `permission` on a list; takes raw request values too"""
+        try:
+            return int(tasklist_id) in self.tasklist_ids(permission)
+        except (TypeError, ValueError):
+            return False
+
+    def tasks(self, permission=READ, queryset=None):
+        """Tasks (of `queryset`, default all) in the lists the user has `permission` on"""
+        queryset = Task.objects.all() if queryset is None else queryset
+        return queryset.filter(tasklist_id__in=self.tasklist_ids(permission))
+
+    def get_task(self, task_id, permission=READ, queryset=None):
+        """The task if the user has `permission` on its list, else Http404 -- one query"""
+        return get_object_or_404(self.tasks(permission, queryset), pk=task_id)
+
+    def task_lists(self, task_ids, permission=READ):
+        """{task id: tasklist id} of those tasks the user has `permission` on -- one query"""
+        return dict(self.tasks(permission).filter(id__in=task_ids).values_list('id', 'tasklist_id'))
+
+
+def permissions_for(request):
+    """The TaskPermissions of the request's user, built once per request"""
+    permissions = getattr(request, '_task_permissions', None)
+    if permissions is None:
+        permissions = request._task_permissions = TaskPermissions(request.user, tasklist_roles(request.user))
+    return permissions
+
+
+async def apermissions_for(request):
+    """Async version of permissions_for() for the ASGI views"""
+    permissions = getattr(request, '_task_permissions', None)
+    if permissions is None:
+        user = await request.auser()
+        permissions = request._task_permissions = TaskPermissions(user, await atasklist_roles(user))
+    return permissions
@@ -0,0 +1,149 @@
+"""
+Due-soon and overdue task reminders.
+
+The scheduler (manage.py send_reminders) wakes up periodically and, for
+each kind of reminder, looks only at the due dates it has not covered yet:
+
+  - due_soon: open tasks whose due date falls within LEAD_TIME from now
+  - overdue:  open tasks whose due date has passed
+
+Each kind keeps a ReminderWatermark, the (due_date, id) of the last task it
+handled. A run reads the open tasks after the watermark up to the end of its
+window in (due_date, id) order, a range scan of the (status, due_date)
+index, so the cost follows the number of tasks falling due rather than the
+size of the table. Tasks are read in batches; each batch is grouped into
+one reminder per user and handed to the backend, and the watermark only
+moves once the backend returns, so a crash repeats at most one batch.
+
+Tasks created or rescheduled behind a watermark (e.g. already overdue when
+saved) are not reminded about: they did not become due while watched.
+
+The delivery backend is pluggable through TASKS_REMINDER_BACKEND (a dotted
+path) and needs a single method:
+
+    send(reminders)  -- deliver a list of Reminder, return how many were sent
+"""
+from dataclasses import dataclass, field
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import ReminderWatermark, Task
+from .serializers import format_due_dates
+
+DUE_SOON = 'due_soon'
+OVERDUE = 'overdue'
+# Overdue first, so a lagging scheduler reports the most urgent tasks first
+KINDS = (OVERDUE, DUE_SOON)
+
+# How long before its due date a task gets a "due soon" reminder
+LEAD_TIME = timedelta(minutes=getattr(settings, 'TASKS_REMINDER_LEAD_MINUTES', 60))
+# Tasks read, grouped and delivered per batch
+BATCH_SIZE = getattr(settings, 'TASKS_REMINDER_BATCH_SIZE', 500)
+
+REMINDER_FIELDS = ('id', 'title', 'due_date', 'tasklist__name', 'user_id', 'user__username', 'user__email')
+SUBJECTS = {DUE_SOON: 'Due soon', OVERDUE: 'Overdue'}
+
+
+@dataclass
+class Reminder:
+    """The tasks of one user that one batch reminds them about"""
+    kind: str
+    username: str
+    email: str
+    tasks: list = field(default_factory=list)
+
+
+class EmailReminderBackend:
+    """One email per reminder, the whole batch sent over a single connection"""
+
+    def send(self, reminders):
+        messages = [
+            EmailMessage(
+                subject=f'{SUBJECTS[reminder.kind]}: {len(reminder.tasks)} task(s)',
+                body=render_to_string('tasks/reminder_email.txt', {
+                    'kind': reminder.kind, 'username': reminder.username, 'tasks': reminder.tasks,
+                }),
+                to=[reminder.email],
+            )
+            for reminder in reminders
+        ]
+        with get_connection() as connection:
+            return connection.send_messages(messages) or 0
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    """The process-wide backend configured by TASKS_REMINDER_BACKEND"""
+    return import_string(getattr(settings, 'TASKS_REMINDER_BACKEND', 'tasks.reminders.EmailReminderBackend'))()
+
+
+def due_tasks(after, until, limit):
+    """
+    Open tasks after the (due_date, id) position `after` and due no later
+    than `until`, as value dicts in (due_date, id) order
+    """
+    after_due, after_id = after
+    return list(
+        Task.objects.filter(status=Task.ONGOING, due_date__gte=after_due, due_date__lte=until)
+        .exclude(due_date=after_due, id__lte=after_id)
+        .order_by('due_date', 'id')
+        .values(*REMINDER_FIELDS)[:limit]
+    )
+
+
+def group_reminders(kind, rows):
+    """One Reminder per user with an email address, in order of their first task"""
+    reminders = {}
+    # Format each distinct due date once, as the task list shows it
+    dates = format_due_dates([timezone.localtime(row['due_date']) for row in rows])
+    for row, (due_date, _) in zip(rows, dates):
+        if not row['user__email']:
+            continue
+        row['due'] = due_date
+        reminder = reminders.get(row['user_id'])
+        if reminder is None:
+            reminder = reminders[row['user_id']] = Reminder(kind, row['user__username'], row['user__email'])
+        reminder.tasks.append(row)
+    return list(reminders.values())
+
+
+def process_reminders(kind, now=None, lead_time=LEAD_TIME, batch_size=BATCH_SIZE, backend=None):
+    """
+    Send the reminders of one kind that are due at `now`, advancing its
+    watermark batch by batch. Returns (tasks scanned, reminders sent).
+    """
+    now = now or timezone.now()
+    backend = backend or get_backend()
+    until = now + lead_time if kind == DUE_SOON else now
+    # A new watermark starts at now: nothing already past due is reminded about
+    watermark, _ = ReminderWatermark.objects.get_or_create(kind=kind, defaults={'due_date': now})
+    if kind == DUE_SOON and watermark.due_date < now:
+        # The scheduler was behind; tasks due before now get an overdue reminder instead
+        watermark.due_date, watermark.task_id = now, 0
+
+    scanned = sent = 0
+    while True:
+        rows = due_tasks((watermark.due_date, watermark.task_id), until, batch_size)
+        if not rows:
+            break
+        reminders = group_reminders(kind, rows)
+        if reminders:
+            sent += backend.send(reminders)
+        watermark.due_date, watermark.task_id = rows[-1]['due_date'], rows[-1]['id']
+        watermark.save(update_fields=['due_date', 'task_id', 'updated_at'])
+        scanned += len(rows)
+        if len(rows) < batch_size:
+            break
+    return scanned, sent
+
+
+def run_reminders(now=None, **kwargs):
+    """One scheduler pass over every kind: {kind: (tasks scanned, reminders sent)}"""
+    now = now or timezone.now()
+    return {kind: process_reminders(kind, now=now, **kwargs) for kind in KINDS}
@@ -0,0 +1,105 @@
+"""
+Full-text search over task titles and descriptions.
+
+On SQLite the tasks are mirrored into an FTS5 table (created by migration
+0015) whose rowid is the task id. tasks.signals keeps it current on Task
+save; bulk_create paths call index_tasks() explicitly since bulk_create
+sends no signals. Deletes need no help: a trigger (migration 0019) drops
+the entries of deleted rows, which keeps Task free of delete signals so
+queryset and cascade deletes stay single statements. Results are ranked
+with bm25, title matches weighing more than description matches. Other
+database backends fall back to icontains filters, which scan but need no
+extra table.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from .models import Task
+
+FTS_TABLE = 'tasks_task_fts'
+# bm25 weights of the title and description columns
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+MAX_QUERY_LENGTH = 200
+MAX_TERMS = 10
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def search_terms(query):
+    """Split user input into plain words; FTS5 operators and quotes are dropped"""
+    return WORD_RE.findall(query[:MAX_QUERY_LENGTH])[:MAX_TERMS]
+
+
+def _match_expression(terms):
+    # Every word must match, the last one as a prefix (search as you type)
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def index_tasks(tasks, replace=True):
+    """Add or refresh the index entries of saved tasks (replace=False for new tasks)"""
+    if not fts_enabled():
+        return
+    rows = [(task.pk, task.title, task.description or '') for task in tasks]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        if replace:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(f'INSERT INTO {FTS_TABLE} (rowid, title, description) VALUES (%s, %s, %s)', rows)
+
+
+def rebuild_index():
+    """Re-create every index entry from the tasks table; returns the number of tasks indexed"""
+    if not fts_enabled():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(f'INSERT INTO {FTS_TABLE} (rowid, title, description) SELECT id, title, description FROM tasks_task')
+        return cursor.rowcount
+
+
+def search_task_ids(tasklist_ids, query, offset, limit):
+    """
+    Ids of the tasks in `tasklist_ids` matching `query`, best match first.
+
+    Returns at most `limit` ids starting at `offset` of the ranked results.
+    """
+    terms = search_terms(query)
+    if not terms or not tasklist_ids:
+        return []
+    if not fts_enabled():
+        return _fallback_task_ids(tasklist_ids, terms, offset, limit)
+
+    tasklist_ids = list(tasklist_ids)
+    placeholders = ', '.join(['%s'] * len(tasklist_ids))
+    sql = (
+        f'SELECT f.rowid FROM {FTS_TABLE} f JOIN tasks_task t ON t.id = f.rowid '
+        f'WHERE {FTS_TABLE} MATCH %s AND t.tasklist_id IN ({placeholders}) '
+        f'ORDER BY bm25({FTS_TABLE}, %s, %s), f.rowid LIMIT %s OFFSET %s'
+    )
+    params = [_match_expression(terms), *tasklist_ids, TITLE_WEIGHT, DESCRIPTION_WEIGHT, limit, offset]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _fallback_task_ids(tasklist_ids, terms, offset, limit):
+    tasks = Task.objects.filter(tasklist_id__in=tasklist_ids)
+    title_match = Q()
+    for term in terms:
+        tasks = tasks.filter(Q(title__icontains=term) | Q(description__icontains=term))
+        title_match &= Q(title__icontains=term)
+    # Crude ranking: tasks whose title holds every word come first
+    tasks = tasks.annotate(
+        title_rank=Case(When(title_match, then=Value(0)), default=Value(1), output_field=IntegerField()),
+    ).order_by('title_rank', 'id')
+    return list(tasks.values_list('id', flat=True)[offset:offset + limit])
@@ -0,0 +1,116 @@
+"""
+The task JSON shape shared by every endpoint, built fast.
+
+serialize_task_rows() works on .values() rows (no model instances are
+built), serialize_tasks() on already-loaded Task objects; both format the
+due dates without strftime and only once per distinct datetime. The
+result contains only str/int/bool values, so json_response() can encode
+it with orjson when that package is installed, else with the stdlib
+encoder in compact mode.
+"""
+import json
+
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Columns read by serialize_task_rows()
+TASK_VALUE_FIELDS = (
+    'id', 'title', 'description', 'due_date', 'priority', 'status',
+    'is_completed', 'tasklist_id', 'tasklist__name',
+)
+
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def _format_due_date(value):
+    """Same output as strftime('%b %d, %Y %I:%M %p') and strftime('%Y-%m-%dT%H:%M')"""
+    hour12 = value.hour % 12 or 12
+    meridiem = 'PM' if value.hour >= 12 else 'AM'
+    return (
+        f'{MONTHS[value.month - 1]} {value.day:02d}, {value.year:04d} {hour12:02d}:{value.minute:02d} {meridiem}',
+        f'{value.year:04d}-{value.month:02d}-{value.day:02d}T{value.hour:02d}:{value.minute:02d}',
+    )
+
+
+def format_due_dates(values):
+    """Format a batch of datetimes, reusing the strings of repeated values"""
+    formatted = {}
+    result = []
+    for value in values:
+        strings = formatted.get(value)
+        if strings is None:
+            strings = formatted[value] = _format_due_date(value)
+        result.append(strings)
+    return result
+
+
+def task_values(tasks, extra_fields=()):
+    """.values() queryset of the columns serialize_task_rows() reads, plus e.g. the sort keys"""
+    return tasks.values(*dict.fromkeys(TASK_VALUE_FIELDS + tuple(extra_fields)))
+
+
+def serialize_task_rows(rows):
+    """Task dicts from .values(*TASK_VALUE_FIELDS) rows"""
+    rows = list(rows)
+    dates = format_due_dates([row['due_date'] for row in rows])
+    return [
+        {
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'] or '',
+            'due_date': due_date,
+            'due_date_local': due_date_local,
+            'priority': row['priority'],
+            'status': row['status'],
+            'is_completed': row['is_completed'],
+            'tasklist': row['tasklist__name'],
+            'tasklist_id': row['tasklist_id'],
+        }
+        for row, (due_date, due_date_local) in zip(rows, dates)
+    ]
+
+
+def serialize_tasks(tasks):
+    """Task dicts from Task instances whose tasklist is loaded (select_related or assigned)"""
+    tasks = list(tasks)
+    dates = format_due_dates([task.due_date for task in tasks])
+    return [
+        {
+            'id': task.id,
+            'title': task.title,
+            'description': task.description or '',
+            'due_date': due_date,
+            'due_date_local': due_date_local,
+            'priority': task.priority,
+            'status': task.status,
+            'is_completed': task.is_completed,
+            'tasklist': task.tasklist.name,
+            'tasklist_id': task.tasklist_id,
+        }
+        for task, (due_date, due_date_local) in zip(tasks, dates)
+    ]
+
+
+def serialize_task(task):
+    return serialize_tasks([task])[0]
+
+
+def dumps(data):
+    """Encode plain JSON data (dicts, lists, str, int, bool, None) to bytes"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(data, status=200):
+    """
+    JsonResponse for serialized task payloads, without DjangoJSONEncoder.
+
+    Only for data built from plain types; form errors (ErrorDict/ErrorList)
+    still go through JsonResponse.
+    """
+    return HttpResponse(dumps(data), content_type='application/json', status=status)
@@ -0,0 +1,63 @@
+"""
+Sharing a task list with many users at once.
+
+A share request names any number of users; resolving them is one
+username IN lookup, and the memberships are written set-wise: one SELECT
+of the existing rows, one bulk INSERT of the new ones and, only when some
+change role, one UPDATE. bulk_create() sends no post_save, so the access
+cache of the affected users is invalidated here; removals go through the
+model delete and its signals.
+"""
+import re
+
+from django.contrib.auth.models import User
+
+from .access import invalidate_accessible_tasklists
+from .models import TaskListMembership
+
+# Most usernames accepted by one share request
+SHARE_MAX_USERS = 100
+
+
+def parse_usernames(values):
+    """Unique usernames, in order, from form values holding comma or space separated names"""
+    names = (name for value in values for name in re.split(r'[\s,]+', value))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def find_users(usernames):
+    """{username: user id} of the usernames that exist, in one query"""
+    return dict(User.objects.filter(username__in=usernames).values_list('username', 'id'))
+
+
+def share_with(tasklist_id, user_ids, role=TaskListMembership.EDITOR):
+    """
+    Give the users `role` on the list. Returns (ids added, ids whose role
+    changed); users that already had that role are left alone.
+    """
+    existing = dict(
+        TaskListMembership.objects.filter(tasklist_id=tasklist_id, user_id__in=user_ids)
+        .values_list('user_id', 'role')
+    )
+    added = [user_id for user_id in user_ids if user_id not in existing]
+    changed = [user_id for user_id, current in existing.items() if current != role]
+    # Each write is a single statement, so no transaction is needed; a
+    # concurrent share of the same user is skipped rather than an error
+    TaskListMembership.objects.bulk_create(
+        [TaskListMembership(tasklist_id=tasklist_id, user_id=user_id, role=role) for user_id in added],
+        ignore_conflicts=True,
+    )
+    if changed:
+        TaskListMembership.objects.filter(tasklist_id=tasklist_id, user_id__in=changed).update(role=role)
+    invalidate_accessible_tasklists(added + changed)
+    return added, changed
+
+
+def unshare(tasklist_id, user_ids):
+    """Remove the users from the list; returns the ids that had access"""
+    memberships = TaskListMembership.objects.filter(tasklist_id=tasklist_id, user_id__in=user_ids)
+    removed = list(memberships.values_list('user_id', flat=True))
+    if removed:
+        # Model delete: tasks.signals invalidates each removed user's access cache
+        memberships.filter(user_id__in=removed).delete()
+    return removed
@@ -0,0 +1,52 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .access import invalidate_accessible_tasklists
+from .models import Task, TaskList, TaskListMembership
+from .search import index_tasks
+
+
+@receiver(post_save, sender=TaskList)
+def tasklist_saved(sender, instance, **kwargs):
+    # A new list (or a change of owner) changes what the owner can access
+    invalidate_accessible_tasklists([instance.user_id])
+
+
+@receiver(pre_delete, sender=TaskList)
+def tasklist_deleting(sender, instance, **kwargs):
+    # Remember who could see the list; the M2M rows are gone after the delete
+    instance._member_ids = list(instance.shared_with.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=TaskList)
+def tasklist_deleted(sender, instance, **kwargs):
+    invalidate_accessible_tasklists([instance.user_id, *getattr(instance, '_member_ids', [])])
+
+
+@receiver(m2m_changed, sender=TaskList.shared_with.through)
+def tasklist_sharing_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalidate the users whose shared lists changed via add/remove/clear"""
+    if reverse:
+        # user.shared_tasklists.add(...): only this user's access changed
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_accessible_tasklists([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        invalidate_accessible_tasklists(pk_set)
+    elif action == 'pre_clear':
+        invalidate_accessible_tasklists(instance.shared_with.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=TaskListMembership)
+@receiver(post_delete, sender=TaskListMembership)
+def membership_changed(sender, instance, **kwargs):
+    # A share added, removed or given another role (bulk_create sends no signal;
+    # tasks.sharing invalidates those itself)
+    invalidate_accessible_tasklists([instance.user_id])
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Keep the full-text index current; status-only saves leave it alone
+    if update_fields is None or {'title', 'description'} & set(update_fields):
+        index_tasks([instance], replace=not created)
+
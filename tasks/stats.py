@@ -0,0 +1,63 @@
+"""
+Per-list task statistics.
+
+Open and completed counts are maintained on TaskList by every task write
+(Task.save/delete and tasks.changes). Overdue is a matter of the clock
+rather than of writes, so it is counted when asked, inside the same
+query: a correlated COUNT per list over the (tasklist, status, due_date)
+index, which only touches the list's overdue rows.
+
+Writes that bypass both paths (raw SQL, cascades from deleting a user)
+can leave the counters off; reconcile_counters() recomputes them.
+"""
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Task, TaskList
+
+
+def tasklist_stats(tasklist_ids, now=None):
+    """Counters of the given lists, oldest list first, in one query"""
+    overdue = (
+        Task.objects.filter(tasklist=OuterRef('pk'), status=Task.ONGOING, due_date__lt=now or timezone.now())
+        .order_by().values('tasklist').annotate(n=Count('id')).values('n')
+    )
+    return list(
+        TaskList.objects.filter(id__in=tasklist_ids)
+        .order_by('created_at')
+        .annotate(overdue_count=Coalesce(Subquery(overdue), 0))
+        .values('id', 'name', 'user_id', 'open_count', 'completed_count', 'overdue_count')
+    )
+
+
+def actual_counts(tasklist_ids=None):
+    """{list id: (open, completed)} counted from the tasks table with one GROUP BY"""
+    tasks = Task.objects.order_by()
+    if tasklist_ids is not None:
+        tasks = tasks.filter(tasklist_id__in=tasklist_ids)
+    rows = tasks.values('tasklist_id').annotate(
+        open=Count('id', filter=~Q(status=Task.COMPLETED)),
+        completed=Count('id', filter=Q(status=Task.COMPLETED)),
+    )
+    return {row['tasklist_id']: (row['open'], row['completed']) for row in rows}
+
+
+def counter_drift(tasklist_ids=None):
+    """[(list id, stored (open, completed), actual (open, completed))] for lists whose counters are off"""
+    actual = actual_counts(tasklist_ids)
+    lists = TaskList.objects.all() if tasklist_ids is None else TaskList.objects.filter(id__in=tasklist_ids)
+    drift = []
+    for tasklist_id, open_count, completed_count in lists.values_list('id', 'open_count', 'completed_count'):
+        counts = actual.get(tasklist_id, (0, 0))
+        if counts != (open_count, completed_count):
+            drift.append((tasklist_id, (open_count, completed_count), counts))
+    return drift
+
+
+def reconcile_counters(tasklist_ids=None):
+    """Rewrite the counters that drifted; returns the drift that was fixed"""
+    drift = counter_drift(tasklist_ids)
+    for tasklist_id, _, (open_count, completed_count) in drift:
+        TaskList.objects.filter(id=tasklist_id).update(open_count=open_count, completed_count=completed_count)
+    return drift
@@ -0,0 +1,11 @@
+from django import template
+
+from ..fragments import task_row_cells
+
+register = template.Library()
+
+
+@register.simple_tag
+def cached_task_rows(tasks, can_write):
+    """(task, cells_html) pairs for _task_rows.html; see tasks.fragments"""
+    return task_row_cells(tasks, bool(can_write))
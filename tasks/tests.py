@@ -1,3 +1,1424 @@
-from django.test import TestCase
+import base64
+import glob
+import gzip
+import importlib
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import fragments, logreader, logstore, views
+from .access import tasklist_roles
+from .changes import delete_tasks, move_tasks, prune_tombstones, update_tasks
+from .events import get_broker, tasklist_channel
+from .importexport import import_tasks
+from .log_handlers import GzipRotatingFileHandler
+from .logreader import LogFilter, iter_lines_backward, iter_lines_forward, read_page
+from .logstore import archive_segment, iter_range, load_index, read_range_page
+from .management.commands.migrate_task_status import status_distribution
+from .models import ReminderWatermark, Task, TaskList, TaskListMembership, TaskTombstone
+from .pagination import PAGE_SIZE, InvalidCursor, decode_cursor, encode_cursor, paginate_tasks
+from .perf import latency_summary, recent_requests
+from .permissions import READ, WRITE, apermissions_for, permissions_for
+from .reminders import DUE_SOON, OVERDUE, run_reminders
+from .search import _fallback_task_ids
+from .serializers import format_due_dates, serialize_task_rows, serialize_tasks, task_values
+from .sharing import share_with
+from .utils import take_rate_limit
+from .views import apply_task_sort, listing_queryset
+
+AJAX = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+
+def permissions_of(user):
+    """The TaskPermissions a fresh request by `user` gets"""
+    request = RequestFactory().get('/')
+    request.user = user
+    return permissions_for(request)
+
+
+async def apermissions_of(user):
+    """Async version of permissions_of()"""
+    async def auser():
+        return user
+    request = RequestFactory().get('/')
+    request.auser = auser
+    return await apermissions_for(request)
+
+
+class TaskFactoryMixin:
+    """new_task() for test cases whose setUp creates self.owner and self.tasklist"""
+
+    def new_task(self, title, tasklist=None, user=None, **fields):
+        fields.setdefault('due_date', timezone.now())
+        fields.setdefault('priority', Task.LOW)
+        return Task.objects.create(title=title, tasklist=tasklist or self.tasklist, user=user or self.owner, **fields)
+
+
+class QueryCountTests(TestCase):
+    """
+    Pin each view to a constant number of queries regardless of how many
+    tasks the list holds, so N+1 regressions fail loudly. Counts are taken
+    with a cold access cache.
+    """
+
+    ROW_COUNTS = (3, 30)
+
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.friend = User.objects.create_user('friend', password='secret')
+        self.tasklist = TaskList.objects.create(name='Work', user=self.owner)
+        self.client.force_login(self.owner)
+        cache.clear()
+
+    def seed_tasks(self, count):
+        Task.objects.filter(tasklist=self.tasklist).delete()
+        now = timezone.now()
+        tasks = [
+            Task(
+                user=self.owner,
+                tasklist=self.tasklist,
+                title=f'Task {i}',
+                due_date=now + timedelta(hours=i),
+                priority=Task.PRIORITY_CHOICES[i % 3][0],
+            )
+            for i in range(count)
+        ]
+        for task in tasks:
+            task.sync_derived_fields()
+        Task.objects.bulk_create(tasks)
+
+    def assertConstantQueries(self, expected, request, prepare=None):
+        for count in self.ROW_COUNTS:
+            self.seed_tasks(count)
+            state = prepare() if prepare else None
+            cache.clear()
+            with self.subTest(rows=count), self.assertNumQueries(expected):
+                response = request(state) if prepare else request()
+            self.assertLess(response.status_code, 400)
+
+    def test_task_list_get(self):
+        self.assertConstantQueries(7, lambda: self.client.get(
+            reverse('task_list'), {'list': self.tasklist.id, 'status': 'all'}
+        ))
+
+    def test_task_list_ajax(self):
+        for sort in ('due_date', 'priority', 'status'):
+            with self.subTest(sort=sort):
+                self.assertConstantQueries(5, lambda: self.client.get(
+                    reverse('task_list'), {'list': self.tasklist.id, 'status': 'all', 'sort': sort}, **AJAX
+                ))
+
+    def test_create_task(self):
+        # Includes the list version bump (UPDATE + SELECT) inside a SAVEPOINT/RELEASE pair
+        # and the search index INSERT
+        self.assertConstantQueries(11, lambda: self.client.post(reverse('create_task'), {
+            'title': 'New task',
+            'due_date': '2030-01-01T10:00',
+            'priority': Task.HIGH,
+            'status': Task.ONGOING,
+            'tasklist': self.tasklist.id,
+        }, **AJAX))
+
+    def test_delete_task(self):
+        # Version bump, tombstone INSERT and the DELETE inside a SAVEPOINT/RELEASE pair
+        # (the search index entry goes with it, by trigger)
+        self.assertConstantQueries(
+            10,
+            lambda task: self.client.post(reverse('delete_task', args=[task.pk]), **AJAX),
+            prepare=lambda: Task.objects.filter(tasklist=self.tasklist).first(),
+        )
+
+    def test_share_tasklist(self):
+        # Owner roles, username IN lookup, existing memberships, bulk INSERT
+        self.assertConstantQueries(
+            6,
+            lambda _: self.client.post(reverse('share_tasklist'), {
+                'username': self.friend.username,
+                'tasklist_id': self.tasklist.id,
+            }),
+            prepare=self.tasklist.shared_with.clear,
+        )
+
+    def test_bulk_complete(self):
+        # Includes the SAVEPOINT/RELEASE pair of the update and one version bump for the list
+        self.assertConstantQueries(
+            10,
+            lambda ids: self.client.post(
+                reverse('bulk_tasks'),
+                json.dumps({'operation': 'complete', 'ids': ids}),
+                content_type='application/json',
+            ),
+            prepare=lambda: list(Task.objects.filter(tasklist=self.tasklist).values_list('id', flat=True)),
+        )
+
+
+    def test_bulk_delete(self):
+        # Access SELECT, then tombstone SELECT, version bump, tombstone INSERT and one
+        # set-based DELETE (the search index entries go with it, by trigger)
+        self.assertConstantQueries(
+            11,
+            lambda ids: self.client.post(
+                reverse('bulk_tasks'),
+                json.dumps({'operation': 'delete', 'ids': ids}),
+                content_type='application/json',
+            ),
+            prepare=lambda: list(Task.objects.filter(tasklist=self.tasklist).values_list('id', flat=True)),
+        )
+
+    def test_delete_tasklist(self):
+        def delete_list(tasklist_id):
+            # get, the members to invalidate (signal + collector), then one DELETE per table
+            with self.assertNumQueries(6):
+                TaskList.objects.get(id=tasklist_id).delete()
+
+        for count in self.ROW_COUNTS:
+            self.seed_tasks(count)
+            with self.subTest(rows=count):
+                delete_list(self.tasklist.id)
+            self.tasklist = TaskList.objects.create(name='Work', user=self.owner)
+
+
+class AccessCacheTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.friend = User.objects.create_user('friend', password='secret')
+        self.tasklist = TaskList.objects.create(name='Work', user=self.owner)
+        cache.clear()
+
+    def test_warm_cache_skips_query(self):
+        permissions_of(self.owner)
+        with self.assertNumQueries(0):
+            self.assertEqual(permissions_of(self.owner).tasklist_ids(READ), {self.tasklist.id})
+
+    def test_invalidated_on_create_share_and_delete(self):
+        self.assertEqual(permissions_of(self.friend).tasklist_ids(READ), set())
+        self.tasklist.shared_with.add(self.friend)
+        self.assertEqual(permissions_of(self.friend).tasklist_ids(READ), {self.tasklist.id})
+
+        other = TaskList.objects.create(name='Home', user=self.owner)
+        self.assertEqual(permissions_of(self.owner).tasklist_ids(READ), {self.tasklist.id, other.id})
+
+        self.tasklist.delete()
+        self.assertEqual(permissions_of(self.friend).tasklist_ids(READ), set())
+        self.assertEqual(permissions_of(self.owner).tasklist_ids(READ), {other.id})
+
+    def test_uncached_roles_follow_other_processes(self):
+        self.tasklist.shared_with.add(self.friend)
+        tasklist_roles(self.friend)
+        # A demotion made elsewhere: this process's cache never hears of it
+        TaskListMembership.objects.filter(user=self.friend).update(role=TaskListMembership.VIEWER)
+        self.assertEqual(tasklist_roles(self.friend), {self.tasklist.id: TaskListMembership.EDITOR})
+        with mock.patch('tasks.access.ACCESS_CACHE', False), self.assertNumQueries(1):
+            self.assertEqual(tasklist_roles(self.friend), {self.tasklist.id: TaskListMembership.VIEWER})
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.friend = User.objects.create_user('friend', password='secret')
+        self.tasklist = TaskList.objects.create(name='Work', user=self.owner)
+        self.task = Task.objects.create(
+            user=self.owner, tasklist=self.tasklist, title='Report', due_date=timezone.now(), priority=Task.HIGH,
+        )
+        self.async_client.force_login(self.owner)
+        cache.clear()
+
+    async def test_task_list(self):
+        response = await self.async_client.get(reverse('async_task_list'), {'status': 'all', 'render': 'rows'})
+        data = response.json()
+        self.assertEqual([task['id'] for task in data['tasks']], [self.task.id])
+        self.assertIn(f'task-{self.task.id}', data['rows_html'])
+
+        response = await self.async_client.get(reverse('async_task_list'), {'list': self.tasklist.id + 1})
+        self.assertEqual(response.status_code, 404)
+
+    async def test_create_and_delete(self):
+        response = await self.async_client.post(reverse('async_create_task'), {
+            'title': 'Async', 'due_date': '2030-01-01T10:00', 'priority': 'high', 'tasklist': self.tasklist.id,
+        })
+        task = response.json()['task']
+        self.assertEqual((task['title'], task['tasklist']), ('Async', 'Work'))
+
+        response = await self.async_client.post(reverse('async_delete_task', args=[task['id']]))
+        self.assertTrue(response.json()['success'])
+        self.assertFalse(await Task.objects.filter(id=task['id']).aexists())
+
+    async def test_share_tasklist(self):
+        url = reverse('async_share_tasklist')
+        response = await self.async_client.post(url, {'username': 'friend', 'tasklist_id': self.tasklist.id})
+        self.assertTrue(response.json()['success'])
+        response = await self.async_client.post(url, {'username': 'friend', 'tasklist_id': self.tasklist.id})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(self.tasklist.id, (await apermissions_of(self.friend)).tasklist_ids(READ))
+
+
+class RecordingBroker:
+    """Event broker that keeps what was published, for assertions"""
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, event):
+        self.published.append((channel, event))
+
+
+@override_settings(TASKS_EVENT_BROKER='tasks.tests.RecordingBroker')
+class LiveUpdateTests(TestCase):
+    def setUp(self):
+        get_broker.cache_clear()
+        self.addCleanup(get_broker.cache_clear)
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.tasklist = TaskList.objects.create(name='Work', user=self.owner)
+        self.client.force_login(self.owner)
+
+    def test_views_publish_task_events(self):
+        channel = tasklist_channel(self.tasklist.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            task_id = self.client.post(reverse('create_task'), {
+                'title': 'Live', 'due_date': '2030-01-01T10:00', 'priority': 'low',
+                'status': 'ongoing', 'tasklist': self.tasklist.id,
+            }, **AJAX).json()['task']['id']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('task_list'), {
+                'action': 'toggle_completion', 'task_id': task_id, 'is_completed': '1',
+            }, **AJAX)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('delete_task', args=[task_id]), **AJAX)
+
+        published = get_broker().published
+        self.assertEqual([c for c, _ in published], [channel] * 3)
+        self.assertEqual([e['type'] for _, e in published], ['task.created', 'task.updated', 'task.deleted'])
+        self.assertEqual(published[1][1]['task']['status'], Task.COMPLETED)
+        self.assertEqual(published[2][1], {'type': 'task.deleted', 'id': task_id})
+
+
+@override_settings(TASKS_EVENT_BROKER='tasks.events.InProcessBroker')
+class TaskEventStreamTests(TestCase):
+    def setUp(self):
+        get_broker.cache_clear()
+        self.addCleanup(get_broker.cache_clear)
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.tasklist = TaskList.objects.create(name='Work', user=self.owner)
+        self.async_client.force_login(self.owner)
+        cache.clear()
+
+    async def test_stream_delivers_published_events(self):
+        response = await self.async_client.get(reverse('task_events', args=[self.tasklist.id]))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+
+        get_broker().publish(tasklist_channel(self.tasklist.id), {'type': 'task.deleted', 'id': 7})
+        self.assertEqual(await anext(stream), b'event: task.deleted\ndata: {"type": "task.deleted", "id": 7}\n\n')
+        await stream.aclose()
+
+    async def test_inaccessible_list(self):
+        response = await self.async_client.get(reverse('task_events', args=[self.tasklist.id + 1]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_only_offered_over_asgi(self):
+        # A WSGI request is refused at once instead of buffering the endless stream
+        self.client.force_login(self.owner)
+        self.assertEqual(self.client.get(reverse('task_events', args=[self.tasklist.id])).status_code, 204)
+        self.assertNotIn(b'EventSource', self.client.get(reverse('task_list')).content)
+        page = async_to_sync(self.async_client.get)(reverse('task_list'))
+        self.assertIn(b'EventSource', page.content)
+        with mock.patch('tasks.events.LIVE_UPDATES', False):
+            page = async_to_sync(self.async_client.get)(reverse('task_list'))
+        self.assertNotIn(b'EventSource', page.content)
+
+
+class TaskChangesTests(TaskFactoryMixin, TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.tasklist = TaskList.objects.create(name='Work', user=self.owner)
+        self.other = TaskList.objects.create(name='Home', user=self.owner)
+        self.client.force_login(self.owner)
+
+    def changes(self, since, tasklist=None):
+        return self.client.get(reverse('tasklist_changes'), {
+            'list': (tasklist or self.tasklist).id, 'since': since,
+        }).json()
+
+    def test_changes_since_watermark(self):
+        first = self.new_task('First')
+        watermark = self.client.get(reverse('task_list'), {'list': self.tasklist.id}, **AJAX).json()['version']
+        self.assertEqual(self.changes(watermark), {
+            'success': True, 'version': watermark, 'reset': False, 'tasks': [], 'deleted': [],
+        })
+
+        second = self.new_task('Second')
+        first.status = Task.COMPLETED
+        first.save()
+        data = self.changes(watermark)
+        self.assertEqual([task['id'] for task in data['tasks']], [second.id, first.id])
+        self.assertEqual(data['version'], watermark + 2)
+
+        second_id = second.id
+        second.delete()
+        data = self.changes(data['version'])
+        self.assertEqual((data['tasks'], data['deleted']), ([], [second_id]))
+
+    def test_moves_and_bulk_paths_are_tracked(self):
+        task = self.new_task('Task')
+        since, other_since = self.tasklist.version + 1, self.other.version
+        task.tasklist = self.other
+        task.save()
+        self.assertEqual(self.changes(since)['deleted'], [task.id])
+        self.assertEqual([t['id'] for t in self.changes(other_since, self.other)['tasks']], [task.id])
+
+        version = TaskList.objects.get(id=self.other.id).version
+        self.client.post(reverse('bulk_tasks'), json.dumps({'operation': 'complete', 'ids': [task.id]}),
+                         content_type='application/json')
+        data = self.changes(version, self.other)
+        self.assertEqual([t['status'] for t in data['tasks']], [Task.COMPLETED])
+
+        self.client.post(reverse('bulk_tasks'), json.dumps({'operation': 'delete', 'ids': [task.id]}),
+                         content_type='application/json')
+        self.assertEqual(self.changes(data['version'], self.other)['deleted'], [task.id])
+
+    def test_unknown_watermark_resets(self):
+        self.assertTrue(self.changes(99)['reset'])
+
+    def test_pruned_tombstones_reset_older_watermarks(self):
+        old, recent = self.new_task('Old'), self.new_task('Recent')
+        old_id, recent_id = old.id, recent.id
+        since = TaskList.objects.get(id=self.tasklist.id).version
+        old.delete()
+        pruned_since = TaskList.objects.get(id=self.tasklist.id).version
+        recent.delete()
+        TaskTombstone.objects.filter(task_id=old_id).update(deleted_at=timezone.now() - timedelta(days=31))
+        self.assertEqual(prune_tombstones(timedelta(days=30)), 1)
+        self.assertEqual(TaskList.objects.get(id=self.tasklist.id).pruned_version, pruned_since)
+        self.assertTrue(self.changes(since)['reset'])
+        self.assertEqual(self.changes(pruned_since)['deleted'], [recent_id])
+
+    def test_too_many_deletes_reset(self):
+        for task in [self.new_task('One'), self.new_task('Two')]:
+            task.delete()
+        with mock.patch('tasks.views.DELTA_MAX_CHANGES', 1):
+            self.assertTrue(self.changes(0)['reset'])
+        self.assertEqual(len(self.changes(0)['deleted']), 2)
+
+
+class ConditionalTaskListTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.tasklist = TaskList.objects.create(name='Work', user=self.owner)
+        self.task = Task.objects.create(
+            user=self.owner, tasklist=self.tasklist, title='Report', due_date=timezone.now(), priority=Task.HIGH,
+        )
+        self.client.force_login(self.owner)
+        self.params = {'list': self.tasklist.id, 'status': 'all'}
+
+    def test_unchanged_list_is_not_modified(self):
+        for headers in (AJAX, {}):
+            with self.subTest(ajax=bool(headers)):
+                # The first page view sets the CSRF cookie, which the HTML ETag depends on
+                self.client.get(reverse('task_list'), self.params, **headers)
+                etag = self.client.get(reverse('task_list'), self.params, **headers)['ETag']
+                # Session, user and the sidebar lists only: no task query
+                with self.assertNumQueries(3):
+                    response = self.client.get(reverse('task_list'), self.params, HTTP_IF_NONE_MATCH=etag, **headers)
+                self.assertEqual(response.status_code, 304)
+
+    def test_changes_and_parameters_change_the_etag(self):
+        etag = self.client.get(reverse('task_list'), self.params, **AJAX)['ETag']
+        other = self.client.get(reverse('task_list'), {**self.params, 'sort': 'priority'}, **AJAX)['ETag']
+        self.assertNotEqual(etag, other)
+
+        self.task.status = Task.COMPLETED
+        self.task.save()
+        response = self.client.get(reverse('task_list'), self.params, HTTP_IF_NONE_MATCH=etag, **AJAX)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_rows_follow_the_csrf_cookie(self):
+        params = {**self.params, 'render': 'rows'}
+        self.client.get(reverse('task_list'), self.params)
+        etag = self.client.get(reverse('task_list'), params, **AJAX)['ETag']
+        self.assertEqual(self.client.get(reverse('task_list'), params, HTTP_IF_NONE_MATCH=etag, **AJAX).status_code, 304)
+        # A new CSRF secret (e.g. after logging in again) invalidates the cached rows and their tokens
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = 'c' * 32
+        response = self.client.get(reverse('task_list'), params, HTTP_IF_NONE_MATCH=etag, **AJAX)
+        self.assertEqual(response.status_code, 200)
+        # JSON without rows does not depend on it
+        etag = self.client.get(reverse('task_list'), self.params, **AJAX)['ETag']
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = 'd' * 32
+        self.assertEqual(self.client.get(reverse('task_list'), self.params, HTTP_IF_NONE_MATCH=etag, **AJAX).status_code, 304)
+
+
+class ImportExportTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.source = TaskList.objects.create(name='Source', user=self.owner)
+        self.target = TaskList.objects.create(name='Target', user=self.owner)
+        self.client.force_login(self.owner)
+        due = timezone.now().replace(microsecond=0)
+        for i, (priority, status) in enumerate([(Task.HIGH, Task.ONGOING), (Task.LOW, Task.COMPLETED), (Task.MEDIUM, Task.ONGOING)]):
+            Task.objects.create(
+                user=self.owner, tasklist=self.source, title=f'Task, "{i}"', description=f'line one\nline {i}',
+                due_date=due + timedelta(days=i), priority=priority, status=status,
+            )
+
+    def task_values(self, tasklist):
+        return list(Task.objects.filter(tasklist=tasklist).order_by('id').values_list(
+            'title', 'description', 'due_date', 'priority', 'status', 'priority_rank', 'status_rank', 'is_completed',
+        ))
+
+    def upload(self, name, content, tasklist=None, **data):
+        return self.client.post(reverse('import_tasks'), {
+            'file': SimpleUploadedFile(name, content.encode()), 'list': (tasklist or self.target).id, **data,
+        })
+
+    def test_csv_and_jsonl_round_trip(self):
+        for fmt in ('csv', 'jsonl'):
+            with self.subTest(fmt=fmt):
+                Task.objects.filter(tasklist=self.target).delete()
+                response = self.client.get(reverse('export_tasks'), {'list': self.source.id, 'format': fmt})
+                self.assertEqual(response['Content-Disposition'], f'attachment; filename="tasklist-{self.source.id}.{fmt}"')
+                content = b''.join(response.streaming_content).decode()
+                result = self.upload(f'tasks.{fmt}', content).json()
+                self.assertEqual((result['created'], result['failed']), (3, 0))
+                self.assertEqual(self.task_values(self.target), self.task_values(self.source))
+
+    def test_invalid_rows_are_reported_by_line(self):
+        csv_content = (
+            'title,description,due_date,priority,status\n'
+            'Good,,2030-01-01T10:00:00+00:00,low,\n'
+            ',,2030-01-01T10:00:00+00:00,low,\n'
+            'Bad priority,,2030-01-01T10:00:00+00:00,urgent,\n'
+            'Bad date,,someday,low,\n'
+            'Also good,,2030-01-02T10:00:00+00:00,high,completed\n'
+        )
+        result = self.upload('tasks.csv', csv_content).json()
+        self.assertEqual((result['created'], result['failed']), (2, 3))
+        self.assertEqual([(e['line'], list(e['errors'])) for e in result['errors']],
+                         [(3, ['title']), (4, ['priority']), (5, ['due_date'])])
+
+        jsonl_content = '\n'.join([
+            json.dumps({'title': 'Good', 'due_date': '2030-01-01T10:00:00+00:00', 'priority': 'low'}),
+            'not json',
+            '',
+            json.dumps(['a', 'list']),
+            json.dumps({'title': 'No date', 'priority': 'low'}),
+        ])
+        result = self.upload('tasks.txt', jsonl_content, format='jsonl').json()
+        self.assertEqual((result['created'], result['failed']), (1, 3))
+        self.assertEqual([(e['line'], list(e['errors'])) for e in result['errors']],
+                         [(2, ['__all__']), (4, ['__all__']), (5, ['due_date'])])
+        self.assertEqual(Task.objects.filter(tasklist=self.target).count(), 3)
+
+    def test_rows_are_inserted_in_batches(self):
+        lines = ['title,due_date,priority'] + [f'Task {i},2030-01-01T10:00:00+00:00,low' for i in range(5)]
+        with CaptureQueriesContext(connection) as queries:
+            result = import_tasks(io.StringIO('\n'.join(lines)), 'csv', self.target, self.owner, batch_size=2)
+        self.assertEqual((result.created, result.failed), (5, 0))
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "tasks_task" ')]
+        # Two full batches and the remainder
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(list(Task.objects.filter(tasklist=self.target).order_by('id').values_list('title', flat=True)),
+                         [f'Task {i}' for i in range(5)])
+        self.target.refresh_from_db()
+        self.assertEqual(self.target.open_count, 5)
+
+    def test_imports_need_write_access(self):
+        viewer = User.objects.create_user('viewer', password='secret')
+        TaskListMembership.objects.create(tasklist=self.target, user=viewer, role=TaskListMembership.VIEWER)
+        content = 'title,due_date,priority\nTask,2030-01-01T10:00:00+00:00,low\n'
+        self.client.force_login(viewer)
+        self.assertEqual(self.upload('tasks.csv', content).status_code, 403)
+        # Viewers may still export
+        self.assertEqual(self.client.get(reverse('export_tasks'), {'list': self.target.id}).status_code, 200)
+        self.client.force_login(User.objects.create_user('stranger', password='secret'))
+        self.assertEqual(self.upload('tasks.csv', content).status_code, 403)
+        self.assertEqual(self.client.get(reverse('export_tasks'), {'list': self.source.id}).status_code, 403)
+        self.assertFalse(Task.objects.filter(tasklist=self.target).exists())
+
+    def test_commands_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tasks.jsonl')
+            call_command('export_tasks', '--list', self.source.id, '-o', path, '--chunk-size', 2)
+            out, err = io.StringIO(), io.StringIO()
+            with open(path, 'a') as f:
+                f.write('{"title": ""}\n')
+            call_command('import_tasks', path, '--list', self.target.id, '--batch-size', 2, stdout=out, stderr=err)
+        self.assertIn('Imported 3 tasks into "Target" (1 rows rejected).', out.getvalue())
+        self.assertTrue(err.getvalue().startswith('line 4: '))
+        self.assertEqual(self.task_values(self.target), self.task_values(self.source))
+        with self.assertRaises(CommandError):
+            call_command('export_tasks', '--list', 0)
+
+
+class LogReaderTests(TestCase):
+    LINES = [
+        '[2025-07-13 09:00:00] INFO - tasks: started',
+        '[2025-07-13 09:05:00] WARNING - django.request: Not Found: /missing/',
+        '[2025-07-13 09:10:00] ERROR - tasks: [frontend] TypeError in app.js',
+        'Traceback (most recent call last):',
+        '  File "views.py", line 1, in task_list',
+        '[2025-07-13 09:15:00] ERROR - tasks: Task status update failed for user 1',
+        '[2025-07-13 09:20:00] DEBUG - tasks: cache miss',
+        '[2025-07-13 09:25:00] CRITICAL - tasks: database unavailable',
+        '[2025-07-13 09:30:00] INFO - django.request: ok \u2713',
+        '[2025-07-13 09:35:00] INFO - tasks: stopped',
+    ]
+
+    def write_log(self, lines=None, newline='\n', trailing=True):
+        fd, path = tempfile.mkstemp(suffix='.log')
+        self.addCleanup(os.remove, path)
+        content = newline.join(self.LINES if lines is None else lines) + (newline if trailing else '')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content.encode('utf-8'))
+        return path
+
+    def test_backward_lines_and_offsets_for_any_block_size(self):
+        for newline, trailing in (('\n', True), ('\r\n', True), ('\n', False)):
+            path = self.write_log(newline=newline, trailing=trailing)
+            with open(path, 'rb') as f:
+                content = f.read()
+                forward = list(iter_lines_forward(f, 0))
+                self.assertEqual(len(forward), len(self.LINES))
+                for block_size in (1, 2, 3, 7, 64, 4096):
+                    with self.subTest(newline=newline, trailing=trailing, block_size=block_size):
+                        backward = list(iter_lines_backward(f, len(content), block_size))
+                        self.assertEqual(backward, forward[::-1])
+                        for offset, line in backward:
+                            self.assertTrue(content[offset:].startswith(line))
+
+    def test_pages_round_trip_through_offsets(self):
+        for newline, trailing in (('\n', True), ('\r\n', True), ('\n', False)):
+            with self.subTest(newline=newline, trailing=trailing):
+                path = self.write_log(newline=newline, trailing=trailing)
+                newest = read_page(path, limit=3, block_size=5)
+                self.assertEqual(newest.lines, self.LINES[-3:])
+                self.assertEqual((newest.has_older, newest.has_newer), (True, False))
+
+                pages, page = [newest], newest
+                while page.has_older:
+                    page = read_page(path, before=page.start, limit=3, block_size=5)
+                    pages.append(page)
+                self.assertEqual([line for page in reversed(pages) for line in page.lines], self.LINES)
+                self.assertEqual((page.start, page.lines), (0, self.LINES[:1]))
+
+                # Paging forward from an older page's end gives back the page after it
+                older = pages[1]
+                self.assertEqual(older.lines, self.LINES[-6:-3])
+                newer = read_page(path, after=older.end, limit=3)
+                self.assertEqual((newer.lines, newer.start, newer.end), (newest.lines, newest.start, newest.end))
+                self.assertEqual((newer.has_older, newer.has_newer), (True, False))
+                self.assertEqual(read_page(path, after=0, limit=3).lines, self.LINES[:3])
+
+    def test_filters(self):
+        path = self.write_log()
+
+        def lines(**kwargs):
+            return read_page(path, log_filter=LogFilter(**kwargs), block_size=16).lines
+
+        self.assertEqual(lines(), self.LINES)
+        # Continuation lines have no header, so only match without filters
+        self.assertEqual(lines(level='ERROR'), [self.LINES[i] for i in (2, 5, 7)])
+        self.assertEqual(lines(level='BOGUS'), self.LINES)
+        self.assertEqual(lines(source='django.request'), [self.LINES[1], self.LINES[8]])
+        self.assertEqual(lines(source='frontend'), [self.LINES[2]])
+        self.assertEqual(lines(text='\u2713'), [self.LINES[8]])
+        self.assertEqual(
+            lines(since=datetime(2025, 7, 13, 9, 15), until=datetime(2025, 7, 13, 9, 25), level='ERROR'),
+            [self.LINES[5], self.LINES[7]],
+        )
+
+    def test_time_bounds_stop_the_scan(self):
+        path = self.write_log()
+        with mock.patch.object(logreader, 'decode_line', wraps=logreader.decode_line) as decode:
+            page = logreader.read_page(path, log_filter=logreader.LogFilter(since=datetime(2025, 7, 13, 9, 30)))
+        self.assertEqual(page.lines, self.LINES[-2:])
+        # The two matches and the first line before `since`, not the whole file
+        self.assertEqual(decode.call_count, 3)
+        self.assertFalse(page.has_older)
+
+        with mock.patch.object(logreader, 'decode_line', wraps=logreader.decode_line) as decode:
+            page = logreader.read_page(path, after=0, log_filter=logreader.LogFilter(until=datetime(2025, 7, 13, 9, 5)))
+        self.assertEqual(page.lines, self.LINES[:2])
+        self.assertEqual(decode.call_count, 3)
+
+    def test_scan_limit_leaves_more_to_page(self):
+        path = self.write_log()
+        page = read_page(path, log_filter=LogFilter(text='started'), max_scan=100, block_size=8)
+        self.assertEqual((page.lines, page.has_older), ([], True))
+        self.assertEqual(read_page(path, before=page.start, log_filter=LogFilter(text='started')).lines, self.LINES[:1])
+
+
+@override_settings(TASKS_LOG_ERROR_RATE_LIMIT=4, TASKS_LOG_ERROR_RATE_WINDOW=60,
+                   TASKS_LOG_ERROR_DEDUP_WINDOW=60, TASKS_LOG_ERROR_MAX_BATCH=10)
+class LogErrorViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('tasks.views.log_error')
+        self.log_error = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, payload, client='10.0.0.1'):
+        return self.client.post(reverse('log_error'), json.dumps(payload), content_type='application/json',
+                                REMOTE_ADDR=client)
+
+    def later(self, seconds):
+        """Move the cache's clock forward, as if `seconds` had passed"""
+        return mock.patch('django.core.cache.backends.locmem.time.time', return_value=time.time() + seconds)
+
+    def test_mixed_batch(self):
+        response = self.post({'events': [
+            {'message': 'First', 'source': 'app.js', 'url': '/'},
+            {'message': '   '},
+            'not an event',
+            {'message': 5},
+            {'message': 'Second'},
+        ]})
+        self.assertEqual(response.json(), {'status': 'ok', 'logged': 2, 'duplicates': 0, 'invalid': 3, 'rate_limited': 0})
+        messages = [call.args[0] for call in self.log_error.call_args_list]
+        self.assertEqual(len(messages), 2)
+        self.assertTrue(messages[0].startswith('[app.js] First | URL: / |'))
+        self.assertTrue(messages[1].startswith('[frontend] Second | URL: unknown |'))
+
+        self.assertEqual(self.post([{'message': 'Third'}]).json()['logged'], 1)
+        self.assertEqual(self.post({'message': 'Fourth'}).json()['logged'], 1)
+        for payload in ([], {'events': []}, [{'message': ''}], [{'message': str(i)} for i in range(11)]):
+            with self.subTest(payload=payload):
+                self.assertEqual(self.post(payload).status_code, 400)
+        response = self.client.post(reverse('log_error'), '{not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_rate_limit(self):
+        data = self.post([{'message': 'a'}, {'message': 'b'}, {'message': 'c'}]).json()
+        self.assertEqual((data['logged'], data['rate_limited']), (3, 0))
+        # One event left in the window: the rest of the batch is dropped
+        data = self.post([{'message': 'd'}, {'message': 'e'}]).json()
+        self.assertEqual((data['logged'], data['rate_limited']), (1, 1))
+        response = self.post({'message': 'f'})
+        self.assertEqual((response.status_code, response.json()['message']), (429, 'Rate limit exceeded'))
+        # Budgets are per client and start over with the next window
+        self.assertEqual(self.post({'message': 'f'}, client='10.0.0.2').json()['logged'], 1)
+        with self.later(61):
+            self.assertEqual(self.post({'message': 'f'}).json()['logged'], 1)
+        self.assertEqual(self.log_error.call_count, 6)
+
+        with override_settings(TASKS_LOG_ERROR_RATE_LIMIT=None):
+            self.assertEqual(take_rate_limit('10.0.0.1', 1000), 1000)
+
+    def test_duplicates_are_dropped_within_the_window(self):
+        data = self.post([{'message': 'Boom'}, {'message': 'Boom'}, {'message': 'Boom', 'source': 'other'}]).json()
+        self.assertEqual((data['logged'], data['duplicates']), (2, 1))
+        self.assertEqual(self.post({'message': ' Boom '}).json()['duplicates'], 1)
+        # Another client's report of the same message is its own event
+        self.assertEqual(self.post({'message': 'Boom'}, client='10.0.0.2').json()['logged'], 1)
+        with self.later(61):
+            data = self.post({'message': 'Boom'}).json()
+        self.assertEqual((data['logged'], data['duplicates']), (1, 0))
+        self.assertEqual(self.log_error.call_count, 4)
+
+
+class LogStoreTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'app.log')
+        self.start = datetime(2025, 7, 13, 9, 0)
+
+    def handler(self, **kwargs):
+        handler = GzipRotatingFileHandler(self.path, **kwargs)
+        handler.setFormatter(logging.Formatter('[{asctime}] {levelname} - {name}: {message}', '%Y-%m-%d %H:%M:%S', '{'))
+        self.addCleanup(handler.close)
+        return handler
+
+    def emit(self, handler, count, first=0):
+        """Log `count` entries one minute apart (every fifth with a traceback line); return their lines"""
+        lines = []
+        for i in range(first, first + count):
+            moment = self.start + timedelta(minutes=i)
+            message = f'event {i:03d}' + ('\nTraceback: boom' if i % 5 == 0 else '')
+            handler.emit(logging.makeLogRecord({
+                'name': 'tasks', 'levelno': logging.ERROR, 'levelname': 'ERROR', 'msg': message,
+                'created': moment.timestamp(), 'msecs': 0,
+            }))
+            lines += f'[{moment:%Y-%m-%d %H:%M:%S}] ERROR - tasks: {message}'.split('\n')
+        return lines
+
+    def archives(self):
+        return sorted(glob.glob(f'{self.path}.*.gz'))
+
+    def test_rollover_archives_and_indexes_segments(self):
+        handler = self.handler(max_bytes=500)
+        lines = self.emit(handler, 40)
+        handler.close()
+
+        archives = self.archives()
+        self.assertGreater(len(archives), 3)
+        archived = [line for path in archives for line in gzip.open(path, 'rt').read().splitlines()]
+        with open(self.path) as f:
+            active = f.read().splitlines()
+        self.assertEqual(archived + active, lines)
+
+        index = load_index(self.path)
+        self.assertEqual([entry['file'] for entry in index], [os.path.basename(path) for path in archives])
+        first = gzip.open(archives[0], 'rt').read().splitlines()
+        self.assertEqual((index[0]['start'], index[0]['end']), (first[0][1:20], first[-1][1:20]))
+
+    def test_members_and_range_reads(self):
+        handler = self.handler()
+        lines = self.emit(handler, 30)
+        handler.close()
+        os.replace(self.path, self.path + '.segment')
+        archive_segment(self.path + '.segment', self.path + '.1.gz', self.path, member_size=200)
+        index = load_index(self.path)
+        self.assertGreater(len(index), 5)
+        # Still one ordinary gzip stream to any reader
+        self.assertEqual(gzip.open(self.path + '.1.gz', 'rt').read().splitlines(), lines)
+
+        later = self.emit(self.handler(), 5, first=30)
+        since, until = self.start + timedelta(minutes=10), self.start + timedelta(minutes=31)
+        expected = lines[lines.index('[2025-07-13 09:10:00] ERROR - tasks: event 010'):] + later[:3]
+        self.assertEqual(list(iter_range(self.path, since, until)), expected)
+        # Members before `since` are skipped by seeking, not read
+        with mock.patch.object(logstore, '_iter_archive_lines', wraps=logstore._iter_archive_lines) as read:
+            list(iter_range(self.path, since, until))
+        offset = read.call_args.args[1]
+        self.assertEqual(offset, next(e['offset'] for e in index if e['end'] >= '2025-07-13 09:10:00'))
+        self.assertGreater(offset, 0)
+
+    def test_old_archives_are_pruned(self):
+        handler = self.handler(max_bytes=500, backup_count=2)
+        self.emit(handler, 40)
+        archives = self.archives()
+        self.assertEqual(len(archives), 2)
+        self.assertEqual({entry['file'] for entry in load_index(self.path)}, {os.path.basename(p) for p in archives})
+
+    def test_processes_share_rotation_without_losing_lines(self):
+        # Two handlers on one file, as in two worker processes
+        first, second = self.handler(max_bytes=400), self.handler(max_bytes=400)
+        lines = []
+        for i in range(0, 60, 2):
+            lines += self.emit(first, 1, first=i) + self.emit(second, 1, first=i + 1)
+        first.close()
+        second.close()
+        archived = [line for path in self.archives() for line in gzip.open(path, 'rt').read().splitlines()]
+        with open(self.path) as f:
+            active = f.read().splitlines()
+        self.assertGreater(len(self.archives()), 3)
+        self.assertEqual(archived + active, lines)
+
+    def test_age_is_shared_through_the_lock_file(self):
+        first, second = self.handler(max_age=60), self.handler(max_age=60)
+        self.emit(first, 3)
+        self.assertEqual(self.archives(), [])
+        os.utime(self.path + '.lock', (time.time() - 61,) * 2)
+        self.emit(second, 1, first=3)
+        self.emit(first, 1, first=4)
+        # Rotated once, by whichever process wrote first; the other reopened the new file
+        self.assertEqual(len(self.archives()), 1)
+        with open(self.path) as f:
+            self.assertEqual(len(f.read().splitlines()), 2)
+
+    def test_archive_pages_start_from_the_newest_lines(self):
+        handler = self.handler(max_bytes=500)
+        lines = self.emit(handler, 40)
+        handler.doRollover()
+        page = read_range_page(self.path, LogFilter(), 7)
+        self.assertEqual((page.lines, page.has_older, page.has_newer), (lines[-7:], True, False))
+        page = read_range_page(self.path, LogFilter(text='event 01'), 100)
+        self.assertEqual((page.lines, page.has_older), ([line for line in lines if 'event 01' in line], False))
+        self.assertEqual(len(page.lines), 10)
+
+    def test_log_view_reads_archives_without_an_active_file(self):
+        handler = self.handler(max_bytes=500)
+        lines = self.emit(handler, 20)
+        handler.doRollover()
+        self.assertFalse(os.path.exists(self.path))
+        staff = User.objects.create_user('admin', password='secret', is_staff=True)
+        self.client.force_login(staff)
+        with mock.patch.object(views, 'LOG_PATH', self.path):
+            response = self.client.get(reverse('view_log_file'))
+            self.assertFalse(response.context['no_log'])
+            self.assertTrue(response.context['archived'])
+            self.assertEqual(response.context['page'].lines, lines)
+
+            response = self.client.get(reverse('view_log_file'), {'since': '2025-07-13T09:15', 'q': 'event'})
+            self.assertEqual(response.context['page'].lines, [line for line in lines[-6:] if 'event' in line])
+
+            for path in self.archives() + [self.path + '.index']:
+                os.remove(path)
+            self.assertTrue(self.client.get(reverse('view_log_file')).context['no_log'])
+
+
+class ProductionSettingsTests(TestCase):
+    def load(self, **env):
+        with mock.patch.dict(os.environ, env):
+            for name in ('DJANGO_SECRET_KEY', 'DJANGO_ALLOWED_HOSTS', 'DJANGO_CACHE_URL'):
+                if name not in env:
+                    os.environ.pop(name, None)
+            sys.modules.pop('todo_project.settings_production', None)
+            try:
+                return importlib.import_module('todo_project.settings_production')
+            finally:
+                sys.modules.pop('todo_project.settings_production', None)
+
+    def test_secret_key_hosts_and_shared_cache_are_required(self):
+        valid = {'DJANGO_SECRET_KEY': 's3cret', 'DJANGO_ALLOWED_HOSTS': 'todo.example.com, www.example.com',
+                 'DJANGO_CACHE_URL': 'redis://cache:6379/0'}
+        for name in valid:
+            with self.subTest(missing=name), self.assertRaises(ImproperlyConfigured):
+                self.load(**{key: value for key, value in valid.items() if key != name})
+        for name, value in (('DJANGO_ALLOWED_HOSTS', ' , '), ('DJANGO_CACHE_URL', 'locmem://')):
+            with self.subTest(**{name: value}), self.assertRaises(ImproperlyConfigured):
+                self.load(**{**valid, name: value})
+
+        production = self.load(**valid)
+        self.assertEqual((production.SECRET_KEY, production.ALLOWED_HOSTS), ('s3cret', ['todo.example.com', 'www.example.com']))
+        self.assertEqual(production.CACHES['default']['BACKEND'], 'django.core.cache.backends.redis.RedisCache')
+        self.assertTrue(production.TASKS_ACCESS_CACHE)
+        self.assertNotIn('django.middleware.common.CommonMiddleware', production.MIDDLEWARE)
+        production = self.load(**{**valid, 'DJANGO_CACHE_URL': 'memcached://cache:11211'})
+        self.assertEqual(production.CACHES['default']['LOCATION'], 'cache:11211')
+
+
+class SearchTests(TaskFactoryMixin, TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.stranger = User.objects.create_user('stranger', password='secret')
+        self.tasklist = TaskList.objects.create(name='Work', user=self.owner)
+        self.client.force_login(self.owner)
+
+    def search(self, q, **params):
+        return self.client.get(reverse('search_tasks'), {'q': q, **params}).json()
+
+    def test_ranked_and_scoped_to_accessible_lists(self):
+        in_description = self.new_task('Weekly sync', description='prepare the quarterly report')
+        in_title = self.new_task('Quarterly report')
+        self.new_task('Quarterly report', tasklist=TaskList.objects.create(name='Theirs', user=self.stranger),
+                      user=self.stranger)
+        self.new_task('Unrelated')
+
+        ids = [task['id'] for task in self.search('quarterly REP')['tasks']]
+        self.assertEqual(ids, [in_title.id, in_description.id])
+
+    def test_index_follows_saves_deletes_and_bulk_creates(self):
+        task = self.new_task('Buy milk')
+        task.title = 'Buy bread'
+        task.save()
+        self.assertEqual(self.search('milk')['tasks'], [])
+        self.assertEqual([t['id'] for t in self.search('bread')['tasks']], [task.id])
+
+        task.delete()
+        self.assertEqual(self.search('bread')['tasks'], [])
+
+        self.client.post(reverse('bulk_tasks'), json.dumps({'operation': 'create', 'tasks': [{
+            'title': 'Bulk bread', 'due_date': '2030-01-01T10:00', 'priority': 'low', 'tasklist': self.tasklist.id,
+        }]}), content_type='application/json')
+        self.assertEqual([t['title'] for t in self.search('bread')['tasks']], ['Bulk bread'])
+
+        # Set-based deletes leave no index rows behind either
+        Task.objects.filter(tasklist=self.tasklist).delete()
+        self.assertEqual(self.search('bread')['tasks'], [])
+
+    def test_operators_are_treated_as_words(self):
+        task = self.new_task('Fix "quoted" NEAR bug')
+        self.assertEqual([t['id'] for t in self.search('"quoted" near -bug*')['tasks']], [task.id])
+
+    def test_icontains_fallback(self):
+        in_description = self.new_task('Weekly sync', description='prepare the quarterly report')
+        in_title = self.new_task('Quarterly report')
+        self.assertEqual(
+            _fallback_task_ids({self.tasklist.id}, ['quarterly', 'report'], 0, 10),
+            [in_title.id, in_description.id],
+        )
+
+
+class SerializerTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.tasklist = TaskList.objects.create(name='Work', user=self.owner)
+        self.client.force_login(self.owner)
+
+    def test_due_dates_match_strftime(self):
+        base = timezone.now().replace(month=1, day=5, hour=0, minute=7)
+        values = [base + timedelta(hours=h, days=40 * h) for h in range(0, 24, 5)] + [base.replace(hour=12)]
+        expected = [(v.strftime('%b %d, %Y %I:%M %p'), v.strftime('%Y-%m-%dT%H:%M')) for v in values]
+        self.assertEqual(format_due_dates(values), expected)
+
+    def test_rows_and_instances_serialize_alike(self):
+        for i in range(3):
+            Task.objects.create(user=self.owner, tasklist=self.tasklist, title=f'Task {i}',
+                                due_date=timezone.now() + timedelta(days=i), priority=Task.LOW)
+        tasks = Task.objects.order_by('id')
+        self.assertEqual(serialize_task_rows(task_values(tasks)), serialize_tasks(listing_queryset(tasks)))
+
+        response = self.client.get(reverse('task_list'), {'status': 'all'}, **AJAX)
+        self.assertEqual(response.json()['tasks'], serialize_tasks(listing_queryset(tasks)))
+
+    def test_ajax_pages_follow_the_cursor(self):
+        now = timezone.now()
+        tasks = [
+            Task(user=self.owner, tasklist=self.tasklist, title=f'Task {i}', due_date=now, priority=Task.LOW)
+            for i in range(PAGE_SIZE + 5)
+        ]
+        for task in tasks:
+            task.sync_derived_fields()
+        Task.objects.bulk_create(tasks)
+        first = self.client.get(reverse('task_list'), {'status': 'all'}, **AJAX).json()
+        second = self.client.get(reverse('task_list'), {'status': 'all', 'cursor': first['next_cursor']}, **AJAX).json()
+        self.assertEqual(len(first['tasks']), PAGE_SIZE)
+        self.assertEqual(len(second['tasks']), 5)
+        self.assertIsNone(second['next_cursor'])
+
+
+class PaginationTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.tasklist = TaskList.objects.create(name='Work', user=self.owner)
+        self.client.force_login(self.owner)
+        now = timezone.now().replace(microsecond=123456)
+        tasks = [
+            Task(user=self.owner, tasklist=self.tasklist, title=f'Task {i}', due_date=now + timedelta(microseconds=i % 3),
+                 priority=(Task.LOW, Task.HIGH)[i % 2])
+            for i in range(7)
+        ]
+        for task in tasks:
+            task.sync_derived_fields()
+        Task.objects.bulk_create(tasks)
+
+    def raw_cursor(self, values):
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+    def test_pages_cover_every_task_once_in_order(self):
+        for sort in ('due_date', 'priority', 'status'):
+            tasks, sort_keys = apply_task_sort(Task.objects.all(), sort)
+            seen, cursor = [], None
+            while True:
+                page, cursor = paginate_tasks(tasks, sort_keys, cursor, page_size=2)
+                seen += [task.id for task in page]
+                if cursor is None:
+                    break
+            with self.subTest(sort=sort):
+                self.assertEqual(seen, list(tasks.values_list('id', flat=True)))
+
+    def test_malformed_cursors_are_rejected(self):
+        due_keys, rank_keys = ('due_date', 'id'), ('priority_rank', 'id')
+        cases = [
+            ('not base64!', due_keys),
+            (encode_cursor({'due_date': 1}), due_keys),
+            (encode_cursor([1]), due_keys),
+            (self.raw_cursor([None, None]), due_keys),
+            (self.raw_cursor([[1], 1]), due_keys),
+            (self.raw_cursor([1, 1]), due_keys),
+            (self.raw_cursor(['yesterday', 1]), due_keys),
+            (self.raw_cursor([1, None]), rank_keys),
+            (self.raw_cursor([{'a': 1}, 1]), rank_keys),
+            (self.raw_cursor(['high', 1]), rank_keys),
+            (self.raw_cursor([1, 2 ** 70]), rank_keys),
+        ]
+        for cursor, sort_keys in cases:
+            with self.subTest(cursor=cursor, sort_keys=sort_keys), self.assertRaises(InvalidCursor):
+                decode_cursor(cursor, sort_keys)
+
+    def test_bad_cursor_is_a_400_in_both_modes(self):
+        for sort, cursor in (('due_date', self.raw_cursor([[1], 1])), ('priority', self.raw_cursor([1, None]))):
+            params = {'status': 'all', 'sort': sort, 'cursor': cursor}
+            with self.subTest(sort=sort):
+                response = self.client.get(reverse('task_list'), params, **AJAX)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()['error'], 'Invalid cursor.')
+                self.assertEqual(self.client.get(reverse('task_list'), params).status_code, 400)
+
+
+class RowFragmentCacheTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.tasklist = TaskList.objects.create(name='Work', user=self.owner)
+        self.task = Task.objects.create(user=self.owner, tasklist=self.tasklist, title='Buy milk',
+                                        due_date=timezone.now(), priority=Task.LOW)
+        self.client.force_login(self.owner)
+        cache.clear()
+
+    def rows_html(self):
+        response = self.client.get(reverse('task_list'), {'render': 'rows'}, **AJAX)
+        # The CSRF token is masked differently on every render
+        return re.sub(r'name="csrfmiddlewaretoken" value="[^"]*"', '', response.json()['rows_html'])
+
+    def test_rows_render_from_cache_until_the_task_changes(self):
+        first = self.rows_html()
+        with mock.patch.object(fragments, 'get_template') as get_template:
+            self.assertEqual(self.rows_html(), first)
+        get_template.assert_not_called()
+
+        self.task.title = 'Buy bread'
+        self.task.save()
+        html = self.rows_html()
+        self.assertIn('Buy bread', html)
+        self.assertNotIn('Buy milk', html)
+
+    def test_completion_cell_is_not_cached(self):
+        self.rows_html()
+        response = self.client.get(reverse('task_list'), {'render': 'rows'}, **AJAX)
+        self.assertIn('csrfmiddlewaretoken', response.json()['rows_html'])
+        response = self.client.get(reverse('task_list'), {'render': 'rows', 'sort': 'priority'}, **AJAX)
+        self.assertIn('name="sort" value="priority"', response.json()['rows_html'])
+
+
+class PerfMiddlewareTests(TestCase):
+    def setUp(self):
+        recent_requests.clear()
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.tasklist = TaskList.objects.create(name='Work', user=self.owner)
+        self.client.force_login(self.owner)
+
+    def test_server_timing_counts_queries_and_templates(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('task_list'))
+        timing = response.headers['Server-Timing']
+        self.assertIn(f'desc="{len(queries)} queries"', timing)
+        template_ms = float(re.search(r'tpl;dur=([\d.]+)', timing).group(1))
+        self.assertGreater(template_ms, 0)
+
+        response = self.client.get(reverse('async_task_list'), **AJAX)
+        self.assertIn('Server-Timing', response.headers)
+
+    def test_percentiles_page_is_staff_only(self):
+        for _ in range(3):
+            self.client.get(reverse('task_list'), **AJAX)
+        row = next(row for row in latency_summary() if row['view'] == 'task_list')
+        self.assertEqual(row['count'], 3)
+        self.assertLessEqual(row['p50'], row['p99'])
+
+        self.assertEqual(self.client.get(reverse('view_perf_stats')).status_code, 403)
+        self.owner.is_staff = True
+        self.owner.save()
+        response = self.client.get(reverse('view_perf_stats'))
+        self.assertContains(response, '<code>task_list</code>', html=False)
+
+    def test_streamed_responses_do_not_count_towards_the_mean_size(self):
+        entry = {'view': 'export', 'total_ms': 1.0, 'queries': 1, 'db_ms': 0.5}
+        rows = latency_summary([{**entry, 'bytes': None}, {**entry, 'bytes': 300}])
+        self.assertEqual(rows[0]['bytes'], 300)
+        self.assertIsNone(latency_summary([{**entry, 'bytes': None}])[0]['bytes'])
+
+
+class MigrateTaskStatusTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.tasklist = TaskList.objects.create(name='Work', user=self.owner)
+        for i in range(5):
+            Task.objects.create(user=self.owner, tasklist=self.tasklist, title=f'Task {i}',
+                                due_date=timezone.now(), priority=Task.LOW)
+        # A retired status, as left behind by old data
+        Task.objects.filter(title__in=['Task 0', 'Task 2', 'Task 4']).update(status='not_started')
+        self.tasklist.refresh_from_db()
+
+    def migrate(self, *args):
+        out = io.StringIO()
+        call_command('migrate_task_status', '--from', 'not_started', '--to', 'completed', *args, stdout=out)
+        return out.getvalue()
+
+    def test_distribution_is_one_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(status_distribution(), {'not_started': 3, 'ongoing': 2})
+
+    def test_dry_run_changes_nothing(self):
+        output = self.migrate('--dry-run')
+        self.assertIn('3 tasks would move', output)
+        self.assertIn('not_started: 3 tasks', output)
+        self.assertEqual(Task.objects.filter(status='not_started').count(), 3)
+
+    def test_batches_update_and_stamp_versions(self):
+        output = self.migrate('--batch-size', '2')
+        self.assertIn('batch 2: 3/3 updated', output)
+        self.assertIn('completed: 3 tasks', output)
+        migrated = Task.objects.filter(title__in=['Task 0', 'Task 2', 'Task 4'])
+        self.assertTrue(all(task.is_completed and task.status_rank == 1 for task in migrated))
+        self.assertGreater(min(task.version for task in migrated), self.tasklist.version)
+
+    def test_legacy_values_still_save(self):
+        task = Task.objects.get(title='Task 0')
+        task.title = 'Renamed'
+        task.save()
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.status_rank, task.is_completed), ('not_started', 0, False))
+        self.assertEqual(Task.status_fields('not_started')['status_rank'], 0)
+        Task.objects.filter(id=task.id).update(priority='urgent')
+        task = Task.objects.get(id=task.id)
+        task.save()
+        self.assertEqual(task.priority_rank, 0)
+
+
+class TaskListCounterTests(TaskFactoryMixin, TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.tasklist = TaskList.objects.create(name='Work', user=self.owner)
+        self.other = TaskList.objects.create(name='Home', user=self.owner)
+        self.client.force_login(self.owner)
+
+    def assertCounts(self, tasklist, open_count, completed_count):
+        tasklist.refresh_from_db()
+        self.assertEqual((tasklist.open_count, tasklist.completed_count), (open_count, completed_count))
+
+    def test_single_task_writes(self):
+        task = self.new_task('Task')
+        self.new_task('Other')
+        self.assertCounts(self.tasklist, 2, 0)
+        task.status = Task.COMPLETED
+        task.save()
+        self.assertCounts(self.tasklist, 1, 1)
+        task.title = 'Renamed'
+        task.save()
+        self.assertCounts(self.tasklist, 1, 1)
+        task.tasklist = self.other
+        task.save()
+        self.assertCounts(self.tasklist, 1, 0)
+        self.assertCounts(self.other, 0, 1)
+        Task.objects.only('id', 'tasklist_id').get(pk=task.pk).delete()
+        self.assertCounts(self.other, 0, 0)
+
+    def test_bulk_paths(self):
+        for i in range(4):
+            self.new_task(f'Task {i}')
+        update_tasks(Task.objects.filter(title__in=['Task 0', 'Task 1']), **Task.status_fields(Task.COMPLETED))
+        self.assertCounts(self.tasklist, 2, 2)
+        move_tasks(Task.objects.filter(title__in=['Task 1', 'Task 2']), self.other.id)
+        self.assertCounts(self.tasklist, 1, 1)
+        self.assertCounts(self.other, 1, 1)
+        delete_tasks(Task.objects.filter(tasklist=self.other))
+        self.assertCounts(self.other, 0, 0)
+
+        self.client.post(reverse('bulk_tasks'), json.dumps({'operation': 'create', 'tasks': [{
+            'title': 'Bulk', 'due_date': '2030-01-01T10:00', 'priority': 'low', 'tasklist': self.other.id,
+        }]}), content_type='application/json')
+        self.assertCounts(self.other, 1, 0)
+
+    def test_stats_endpoint_and_reconcile(self):
+        self.new_task('Late', due_date=timezone.now() - timedelta(days=1))
+        self.new_task('Soon', due_date=timezone.now() + timedelta(days=1))
+        shared = TaskList.objects.create(name='Theirs', user=User.objects.create_user('friend'))
+        shared.shared_with.add(self.owner)
+        permissions_of(self.owner)
+
+        with self.assertNumQueries(3):  # session, user, stats
+            data = self.client.get(reverse('tasklist_stats')).json()
+        self.assertEqual(
+            [(row['name'], row['open'], row['completed'], row['overdue'], row['shared']) for row in data['lists']],
+            [('Work', 2, 0, 1, False), ('Home', 0, 0, 0, False), ('Theirs', 0, 0, 0, True)],
+        )
+
+        TaskList.objects.filter(id=self.tasklist.id).update(open_count=7)
+        out = io.StringIO()
+        call_command('reconcile_task_counts', stdout=out)
+        self.assertIn(f'list {self.tasklist.id}: open 7 -> 2', out.getvalue())
+        self.assertCounts(self.tasklist, 2, 0)
+
+
+class ReminderTests(TaskFactoryMixin, TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', email='owner@example.com', password='secret')
+        self.tasklist = TaskList.objects.create(name='Work', user=self.owner)
+        self.now = timezone.now().replace(microsecond=0)
+
+    def task_due_in(self, title, minutes, **fields):
+        return self.new_task(title, due_date=self.now + timedelta(minutes=minutes), **fields)
+
+    def run_at(self, minutes, **kwargs):
+        mail.outbox = []
+        return run_reminders(now=self.now + timedelta(minutes=minutes), lead_time=timedelta(minutes=60), **kwargs)
+
+    def test_reminders_follow_the_watermarks(self):
+        self.task_due_in('Already late', -10)
+        self.task_due_in('Soon', 30)
+        self.task_due_in('Later', 90)
+        self.task_due_in('Done', 20, status=Task.COMPLETED)
+        self.task_due_in('No email', 40, user=User.objects.create_user('quiet'))
+
+        self.assertEqual(self.run_at(0), {OVERDUE: (0, 0), DUE_SOON: (2, 1)})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['owner@example.com'])
+        self.assertIn('Soon (Work)', mail.outbox[0].body)
+        self.assertNotIn('Already late', mail.outbox[0].body)
+        # Nothing new falls due: the same pass again sends nothing
+        self.assertEqual(self.run_at(0), {OVERDUE: (0, 0), DUE_SOON: (0, 0)})
+
+        self.assertEqual(self.run_at(45), {OVERDUE: (2, 1), DUE_SOON: (1, 1)})
+        self.assertEqual(sorted(message.subject for message in mail.outbox), ['Due soon: 1 task(s)', 'Overdue: 1 task(s)'])
+
+    def test_batches_resume_after_the_last_delivered_task(self):
+        for i in range(5):
+            self.task_due_in(f'Task {i}', 10)
+        result = self.run_at(0, batch_size=2)
+        self.assertEqual(result[DUE_SOON], (5, 3))
+        watermark = ReminderWatermark.objects.get(kind=DUE_SOON)
+        self.assertEqual(watermark.task_id, Task.objects.order_by('id').last().id)
+        # A task due at the same time but with a lower id than the watermark stays done
+        self.assertEqual(self.run_at(5)[DUE_SOON], (0, 0))
+
+    def test_command_runs_one_pass(self):
+        self.task_due_in('Soon', 30)
+        out = io.StringIO()
+        call_command('send_reminders', '--once', stdout=out)
+        self.assertIn('due_soon: 1 tasks, 1 reminders sent', out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class SharingTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.friends = [User.objects.create_user(name, password='secret') for name in ('ann', 'bob', 'cy')]
+        self.tasklist = TaskList.objects.create(name='Work', user=self.owner)
+        self.client.force_login(self.owner)
+        cache.clear()
+
+    def share(self, usernames, **data):
+        return self.client.post(reverse('share_tasklist'), {
+            'username': usernames, 'tasklist_id': self.tasklist.id, **data,
+        })
+
+    def roles(self):
+        return dict(TaskListMembership.objects.filter(tasklist=self.tasklist).values_list('user__username', 'role'))
+
+    def test_bulk_share_change_role_and_unshare(self):
+        ann, bob, cy = self.friends
+        self.assertEqual(permissions_of(ann).tasklist_ids(READ), set())
+        data = self.share('ann, bob owner nobody', role='viewer').json()
+        self.assertEqual((data['shared'], data['not_found']), (['ann', 'bob'], ['nobody']))
+        self.assertEqual(self.roles(), {'ann': 'viewer', 'bob': 'viewer'})
+        # The share invalidated the cached roles
+        self.assertEqual(tasklist_roles(ann), {self.tasklist.id: 'viewer'})
+
+        data = self.share(['bob', 'cy']).json()
+        self.assertEqual((data['shared'], data['updated']), (['cy'], ['bob']))
+        self.assertEqual(self.share('bob cy').status_code, 400)
+        self.assertEqual(tasklist_roles(bob), {self.tasklist.id: 'editor'})
+
+        data = self.share('ann,bob', action='unshare').json()
+        self.assertEqual(data['removed'], ['ann', 'bob'])
+        self.assertEqual(self.roles(), {'cy': 'editor'})
+        self.assertEqual(permissions_of(ann).tasklist_ids(READ), set())
+
+    def test_only_the_owner_shares(self):
+        self.assertEqual(self.share('owner').status_code, 400)
+        self.assertEqual(self.share('nobody').status_code, 404)
+        self.share('ann')
+        self.client.force_login(self.friends[0])
+        self.assertEqual(self.share('bob').status_code, 403)
+
+    def test_viewers_read_but_do_not_write(self):
+        ann = self.friends[0]
+        self.share('ann', role='viewer')
+        task = Task.objects.create(
+            title='Read only', due_date=timezone.now(), priority=Task.LOW, tasklist=self.tasklist, user=self.owner,
+        )
+        self.client.force_login(ann)
+        response = self.client.get(reverse('task_list'), {'list': self.tasklist.id}, **AJAX)
+        self.assertEqual([row['id'] for row in response.json()['tasks']], [task.id])
+        self.assertEqual(self.client.post(reverse('delete_task', args=[task.id]), **AJAX).status_code, 404)
+        response = self.client.post(
+            reverse('bulk_tasks'), json.dumps({'operation': 'complete', 'ids': [task.id]}), content_type='application/json',
+        )
+        self.assertFalse(response.json()['results'][0]['success'])
+        self.assertTrue(Task.objects.filter(id=task.id, status=Task.ONGOING).exists())
+
+    def test_write_controls_follow_the_role(self):
+        ann = self.friends[0]
+        self.share('ann', role='viewer')
+        Task.objects.create(
+            title='Shared', due_date=timezone.now(), priority=Task.LOW, tasklist=self.tasklist, user=self.owner,
+        )
+        params = {'list': self.tasklist.id, 'status': 'all'}
+        self.client.force_login(ann)
+
+        def controls(response, ajax=False):
+            html = response.json()['rows_html'] if ajax else response.content.decode()
+            return 'edit-action' in html, bool(re.search(r'rounded-checkbox[^>]*disabled', html))
+
+        response = self.client.get(reverse('task_list'), params)
+        self.assertEqual(controls(response), (False, True))
+        self.assertEqual(controls(self.client.get(reverse('task_list'), {**params, 'render': 'rows'}, **AJAX), True),
+                         (False, True))
+
+        # Promoting ann changes the ETag, so her cached page is not reused
+        etag = self.client.get(reverse('task_list'), params)['ETag']
+        self.assertEqual(self.client.get(reverse('task_list'), params, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        share_with(self.tasklist.id, [ann.id], TaskListMembership.EDITOR)
+        response = self.client.get(reverse('task_list'), params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(controls(response), (True, False))
+
+
+class PermissionTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.editor = User.objects.create_user('editor', password='secret')
+        self.viewer = User.objects.create_user('viewer', password='secret')
+        self.tasklist = TaskList.objects.create(name='Work', user=self.owner)
+        TaskListMembership.objects.create(tasklist=self.tasklist, user=self.editor, role=TaskListMembership.EDITOR)
+        TaskListMembership.objects.create(tasklist=self.tasklist, user=self.viewer, role=TaskListMembership.VIEWER)
+        self.task = Task.objects.create(
+            title='Shared', due_date=timezone.now(), priority=Task.LOW, tasklist=self.tasklist, user=self.owner,
+        )
+        cache.clear()
+
+    def test_checks_are_memoized_per_request(self):
+        request = RequestFactory().get('/')
+        request.user = self.viewer
+        with self.assertNumQueries(1):
+            permissions = permissions_for(request)
+            self.assertTrue(permissions.can(READ, str(self.tasklist.id)))
+            self.assertFalse(permissions.can(WRITE, self.tasklist.id))
+            self.assertFalse(permissions.can(READ, 'abc'))
+            self.assertIs(permissions_for(request), permissions)
+        with self.assertNumQueries(1):
+            self.assertEqual(permissions.task_lists([self.task.id, 0], READ), {self.task.id: self.tasklist.id})
+        with self.assertNumQueries(0):
+            self.assertEqual(permissions.task_lists([self.task.id], WRITE), {})
+
+    def toggle(self, user):
+        self.client.force_login(user)
+        return self.client.post(reverse('task_list'), {
+            'action': 'toggle_completion', 'task_id': self.task.id, 'is_completed': '1',
+        }, **AJAX)
+
+    def test_editors_change_tasks_they_did_not_create(self):
+        self.assertEqual(self.toggle(self.viewer).status_code, 400)
+        self.assertTrue(self.toggle(self.editor).json()['success'])
+        response = self.client.post(reverse('task_list'), {
+            'action': 'edit_task', 'task_id': self.task.id, 'title': 'Renamed', 'due_date': '2030-01-01T10:00',
+            'priority': 'high', 'status': 'ongoing', 'tasklist': self.tasklist.id,
+        }, **AJAX)
+        self.assertEqual(response.json()['task']['title'], 'Renamed')
+        self.client.force_login(self.viewer)
+        response = self.client.post(reverse('share_tasklist'), {'username': 'editor', 'tasklist_id': self.tasklist.id})
+        self.assertEqual(response.status_code, 403)
+
+    def test_invalid_create_keeps_the_lists_write_controls(self):
+        disabled_toggle = re.compile(r'name="is_completed"[^>]*disabled')
+        for user, disabled in ((self.owner, False), (self.viewer, True)):
+            self.client.force_login(user)
+            response = self.client.post(reverse('create_task'), {'title': '', 'tasklist': self.tasklist.id})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context['current_tasklist'], self.tasklist)
+            self.assertContains(response, 'Shared')
+            self.assertEqual(bool(disabled_toggle.search(response.content.decode())), disabled)
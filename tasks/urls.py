@@ -1,21 +1,38 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 from .views import (
     view_log_file,
     download_log_file,
+    view_perf_stats,
 )
 
 urlpatterns = [
     path('', views.task_list, name='task_list'),
     path('create/', views.create_task, name='create_task'),
     path('delete/<int:pk>/', views.delete_task, name='delete_task'),
+    path('bulk/', views.bulk_tasks, name='bulk_tasks'),
+    path('search/', views.search_tasks, name='search_tasks'),
     path('register/', views.register, name='register'),
     path('lists/create/', views.create_tasklist, name='create_tasklist'),
     path('lists/share/', views.share_tasklist, name='share_tasklist'),
+    path('lists/import/', views.import_tasks_view, name='import_tasks'),
+    path('lists/export/', views.export_tasks_view, name='export_tasks'),
+    path('lists/changes/', views.tasklist_changes, name='tasklist_changes'),
+    path('lists/stats/', views.tasklist_stats_view, name='tasklist_stats'),
     path('log-error/', views.log_error_view, name='log_error'),
 ]
 
+# Native async JSON endpoints, for deployments served by todo_project.asgi
+urlpatterns += [
+    path('async/', async_views.task_list, name='async_task_list'),
+    path('async/create/', async_views.create_task, name='async_create_task'),
+    path('async/delete/<int:pk>/', async_views.delete_task, name='async_delete_task'),
+    path('async/lists/share/', async_views.share_tasklist, name='async_share_tasklist'),
+    path('async/lists/<int:tasklist_id>/events/', async_views.task_events, name='task_events'),
+]
+
 urlpatterns += [
     path('logs/', view_log_file, name='view_log_file'),
     path('logs/download/', download_log_file, name='download_log_file'),
+    path('logs/perf/', view_perf_stats, name='view_perf_stats'),
 ] 
\ No newline at end of file
@@ -1,5 +1,7 @@
+import hashlib
 import logging
 from django.conf import settings
+from django.core.cache import cache
 
 def log_error(message):
     """
@@ -13,4 +15,33 @@ def log_error(message):
         # Output: [2025-07-13 21:00:01] ERROR - tasks: User authentication failed for user_id: 123
     """
     logger = logging.getLogger('tasks')
-    logger.error(message) 
\ No newline at end of file
+    logger.error(message) 
+
+
+def take_rate_limit(client_id, requested):
+    """
+    Reserve up to `requested` log events from the client's fixed-window budget.
+
+    Returns how many events may be logged (0 once the budget is spent).
+    Disabled when settings.TASKS_LOG_ERROR_RATE_LIMIT is None.
+    """
+    limit = getattr(settings, 'TASKS_LOG_ERROR_RATE_LIMIT', None)
+    if limit is None:
+        return requested
+    window = getattr(settings, 'TASKS_LOG_ERROR_RATE_WINDOW', 60)
+    key = f'tasks:log_error_rate:{client_id}'
+    cache.add(key, 0, window)
+    try:
+        used = cache.incr(key, requested)
+    except ValueError:
+        # The window expired between add() and incr()
+        cache.set(key, requested, window)
+        used = requested
+    return max(0, min(requested, limit - (used - requested)))
+
+
+def is_duplicate_event(client_id, source, message):
+    """True if the client already reported this source/message within the dedup window"""
+    window = getattr(settings, 'TASKS_LOG_ERROR_DEDUP_WINDOW', 60)
+    digest = hashlib.sha1(f'{source}\0{message}'.encode('utf-8', errors='replace')).hexdigest()
+    return not cache.add(f'tasks:log_error_seen:{client_id}:{digest}', 1, window)
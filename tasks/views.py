@@ -1,18 +1,35 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.db.models import Case, When, IntegerField, Value, Q
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.contrib import messages
-from .models import Task, TaskList
-from .forms import TaskForm, UserRegistrationForm, TaskListForm
-from django.contrib.auth.models import User
+from django.template.loader import render_to_string
+from django.db import transaction
+from .models import Task, TaskList, TaskListMembership, TaskTombstone
+from .forms import BulkTaskForm, TaskForm, UserRegistrationForm, TaskListForm
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
-from .utils import log_error
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
+from django.views.decorators.vary import vary_on_headers
+from .changes import delete_tasks, move_tasks, stamp_new_tasks, update_tasks
+from .events import live_updates_enabled, publish_event
+from .logreader import LEVELS as LOG_LEVELS, PAGE_LINES, LogFilter, read_page as read_log_page
+from .logstore import iter_range as iter_log_range, needs_archives, read_range_page
+from .importexport import FORMATS as IMPORT_FORMATS, guess_format, import_tasks, stream_export
+from .pagination import PAGE_SIZE, InvalidCursor, paginate_tasks
+from .perf import BUFFER_SIZE as PERF_BUFFER_SIZE, latency_summary
+from .permissions import READ, SHARE, WRITE, permissions_for
+from .search import index_tasks, search_task_ids
+from .serializers import json_response, serialize_task, serialize_task_rows, serialize_tasks, task_values
+from .sharing import SHARE_MAX_USERS, find_users, parse_usernames, share_with, unshare
+from .stats import tasklist_stats
+from .utils import is_duplicate_event, log_error, take_rate_limit
+import hashlib
+import io
 import json
+from datetime import datetime
 import re
 import os
 from django.conf import settings
-from django.http import HttpResponse, HttpResponseForbidden, FileResponse, JsonResponse
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, FileResponse, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.shortcuts import render
 from django.utils.html import escape
@@ -52,11 +69,65 @@ def create_tasklist(request):
     
     return render(request, 'tasks/create_tasklist.html', {'form': form})
 
+def sidebar_tasklists(request):
+    """TaskLists owned by or shared with the user, oldest first, loaded once per request"""
+    if not hasattr(request, '_sidebar_tasklists'):
+        request._sidebar_tasklists = list(
+            TaskList.objects.filter(id__in=permissions_for(request).tasklist_ids(READ)).order_by('created_at')
+        )
+    return request._sidebar_tasklists
+
+def _shown_tasklist(request):
+    """The list task_list will show, or None (no lists / not accessible)"""
+    tasklists = sidebar_tasklists(request)
+    tasklist_id = request.GET.get('list')
+    if tasklist_id:
+        return next((tl for tl in tasklists if str(tl.id) == tasklist_id), None)
+    return tasklists[0] if tasklists else None
+
+def task_list_etag(request):
+    """
+    Fingerprint of a task_list GET, computed from the sidebar lists alone.
+
+    Every task change bumps its TaskList.version, so the versions of the
+    accessible lists plus the query parameters identify the response; an
+    unchanged list is answered with 304 before any task query runs. The
+    user's role on each list is part of it too: it decides which controls
+    the page shows.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    ajax = request.headers.get('x-requested-with') == 'XMLHttpRequest'
+    # Plain JSON carries no token; the HTML page and pre-rendered rows do
+    has_csrf_token = not ajax or request.GET.get('render') == 'rows'
+    roles = permissions_for(request).roles
+    parts = [
+        request.user.pk,
+        ajax,
+        sorted(request.GET.lists()),
+        [(tl.id, tl.version, tl.name, tl.user_id, roles.get(tl.id)) for tl in sidebar_tasklists(request)],
+        # The completion forms embed a CSRF token derived from this cookie
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME) if has_csrf_token else None,
+    ]
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+def task_list_last_modified(request):
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    # The ETag is authoritative (clients send both and If-None-Match wins); this
+    # only covers the shown list's tasks, not the sidebar
+    tasklist = _shown_tasklist(request)
+    return tasklist.updated_at if tasklist else None
+
 @login_required
+@vary_on_headers('X-Requested-With')
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=task_list_etag, last_modified_func=task_list_last_modified)
 def task_list(request):
     user = request.user
+    permissions = permissions_for(request)
     # Show TaskLists owned by or shared with the user
-    user_tasklists = TaskList.objects.filter(Q(user=user) | Q(shared_with=user)).distinct().order_by('created_at')
+    user_tasklists = sidebar_tasklists(request)
     tasklist_id = request.GET.get('list')
     current_tasklist = None
     tasks = Task.objects.none()
@@ -73,8 +144,8 @@ def task_list(request):
             
             if task_id:
                 try:
-                    # Secure task access - ensure user owns the task
-                    task = get_object_or_404(Task, id=task_id, user=user)
+                    # Secure task access - the user may change the tasks of its list
+                    task = permissions.get_task(task_id, WRITE, Task.objects.select_related('tasklist'))
                     
                     # Toggle the task status based on completion
                     if is_completed:
@@ -83,6 +154,7 @@ def task_list(request):
                         task.status = Task.ONGOING
                     
                     task.save()  # This will also update is_completed via the model's save method
+                    publish_event(task.tasklist_id, task_event('updated', task))
                     
                     # Check if this is an AJAX request
                     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
@@ -121,12 +193,13 @@ def task_list(request):
             # Handle task editing (if needed for future)
             task_id = request.POST.get('task_id')
             if task_id:
-                task = get_object_or_404(Task, id=task_id, user=user)
-                form = TaskForm(request.POST, instance=task, user=user)
+                task = permissions.get_task(task_id, WRITE)
+                old_tasklist_id = task.tasklist_id
+                form = TaskForm(user=user, data=request.POST, instance=task, tasklist_ids=permissions.tasklist_ids(WRITE))
                 if form.is_valid():
-                    # Extra validation: ensure the selected TaskList belongs to the user
+                    # Extra validation: ensure the user may add tasks to the selected TaskList
                     tasklist = form.cleaned_data['tasklist']
-                    if not (tasklist.user == user or tasklist.shared_with.filter(id=user.id).exists()):
+                    if not permissions.can(WRITE, tasklist.id):
                         if request.headers.get('x-requested-with') == 'XMLHttpRequest':
                             return JsonResponse({
                                 'success': False,
@@ -137,23 +210,13 @@ def task_list(request):
                             return redirect('task_list')
                     
                     form.save()
+                    publish_event(task.tasklist_id, task_event('updated', task))
+                    if task.tasklist_id != old_tasklist_id:
+                        # Moved: it disappears from the old list's live view
+                        publish_event(old_tasklist_id, {'type': 'task.deleted', 'id': task.id})
                     
                     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-                        return JsonResponse({
-                            'success': True,
-                            'task': {
-                                'id': task.id,
-                                'title': task.title,
-                                'description': task.description or '',
-                                'due_date': task.due_date.strftime('%b %d, %Y %I:%M %p'),
-                                'due_date_local': task.due_date.strftime('%Y-%m-%dT%H:%M'),
-                                'priority': task.priority,
-                                'status': task.status,
-                                'is_completed': task.is_completed,
-                                'tasklist': task.tasklist.name,
-                                'tasklist_id': task.tasklist.id
-                            }
-                        })
+                        return json_response({'success': True, 'task': serialize_task(task)})
                     else:
                         return redirect('task_list')
                 else:
@@ -169,15 +232,17 @@ def task_list(request):
                         return redirect('task_list')
 
     # GET request logic (existing code)
-    if user_tasklists.exists():
+    if user_tasklists:
         if tasklist_id:
             # Secure TaskList access: owner or shared_with
-            current_tasklist = get_object_or_404(TaskList, Q(id=tasklist_id) & (Q(user=user) | Q(shared_with=user)))
+            current_tasklist = next((tl for tl in user_tasklists if str(tl.id) == tasklist_id), None)
+            if current_tasklist is None:
+                raise Http404('No TaskList matches the given query.')
         else:
-            current_tasklist = user_tasklists.first()
+            current_tasklist = user_tasklists[0]
         if current_tasklist:
             # Show tasks only if their TaskList is owned by or shared with the user
-            tasks = Task.objects.filter(tasklist=current_tasklist)
+            tasks = listing_queryset(Task.objects.filter(tasklist=current_tasklist))
     else:
         no_lists = True
 
@@ -190,101 +255,123 @@ def task_list(request):
         elif status_filter == 'ongoing':
             tasks = tasks.filter(status='ongoing')
         # 'all' shows all tasks in the list
-        if sort_by == 'priority':
-            tasks = tasks.annotate(
-                priority_order=Case(
-                    When(priority='high', then=Value(0)),
-                    When(priority='medium', then=Value(1)),
-                    When(priority='low', then=Value(2)),
-                    output_field=IntegerField()
-                )
-            ).order_by('priority_order')
-        elif sort_by == 'status':
-            tasks = tasks.annotate(
-                status_order=Case(
-                    When(status='ongoing', then=Value(0)),
-                    When(status='completed', then=Value(1)),
-                    output_field=IntegerField()
-                )
-            ).order_by('status_order')
-        else:
-            tasks = tasks.order_by('due_date')
+        tasks, sort_keys = apply_task_sort(tasks, sort_by)
 
-    # AJAX support for filtering
-    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        tasks_data = get_tasks_json(tasks)
-        return JsonResponse({
+    # Keyset pagination: only one page of tasks is loaded per request
+    next_cursor = None
+    is_ajax = request.headers.get('x-requested-with') == 'XMLHttpRequest'
+    render_rows = request.GET.get('render') == 'rows'
+    if not no_lists and current_tasklist:
+        if is_ajax and not render_rows:
+            # JSON only: plain rows, no Task instances
+            tasks = task_values(tasks, sort_keys)
+        try:
+            tasks, next_cursor = paginate_tasks(tasks, sort_keys, request.GET.get('cursor'))
+        except InvalidCursor:
+            # A bad cursor is a client error in both modes, never a silent first page
+            if is_ajax:
+                return JsonResponse({
+                    'success': False,
+                    'error': 'Invalid cursor.'
+                }, status=400)
+            return HttpResponseBadRequest('Invalid cursor.')
+
+    # AJAX support for filtering and "load more"
+    if is_ajax:
+        tasks_data = serialize_tasks(tasks) if render_rows else serialize_task_rows(tasks)
+        data = {
             'success': True,
             'tasks': tasks_data,
-            'has_tasks': bool(tasks_data)
-        })
+            'has_tasks': bool(tasks_data),
+            'next_cursor': next_cursor,
+            # Watermark for /lists/changes/: read before the tasks, so nothing is missed
+            'version': current_tasklist.version if current_tasklist else None,
+        }
+        if render_rows:
+            # Pre-rendered <tr> markup for incremental rendering in task_list.html
+            data['rows_html'] = render_to_string('tasks/_task_rows.html', {
+                'tasks': tasks,
+                'current_status_filter': status_filter,
+                'current_sort': sort_by,
+                'can_write': current_tasklist is not None and permissions.can(WRITE, current_tasklist.id),
+            }, request=request)
+        return json_response(data)
 
-    form = TaskForm(user=user)
+    form = TaskForm(user=user, tasklist_ids=permissions.tasklist_ids(WRITE))
     context = {
         'tasks': tasks,
+        'next_cursor': next_cursor,
         'form': form,
         'user_tasklists': user_tasklists,
         'current_tasklist': current_tasklist,
         'no_lists': no_lists,
         'current_status_filter': status_filter,
         'current_sort': sort_by,
+        # Edit/delete/complete controls are only shown on lists the user may change
+        'can_write': current_tasklist is not None and permissions.can(WRITE, current_tasklist.id),
+        'live_updates': live_updates_enabled(request),
     }
     if 'list_error' in locals():
         context['list_error'] = list_error
     return render(request, 'tasks/task_list.html', context)
 
-def get_tasks_json(tasks):
-    """Helper function to convert tasks queryset to JSON format"""
-    tasks_data = []
-    for task in tasks:
-        tasks_data.append({
-            'id': task.id,
-            'title': task.title,
-            'description': task.description or '',
-            'due_date': task.due_date.strftime('%b %d, %Y %I:%M %p'),
-            'due_date_local': task.due_date.strftime('%Y-%m-%dT%H:%M'),
-            'priority': task.priority,
-            'status': task.status,
-            'is_completed': task.is_completed,
-            'tasklist': task.tasklist.name,
-            'tasklist_id': task.tasklist.id
-        })
-    return tasks_data
+# Columns read by serialize_tasks(), the task row template (and its cache key) and the keyset cursor
+TASK_LISTING_FIELDS = (
+    'id', 'title', 'description', 'due_date', 'priority', 'status',
+    'is_completed', 'priority_rank', 'status_rank', 'version', 'tasklist__id', 'tasklist__name',
+)
+
+def listing_queryset(tasks):
+    """Fetch the related TaskList in the same query and only the listed columns"""
+    return tasks.select_related('tasklist').only(*TASK_LISTING_FIELDS)
+
+def apply_task_sort(tasks, sort_by):
+    """
+    Order tasks for the requested sort.
+
+    Priority and status sort on the stored integer ranks, which the
+    (tasklist, ...) indexes cover. Returns the queryset and its keyset sort
+    keys; every order ends with the task id so cursor pagination has a
+    total order.
+    """
+    if sort_by == 'priority':
+        sort_keys = ('priority_rank', 'id')
+    elif sort_by == 'status':
+        sort_keys = ('status_rank', 'id')
+    else:
+        sort_keys = ('due_date', 'id')
+    return tasks.order_by(*sort_keys), sort_keys
+
+def task_event(action, task):
+    """Live-update event for a created/updated task; its tasklist must be loaded"""
+    data = serialize_task(task)
+    # Full-precision due date and version so the SSE view can render (and cache) the row
+    data['due_date_iso'] = task.due_date.isoformat()
+    data['version'] = task.version
+    return {'type': f'task.{action}', 'task': data}
 
 @login_required
 def create_task(request):
     if request.method == 'POST':
-        form = TaskForm(user=request.user, data=request.POST)
+        permissions = permissions_for(request)
+        form = TaskForm(user=request.user, data=request.POST, tasklist_ids=permissions.tasklist_ids(WRITE))
         if form.is_valid():
-            # Extra validation: ensure the selected TaskList belongs to the user or is shared
+            # Extra validation: ensure the user may add tasks to the selected TaskList
             tasklist = form.cleaned_data['tasklist']
             user = request.user
-            if not (tasklist.user == user or tasklist.shared_with.filter(id=user.id).exists()):
+            if not permissions.can(WRITE, tasklist.id):
                 return JsonResponse({'success': False, 'errors': {'tasklist': ['Invalid task list.']}}, status=403) if request.headers.get('x-requested-with') == 'XMLHttpRequest' else redirect('task_list')
             # Create task but don't save yet
             task = form.save(commit=False)
             # Assign the task to the current user (creator)
             task.user = user
             task.save()
+            publish_event(task.tasklist_id, task_event('created', task))
             
             # Check if this is an AJAX request
             if request.headers.get('x-requested-with') == 'XMLHttpRequest':
                 # Return JSON response for AJAX requests
-                return JsonResponse({
-                    'success': True,
-                    'task': {
-                        'id': task.id,
-                        'title': task.title,
-                        'description': task.description or '',
-                        'due_date': task.due_date.strftime('%b %d, %Y %I:%M %p'),
-                        'due_date_local': task.due_date.strftime('%Y-%m-%dT%H:%M'),
-                        'priority': task.priority,
-                        'status': task.status,
-                        'is_completed': task.is_completed,
-                        'tasklist': task.tasklist.name,
-                        'tasklist_id': task.tasklist.id
-                    }
-                })
+                return json_response({'success': True, 'task': serialize_task(task)})
             else:
                 # Regular form submission - redirect
                 params = {}
@@ -302,55 +389,51 @@ def create_task(request):
                     'errors': form.errors
                 })
             else:
-                # Regular form submission - render with errors
+                # Regular form submission - render the task list page with errors,
+                # showing the list the task was meant for as task_list would
                 sort_by = request.GET.get('sort', 'due_date')
-                status_filter = request.GET.get('status', '')
-                # Start with tasks for the current user (owned or shared)
-                user = request.user
-                user_tasklists = TaskList.objects.filter(Q(user=user) | Q(shared_with=user)).distinct()
-                tasks = Task.objects.filter(tasklist__in=user_tasklists)
-                # Apply status filter if specified
-                if status_filter == 'completed':
-                    tasks = tasks.filter(status='completed')
-                elif status_filter == 'ongoing':
-                    tasks = tasks.filter(status='ongoing')
-                # Apply sorting
-                if sort_by == 'priority':
-                    tasks = tasks.annotate(
-                        priority_order=Case(
-                            When(priority='high', then=Value(0)),
-                            When(priority='medium', then=Value(1)),
-                            When(priority='low', then=Value(2)),
-                            output_field=IntegerField()
-                        )
-                    ).order_by('priority_order')
-                elif sort_by == 'status':
-                    tasks = tasks.annotate(
-                        status_order=Case(
-                            When(status='ongoing', then=Value(0)),
-                            When(status='completed', then=Value(1)),
-                            output_field=IntegerField()
-                        )
-                    ).order_by('status_order')
-                else:
-                    tasks = tasks.order_by('due_date')
+                status_filter = request.GET.get('status', 'ongoing')
+                user_tasklists = sidebar_tasklists(request)
+                submitted_id = request.POST.get('tasklist')
+                current_tasklist = next(
+                    (tl for tl in user_tasklists if str(tl.id) == submitted_id),
+                    user_tasklists[0] if user_tasklists else None,
+                )
+                tasks, next_cursor = Task.objects.none(), None
+                if current_tasklist:
+                    tasks = listing_queryset(Task.objects.filter(tasklist=current_tasklist))
+                    if status_filter == 'completed':
+                        tasks = tasks.filter(status='completed')
+                    elif status_filter == 'ongoing':
+                        tasks = tasks.filter(status='ongoing')
+                    # Apply sorting and show the first page only
+                    tasks, sort_keys = apply_task_sort(tasks, sort_by)
+                    tasks, next_cursor = paginate_tasks(tasks, sort_keys)
                 return render(request, 'tasks/task_list.html', {
                     'tasks': tasks,
+                    'next_cursor': next_cursor,
                     'form': form,
                     'show_modal': True,
+                    'user_tasklists': user_tasklists,
+                    'current_tasklist': current_tasklist,
+                    'no_lists': not user_tasklists,
                     'current_status_filter': status_filter,
-                    'current_sort': sort_by
+                    'current_sort': sort_by,
+                    'can_write': current_tasklist is not None and permissions.can(WRITE, current_tasklist.id),
+                    'live_updates': live_updates_enabled(request),
                 })
     # Always redirect to task list for GET requests
     return redirect('task_list')
 
 @login_required
 def delete_task(request, pk):
-    # Secure Task access: only if user owns or is shared on the TaskList
-    task = get_object_or_404(Task, pk=pk, tasklist__in=TaskList.objects.filter(Q(user=request.user) | Q(shared_with=request.user)).distinct())
+    # Secure Task access: only if the user may change the tasks of its TaskList
+    task = permissions_for(request).get_task(pk, WRITE)
     if request.method == 'POST':
         try:
+            task_id, tasklist_id = task.id, task.tasklist_id
             task.delete()
+            publish_event(tasklist_id, {'type': 'task.deleted', 'id': task_id})
             
             # Check if this is an AJAX request
             if request.headers.get('x-requested-with') == 'XMLHttpRequest':
@@ -377,11 +460,349 @@ def delete_task(request, pk):
     # GET request - show delete confirmation page (fallback for non-JS)
     return render(request, 'tasks/delete_task.html', {'task': task})
 
+# Largest number of task ids / new tasks accepted by one bulk request
+BULK_MAX_ITEMS = 1000
+BULK_OPERATIONS = ('complete', 'reopen', 'move', 'delete', 'create')
+
+@login_required
+@require_POST
+def bulk_tasks(request):
+    """
+    Apply one operation to many tasks in a single transaction.
+
+    Expected JSON payload:
+    {
+        "operation": "complete" | "reopen" | "move" | "delete" | "create",
+        "ids": [1, 2, 3],               # complete / reopen / move / delete
+        "tasklist_id": 4,               # move: destination list
+        "tasks": [{"title": ..., ...}]  # create: TaskForm fields plus "tasklist"
+    }
+
+    Access is resolved once for the whole batch; the change itself is one
+    UPDATE, DELETE or bulk_create. The response carries a result per item.
+    """
+    user = request.user
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON payload.'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'success': False, 'error': 'Invalid JSON payload.'}, status=400)
+
+    operation = data.get('operation')
+    if operation not in BULK_OPERATIONS:
+        return JsonResponse({'success': False, 'error': 'Unknown operation.'}, status=400)
+    items = data.get('tasks') if operation == 'create' else data.get('ids')
+    if not isinstance(items, list) or not items:
+        return JsonResponse({'success': False, 'error': 'No tasks given.'}, status=400)
+    if len(items) > BULK_MAX_ITEMS:
+        return JsonResponse({'success': False, 'error': f'At most {BULK_MAX_ITEMS} tasks per request.'}, status=400)
+
+    permissions = permissions_for(request)
+    if operation == 'create':
+        results = bulk_create_tasks(user, items, permissions.tasklist_ids(WRITE))
+    else:
+        target_id = None
+        if operation == 'move':
+            try:
+                target_id = int(data.get('tasklist_id'))
+            except (TypeError, ValueError):
+                target_id = None
+            if not permissions.can(WRITE, target_id):
+                return JsonResponse({'success': False, 'error': 'Invalid task list.'}, status=403)
+        results = bulk_update_tasks(operation, items, permissions, target_id)
+
+    return JsonResponse({
+        'success': True,
+        'operation': operation,
+        'processed': sum(1 for result in results if result['success']),
+        'results': results,
+    })
+
+def bulk_update_tasks(operation, ids, permissions, target_id=None):
+    """Run complete/reopen/move/delete as one set-based statement over the writable ids"""
+    requested = []
+    for raw_id in ids:
+        try:
+            requested.append(int(raw_id))
+        except (TypeError, ValueError):
+            requested.append(None)
+
+    # One query resolves existence and access for the whole batch
+    found = permissions.task_lists([i for i in requested if i is not None], WRITE)
+    results = []
+    allowed = []
+    for raw_id, task_id in zip(ids, requested):
+        if task_id is None:
+            results.append({'id': raw_id, 'success': False, 'error': 'Invalid task ID.'})
+        elif task_id not in found:
+            results.append({'id': task_id, 'success': False, 'error': 'Task not found.'})
+        else:
+            allowed.append(task_id)
+            results.append({'id': task_id, 'success': True})
+
+    if allowed:
+        tasks = Task.objects.filter(id__in=allowed)
+        # Each changes helper runs in one transaction, bumping list versions and writing tombstones
+        if operation == 'complete':
+            update_tasks(tasks, **Task.status_fields(Task.COMPLETED))
+        elif operation == 'reopen':
+            update_tasks(tasks, **Task.status_fields(Task.ONGOING))
+        elif operation == 'move':
+            move_tasks(tasks, target_id)
+        elif operation == 'delete':
+            delete_tasks(tasks)
+        # Too many rows for per-task events: clients re-fetch the affected lists
+        changed_lists = {found[task_id] for task_id in allowed}
+        if target_id is not None:
+            changed_lists.add(target_id)
+        for tasklist_id in changed_lists:
+            publish_event(tasklist_id, {'type': 'tasks.changed'})
+    return results
+
+def bulk_create_tasks(user, items, allowed_lists):
+    """Validate every item, then insert the valid ones with one bulk_create"""
+    results = []
+    new_tasks = []
+    form = BulkTaskForm(allowed_lists)
+    for index, item in enumerate(items):
+        if form.rebind(item if isinstance(item, dict) else {}).is_valid():
+            task = form.save(commit=False)
+            task.user = user
+            task.sync_derived_fields()
+            new_tasks.append(task)
+            results.append({'index': index, 'success': True})
+        else:
+            results.append({'index': index, 'success': False, 'errors': form.errors})
+
+    with transaction.atomic():
+        stamp_new_tasks(new_tasks)
+        created = iter(Task.objects.bulk_create(new_tasks))
+        # bulk_create sends no post_save signals
+        index_tasks(new_tasks, replace=False)
+    for tasklist_id in {task.tasklist_id for task in new_tasks}:
+        publish_event(tasklist_id, {'type': 'tasks.changed'})
+    for result in results:
+        if result['success']:
+            result['id'] = next(created).id
+    return results
+
+@login_required
+@require_POST
+def import_tasks_view(request):
+    """Import an uploaded CSV / JSON-lines file into one of the user's lists"""
+    upload = request.FILES.get('file')
+    if upload is None:
+        return JsonResponse({'success': False, 'error': 'No file uploaded.'}, status=400)
+    tasklist_id = request.POST.get('list', '')
+    if not tasklist_id.isdigit() or not permissions_for(request).can(WRITE, tasklist_id):
+        return JsonResponse({'success': False, 'error': 'Invalid task list.'}, status=403)
+    tasklist = get_object_or_404(TaskList, id=tasklist_id)
+
+    fmt = request.POST.get('format') or guess_format(upload.name)
+    if fmt not in IMPORT_FORMATS:
+        return JsonResponse({'success': False, 'error': 'Unsupported format.'}, status=400)
+    # Uploads over FILE_UPLOAD_MAX_MEMORY_SIZE are spooled to disk, so this reads a stream
+    stream = io.TextIOWrapper(upload.file, encoding='utf-8', errors='replace', newline='')
+    result = import_tasks(stream, fmt, tasklist, request.user)
+    if result.created:
+        publish_event(tasklist.id, {'type': 'tasks.changed'})
+    return JsonResponse({'success': True, **result.as_dict()})
+
+@login_required
+def export_tasks_view(request):
+    """Stream the tasks of a list as CSV or JSON lines"""
+    tasklist_id = request.GET.get('list', '')
+    if not tasklist_id.isdigit() or not permissions_for(request).can(READ, tasklist_id):
+        return JsonResponse({'success': False, 'error': 'Invalid task list.'}, status=403)
+    tasklist = get_object_or_404(TaskList, id=tasklist_id)
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in IMPORT_FORMATS:
+        return JsonResponse({'success': False, 'error': 'Unsupported format.'}, status=400)
+
+    content_type = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = StreamingHttpResponse(stream_export(tasklist, fmt), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="tasklist-{tasklist.id}.{fmt}"'
+    return response
+
+# Deepest page of search results served (ranked results are paged by offset)
+SEARCH_MAX_PAGE = 20
+
+@login_required
+def search_tasks(request):
+    """
+    Full-text search over the titles and descriptions of the user's tasks.
+
+    Searches every list the user owns or shares (or one, with `list`) and
+    returns one ranked page of results as JSON; see tasks.search.
+    """
+    query = request.GET.get('q', '').strip()
+    page = request.GET.get('page', '1')
+    page = int(page) if page.isdigit() and 0 < int(page) <= SEARCH_MAX_PAGE else None
+    if page is None:
+        return JsonResponse({'success': False, 'error': 'Invalid page.'}, status=400)
+    permissions = permissions_for(request)
+    tasklist_ids = permissions.tasklist_ids(READ)
+    tasklist_id = request.GET.get('list')
+    if tasklist_id:
+        if not tasklist_id.isdigit() or not permissions.can(READ, tasklist_id):
+            return JsonResponse({'success': False, 'error': 'Invalid task list.'}, status=403)
+        tasklist_ids = {int(tasklist_id)}
+
+    # One extra id tells whether another page exists
+    ids = search_task_ids(tasklist_ids, query, (page - 1) * PAGE_SIZE, PAGE_SIZE + 1)
+    has_more = len(ids) > PAGE_SIZE
+    ids = ids[:PAGE_SIZE]
+    tasks = listing_queryset(Task.objects.filter(id__in=ids)).in_bulk()
+    return json_response({
+        'success': True,
+        'query': query,
+        'page': page,
+        'has_more': has_more,
+        'tasks': serialize_tasks(tasks[i] for i in ids if i in tasks),
+    })
+
+@login_required
+def tasklist_stats_view(request):
+    """Open, completed and overdue task counts of every list the user can access (one query)"""
+    lists = tasklist_stats(permissions_for(request).tasklist_ids(READ))
+    return json_response({
+        'success': True,
+        'lists': [
+            {
+                'id': row['id'],
+                'name': row['name'],
+                'shared': row['user_id'] != request.user.id,
+                'open': row['open_count'],
+                'completed': row['completed_count'],
+                'overdue': row['overdue_count'],
+                'total': row['open_count'] + row['completed_count'],
+            }
+            for row in lists
+        ],
+    })
+
+# Above this many changed (or deleted) tasks the client is told to reload the list instead
+DELTA_MAX_CHANGES = 1000
+
+@login_required
+def tasklist_changes(request):
+    """
+    Delta sync: the tasks of a list changed or removed since version `since`.
+
+    Clients take `version` from the task_list AJAX response (or the previous
+    delta) as their watermark. `tasks` holds changed rows of every status,
+    `deleted` the ids of tasks deleted or moved away. `reset` means too much
+    changed (or the watermark is unknown or older than the pruned tombstones)
+    and the list should be re-fetched.
+    """
+    tasklist_id = request.GET.get('list', '')
+    since = request.GET.get('since', '')
+    if not since.isdigit():
+        return JsonResponse({'success': False, 'error': 'Invalid version.'}, status=400)
+    since = int(since)
+    if not tasklist_id.isdigit() or not permissions_for(request).can(READ, tasklist_id):
+        return JsonResponse({'success': False, 'error': 'Invalid task list.'}, status=403)
+    # Read the version first: a change racing with this request shows up again next time
+    tasklist = get_object_or_404(TaskList.objects.only('version', 'pruned_version'), id=tasklist_id)
+    version = tasklist.version
+    if since > version or since < tasklist.pruned_version:
+        return JsonResponse({'success': True, 'version': version, 'reset': True})
+
+    changed = list(
+        listing_queryset(Task.objects.filter(tasklist_id=tasklist_id, version__gt=since))
+        .order_by('version', 'id')[:DELTA_MAX_CHANGES + 1]
+    )
+    if len(changed) > DELTA_MAX_CHANGES:
+        return JsonResponse({'success': True, 'version': version, 'reset': True})
+    deleted = list(
+        TaskTombstone.objects.filter(tasklist_id=tasklist_id, version__gt=since)
+        .order_by('version')
+        .values_list('task_id', flat=True)[:DELTA_MAX_CHANGES + 1]
+    )
+    if len(deleted) > DELTA_MAX_CHANGES:
+        return JsonResponse({'success': True, 'version': version, 'reset': True})
+    changed_ids = {task.id for task in changed}
+    return json_response({
+        'success': True,
+        'version': version,
+        'reset': False,
+        'tasks': serialize_tasks(changed),
+        # A task moved away and back again is only reported as changed
+        'deleted': list(dict.fromkeys(i for i in deleted if i not in changed_ids)),
+    })
+
 @login_required
 @require_POST
 def share_tasklist(request):
-    data = request.POST
-    username = data.get('username', '').strip()
+    """
+    Share the list with one or more users, or with action=unshare remove them.
+
+    `username` holds comma or space separated names and may repeat; `role`
+    is editor (the default) or viewer. Only the list's owner may share it.
+    """
+    payload, status = update_sharing(permissions_for(request), requested_tasklist_id(request), request.POST)
+    return JsonResponse(payload, status=status)
+
+def update_sharing(permissions, tasklist_id, data):
+    """JSON payload and status code of a share request (also used by the async view)"""
+    if not tasklist_id:
+        return {'success': False, 'message': 'TaskList not specified.'}, 400
+    # Validate TaskList ownership
+    if not str(tasklist_id).isdigit() or not permissions.can(SHARE, tasklist_id):
+        return {'success': False, 'message': 'You do not have permission to share this list.'}, 403
+    tasklist_id = int(tasklist_id)
+    action = data.get('action') or 'share'
+    role = data.get('role') or TaskListMembership.EDITOR
+    if action not in ('share', 'unshare'):
+        return {'success': False, 'message': 'Invalid action.'}, 400
+    if role not in dict(TaskListMembership.ROLE_CHOICES):
+        return {'success': False, 'message': 'Invalid role.'}, 400
+    # Validate usernames
+    usernames = parse_usernames(data.getlist('username'))
+    if not usernames:
+        return {'success': False, 'message': 'Username is required.'}, 400
+    if len(usernames) > SHARE_MAX_USERS:
+        return {'success': False, 'message': f'Share with at most {SHARE_MAX_USERS} users at a time.'}, 400
+    # Prevent sharing with self
+    others = [name for name in usernames if name != permissions.user.username]
+    if not others:
+        return {'success': False, 'message': 'You cannot share a list with yourself.'}, 400
+    found = find_users(others)
+    not_found = [name for name in others if name not in found]
+    if not found:
+        return {'success': False, 'message': 'User not found.', 'not_found': not_found}, 404
+    names = {user_id: name for name, user_id in found.items()}
+
+    if action == 'unshare':
+        removed = unshare(tasklist_id, list(names))
+        if not removed:
+            return {'success': False, 'message': 'The list is not shared with these users.', 'not_found': not_found}, 400
+        removed = [names[user_id] for user_id in removed]
+        return {
+            'success': True,
+            'message': f'List no longer shared with {", ".join(removed)}.',
+            'removed': removed,
+            'not_found': not_found,
+        }, 200
+
+    added, changed = share_with(tasklist_id, list(names), role)
+    # Prevent duplicate sharing
+    if not added and not changed:
+        return {'success': False, 'message': 'This user already has access to the list.' if len(names) == 1
+                else 'These users already have access to the list.', 'not_found': not_found}, 400
+    shared = [names[user_id] for user_id in added + changed]
+    return {
+        'success': True,
+        'message': f'List shared with {", ".join(shared)}.',
+        'shared': [names[user_id] for user_id in added],
+        'updated': [names[user_id] for user_id in changed],
+        'role': role,
+        'not_found': not_found,
+    }, 200
+
+def requested_tasklist_id(request):
+    """TaskList id of a share request: from the form, the query string or the referer"""
     tasklist_id = request.POST.get('tasklist_id') or request.GET.get('tasklist_id') or request.POST.get('list') or request.GET.get('list')
     # Try to get the TaskList ID from the referer if not present
     if not tasklist_id:
@@ -389,29 +810,7 @@ def share_tasklist(request):
         m = re.search(r'[?&]list=(\d+)', referer)
         if m:
             tasklist_id = m.group(1)
-    if not tasklist_id:
-        return JsonResponse({'success': False, 'message': 'TaskList not specified.'}, status=400)
-    # Validate TaskList ownership
-    try:
-        tasklist = TaskList.objects.get(id=tasklist_id, user=request.user)
-    except TaskList.DoesNotExist:
-        return JsonResponse({'success': False, 'message': 'You do not have permission to share this list.'}, status=403)
-    # Validate username
-    if not username:
-        return JsonResponse({'success': False, 'message': 'Username is required.'}, status=400)
-    try:
-        target_user = User.objects.get(username=username)
-    except User.DoesNotExist:
-        return JsonResponse({'success': False, 'message': 'User not found.'}, status=404)
-    # Prevent sharing with self
-    if target_user == request.user:
-        return JsonResponse({'success': False, 'message': 'You cannot share a list with yourself.'}, status=400)
-    # Prevent duplicate sharing
-    if tasklist.shared_with.filter(id=target_user.id).exists():
-        return JsonResponse({'success': False, 'message': 'This user already has access to the list.'}, status=400)
-    # Add user to shared_with
-    tasklist.shared_with.add(target_user)
-    return JsonResponse({'success': True, 'message': f'List shared with {target_user.username}.'})
+    return tasklist_id
 
 def redirect_with_params(view_name, params):
     """Helper function to redirect while preserving query parameters"""
@@ -436,7 +835,7 @@ def log_error_view(request):
     """
     Receive error log data from frontend and write to centralized log file.
     
-    Expected JSON payload:
+    Accepts a single event, a JSON array of events, or {"events": [...]}:
     {
         "message": "Error description",
         "severity": "ERROR",
@@ -445,33 +844,77 @@ def log_error_view(request):
         "user_agent": "Mozilla/5.0...",
         "timestamp": "2025-07-13T20:45:00.000Z"
     }
+
+    Events are rate limited per client and repeats of the same message
+    within the dedup window are dropped. Logging only enqueues the record;
+    the file write happens on the QueueListenerHandler thread.
     """
     try:
         # Parse JSON payload
         data = json.loads(request.body)
-        
+
+        if isinstance(data, dict) and 'events' in data:
+            events = data['events']
+        elif isinstance(data, list):
+            events = data
+        else:
+            events = [data]
+        if not isinstance(events, list) or not events:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'No events given'
+            }, status=400)
+        max_batch = getattr(settings, 'TASKS_LOG_ERROR_MAX_BATCH', 100)
+        if len(events) > max_batch:
+            return JsonResponse({
+                'status': 'error',
+                'message': f'At most {max_batch} events per request'
+            }, status=400)
+
         # Validate required fields
-        if 'message' not in data or not data['message']:
+        valid = [e for e in events if isinstance(e, dict) and isinstance(e.get('message'), str) and e['message'].strip()]
+        if not valid:
             return JsonResponse({
                 'status': 'error',
                 'message': 'Missing or empty message field'
             }, status=400)
-        
-        # Extract and validate fields
-        message = data['message'].strip()
-        severity = data.get('severity', 'ERROR')
-        source = data.get('source', 'frontend')
-        url = data.get('url', 'unknown')
-        user_agent = data.get('user_agent', 'unknown')
-        timestamp = data.get('timestamp', 'unknown')
-        
-        # Create meaningful log message
-        log_message = f"[{source}] {message} | URL: {url} | User-Agent: {user_agent} | Timestamp: {timestamp}"
-        
-        # Log the error using our utility function
-        log_error(log_message)
-        
-        return JsonResponse({'status': 'ok'})
+
+        client_id = request.META.get('REMOTE_ADDR', 'unknown')
+        allowed = take_rate_limit(client_id, len(valid))
+        if allowed == 0:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Rate limit exceeded'
+            }, status=429)
+
+        logged = duplicates = 0
+        for event in valid[:allowed]:
+            # Extract and validate fields
+            message = event['message'].strip()
+            severity = event.get('severity', 'ERROR')
+            source = event.get('source', 'frontend')
+            url = event.get('url', 'unknown')
+            user_agent = event.get('user_agent', 'unknown')
+            timestamp = event.get('timestamp', 'unknown')
+
+            if is_duplicate_event(client_id, source, message):
+                duplicates += 1
+                continue
+
+            # Create meaningful log message
+            log_message = f"[{source}] {message} | URL: {url} | User-Agent: {user_agent} | Timestamp: {timestamp}"
+
+            # Log the error using our utility function
+            log_error(log_message)
+            logged += 1
+
+        return JsonResponse({
+            'status': 'ok',
+            'logged': logged,
+            'duplicates': duplicates,
+            'invalid': len(events) - len(valid),
+            'rate_limited': len(valid) - allowed,
+        })
         
     except json.JSONDecodeError:
         return JsonResponse({
@@ -486,37 +929,85 @@ def log_error_view(request):
             'message': 'Internal server error'
         }, status=500)
 
-LOG_PATH = os.path.join(settings.BASE_DIR, 'app.log')
+# The file the 'app_file' handler writes to (archives sit next to it)
+LOG_PATH = str(settings.LOG_FILE)
+
+def _parse_offset(value):
+    return int(value) if value and value.isdigit() else None
+
+def _parse_log_time(value):
+    """Parse a datetime-local form value (naive, same clock as the log timestamps)"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
 
 @login_required
 def view_log_file(request):
     if not request.user.is_staff:
         return HttpResponseForbidden("403 Forbidden: Staff access only.")
-    if not os.path.exists(LOG_PATH):
-        return render(request, 'tasks/logs.html', {'log_content': '', 'no_log': True, 'truncated': False})
-    file_size = os.path.getsize(LOG_PATH)
-    truncated = False
-    log_content = ''
-    if file_size > 1024 * 1024:  # >1MB
-        # Tail last 500 lines
-        with open(LOG_PATH, 'r', encoding='utf-8', errors='replace') as f:
-            lines = f.readlines()
-            log_content = ''.join(lines[-500:])
-            truncated = True
+
+    # Seek-based paging: memory stays bounded however large app.log is
+    log_filter = LogFilter(
+        level=request.GET.get('level'),
+        source=request.GET.get('source', '').strip(),
+        since=_parse_log_time(request.GET.get('since')),
+        until=_parse_log_time(request.GET.get('until')),
+        text=request.GET.get('q', '').strip(),
+    )
+    # A missing app.log only means "no log" when there are no archives either
+    archived = needs_archives(LOG_PATH, log_filter.since)
+    if not archived and not os.path.exists(LOG_PATH):
+        return render(request, 'tasks/logs.html', {'log_content': '', 'no_log': True})
+    if archived:
+        # The range starts before the active file: read it from the indexed archives
+        page = read_range_page(LOG_PATH, log_filter, PAGE_LINES)
     else:
-        with open(LOG_PATH, 'r', encoding='utf-8', errors='replace') as f:
-            log_content = f.read()
+        page = read_log_page(
+            LOG_PATH,
+            before=_parse_offset(request.GET.get('before')),
+            after=_parse_offset(request.GET.get('after')),
+            log_filter=log_filter,
+        )
+    # Filters are carried over to the older/newer links
+    filter_params = request.GET.copy()
+    for key in ('before', 'after'):
+        filter_params.pop(key, None)
     return render(request, 'tasks/logs.html', {
-        'log_content': log_content,
+        'log_content': page.text,
         'no_log': False,
-        'truncated': truncated
+        'page': page,
+        'archived': archived,
+        'filter_query': filter_params.urlencode(),
+        'levels': LOG_LEVELS,
+        'filters': request.GET,
     })
 
 @login_required
 def download_log_file(request):
     if not request.user.is_staff:
         return HttpResponseForbidden("403 Forbidden: Staff access only.")
+    since = _parse_log_time(request.GET.get('since'))
+    until = _parse_log_time(request.GET.get('until'))
+    if since or until:
+        # Stream just the requested time range from the right archive members
+        lines = (line + '\n' for line in iter_log_range(LOG_PATH, since, until))
+        response = StreamingHttpResponse(lines, content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = 'attachment; filename="app-range.log"'
+        return response
     if not os.path.exists(LOG_PATH):
         return JsonResponse({'error': 'File not found'}, status=404)
     response = FileResponse(open(LOG_PATH, 'rb'), as_attachment=True, filename='app.log')
     return response
+
+@login_required
+def view_perf_stats(request):
+    """Latency percentiles per view over this process's recent requests (see tasks.perf)"""
+    if not request.user.is_staff:
+        return HttpResponseForbidden("403 Forbidden: Staff access only.")
+    return render(request, 'tasks/perf.html', {
+        'rows': latency_summary(),
+        'buffer_size': PERF_BUFFER_SIZE,
+    })
@@ -41,6 +41,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack (see tasks.perf)
+    'tasks.perf.PerfMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,7 +56,8 @@ ROOT_URLCONF = 'todo_project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that also times renders for the perf middleware
+        'BACKEND': 'tasks.perf.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -81,6 +84,37 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# LocMemCache evicts least-recently-used entries past MAX_ENTRIES. It is
+# per-process, so multi-process deployments should point this at a shared
+# backend (Redis/Memcached) for signal invalidation to reach every worker.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'todo-app',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+# Cache each user's list roles across requests (see tasks.access). Only safe
+# with a cache every server process shares; the development server is a
+# single process, so its LocMemCache qualifies. Production requires a shared
+# cache (settings_production).
+TASKS_ACCESS_CACHE = True
+# Seconds a user's list roles stay cached
+TASKS_ACCESS_CACHE_TIMEOUT = 300
+# Seconds a rendered task row stays cached (see tasks.fragments); edits change its key
+TASKS_ROW_CACHE_TIMEOUT = 3600
+# Days the tombstone of a deleted or moved task is kept for delta sync; run
+# the prune_tombstones command daily to drop older ones (see tasks.changes)
+TASKS_TOMBSTONE_MAX_AGE_DAYS = 30
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -130,6 +164,10 @@ LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'
 
 # Logging configuration
+# Active log file; rotated segments live next to it as app.log.<stamp>.gz
+# with a sidecar time index app.log.index (see tasks.logstore)
+LOG_FILE = BASE_DIR.parent / 'app.log'
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -142,11 +180,16 @@ LOGGING = {
     },
     'handlers': {
         'app_file': {
+            # Records are queued and written by a background listener thread
+            '()': 'tasks.log_handlers.QueueListenerHandler',
             'level': 'INFO',
-            'class': 'logging.FileHandler',
-            'filename': BASE_DIR.parent / 'app.log',
+            'filename': LOG_FILE,
             'formatter': 'app_formatter',
             'mode': 'a',  # append mode
+            # Rotate into gzip archives at 10 MB or daily, keeping 30 archives
+            'max_bytes': 10 * 1024 * 1024,
+            'max_age': 24 * 60 * 60,
+            'backup_count': 30,
         },
         'console': {
             'level': 'DEBUG',
@@ -165,9 +208,47 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'tasks.perf': {  # one line per request, file only
+            'handlers': ['app_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
     'root': {
         'handlers': ['app_file', 'console'],
         'level': 'INFO',
     },
 }
+
+# Frontend error ingestion (/log-error/): events per POST, per-client rate
+# limit (events per window) and the window for dropping repeated messages
+TASKS_LOG_ERROR_MAX_BATCH = 100
+TASKS_LOG_ERROR_RATE_LIMIT = 120
+TASKS_LOG_ERROR_RATE_WINDOW = 60
+TASKS_LOG_ERROR_DEDUP_WINDOW = 60
+
+# Live task list updates (see tasks.events): on/off (they are only offered to
+# requests served over ASGI either way), broker class, events buffered per
+# subscriber and seconds between SSE keep-alive comments
+TASKS_LIVE_UPDATES = True
+TASKS_EVENT_BROKER = 'tasks.events.InProcessBroker'
+TASKS_EVENTS_QUEUE_SIZE = 100
+TASKS_EVENTS_HEARTBEAT = 15
+
+# Request instrumentation (see tasks.perf): requests kept per process for the
+# /logs/perf/ percentiles and the latency (ms) past which a request logs a warning
+TASKS_PERF_BUFFER_SIZE = 5000
+TASKS_PERF_SLOW_MS = 500
+
+# Task reminders (see tasks.reminders): minutes before the due date a "due
+# soon" reminder goes out, tasks per delivery batch, seconds between passes
+# of the send_reminders worker and the delivery backend (a dotted path)
+TASKS_REMINDER_LEAD_MINUTES = 60
+TASKS_REMINDER_BATCH_SIZE = 500
+TASKS_REMINDER_INTERVAL = 60
+TASKS_REMINDER_BACKEND = 'tasks.reminders.EmailReminderBackend'
+
+# Outgoing email is written to files locally; production sends through SMTP
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = BASE_DIR.parent / 'sent_emails'
+DEFAULT_FROM_EMAIL = 'todo@localhost'
@@ -0,0 +1,99 @@
+"""
+Production settings for todo_project.
+
+Everything not overridden here comes from todo_project.settings. Select this
+profile with DJANGO_SETTINGS_MODULE=todo_project.settings_production and
+provide the secret key, host names and a cache shared by all server
+processes through the environment (all required; the development
+fallbacks must never reach production):
+
+    DJANGO_SECRET_KEY=...  DJANGO_ALLOWED_HOSTS=todo.example.com
+    DJANGO_CACHE_URL=redis://127.0.0.1:6379/0  (or memcached://127.0.0.1:11211)
+"""
+import copy
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, TEMPLATES
+
+
+def _require_env(name):
+    value = os.environ.get(name, '').strip()
+    if not value:
+        raise ImproperlyConfigured(f'The {name} environment variable is required in production.')
+    return value
+
+
+# Copies, so the development settings module is left untouched
+DATABASES = copy.deepcopy(DATABASES)
+TEMPLATES = copy.deepcopy(TEMPLATES)
+
+DEBUG = False
+
+SECRET_KEY = _require_env('DJANGO_SECRET_KEY')
+ALLOWED_HOSTS = [host.strip() for host in _require_env('DJANGO_ALLOWED_HOSTS').split(',') if host.strip()]
+if not ALLOWED_HOSTS:
+    raise ImproperlyConfigured('DJANGO_ALLOWED_HOSTS must name at least one host.')
+
+# One cache for every worker: signals invalidate cached list roles (the
+# authorization checks in tasks.permissions read them) and sessions for all
+# processes at once, which a per-process LocMemCache cannot do
+CACHE_URL = _require_env('DJANGO_CACHE_URL')
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': CACHE_URL}}
+elif CACHE_URL.startswith('memcached://'):
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': CACHE_URL.removeprefix('memcached://'),
+    }}
+else:
+    raise ImproperlyConfigured('DJANGO_CACHE_URL must be a redis://, rediss:// or memcached:// URL.')
+TASKS_ACCESS_CACHE = True
+
+# Keep database connections open across requests (seconds), checking them
+# before reuse instead of failing the first query after a server restart
+DATABASES['default']['CONN_MAX_AGE'] = 600
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Compile each template once per process; explicit loaders replace APP_DIRS
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+# Only what production needs, each for a reason. CommonMiddleware is left
+# out: every link comes from {% url %} with its trailing slash, so its
+# APPEND_SLASH redirects and URL checks are work without a use here.
+MIDDLEWARE = [
+    # Server-Timing and the /logs/perf/ percentiles are for production traffic
+    'tasks.perf.PerfMiddleware',
+    # Right after the perf middleware, so it compresses the final response body
+    'django.middleware.gzip.GZipMiddleware',
+    # HSTS, nosniff and the SSL redirect settings
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    # ETags and 304s for the views that do not set their own validators
+    'django.middleware.http.ConditionalGetMiddleware',
+    # Every form posts with a CSRF token
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # The views report results through django.contrib.messages
+    'django.contrib.messages.middleware.MessageMiddleware',
+    # The pages must not be framed (clickjacking)
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+# Sessions are read from the shared cache and written through to the
+# database, so a cache miss only costs a query
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_HOST = os.environ.get('DJANGO_EMAIL_HOST', 'localhost')
+DEFAULT_FROM_EMAIL = os.environ.get('DJANGO_DEFAULT_FROM_EMAIL', 'todo@localhost')
+
+STATIC_ROOT = BASE_DIR / 'staticfiles'  # noqa: F405
@@ -6,28 +6,12 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todo_project.settings')
 django.setup()
 
-from tasks.models import Task
+from django.core.management import call_command
 
 def update_not_started_to_ongoing():
     """Update all tasks with 'not_started' status to 'ongoing' status"""
-    
-    # Find all tasks with 'not_started' status
-    not_started_tasks = Task.objects.filter(status='not_started')
-    
-    print(f"Found {not_started_tasks.count()} tasks with 'not_started' status")
-    
-    if not_started_tasks.count() > 0:
-        # Update all these tasks to 'ongoing' status
-        updated_count = not_started_tasks.update(status='ongoing')
-        print(f"Successfully updated {updated_count} tasks to 'ongoing' status")
-    else:
-        print("No tasks with 'not_started' status found")
-    
-    # Show current status distribution
-    print("\nCurrent task status distribution:")
-    for status in Task.objects.values('status').distinct():
-        count = Task.objects.filter(status=status['status']).count()
-        print(f"  {status['status']}: {count} tasks")
+    # Batched, version-stamping update; see tasks/management/commands/migrate_task_status.py
+    call_command('migrate_task_status', from_status='not_started', to_status='ongoing')
 
 if __name__ == '__main__':
-    update_not_started_to_ongoing() 
\ No newline at end of file
+    update_not_started_to_ongoing()